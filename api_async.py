@@ -0,0 +1,433 @@
+"""
+asyncio HTTP engine for high-concurrency runs.
+
+A small HTTP/1.1 client on asyncio streams (stdlib only) that plugs into the
+same RequestSpec -> response -> Runner.handle_response path as the requests
+based transport in api_engine. Connections are kept alive and pooled per
+host, the number of connections per host is capped, and cancelling a task
+closes its connection instead of returning it to the pool.
+"""
+
+import asyncio
+import json
+import socket
+import ssl
+import time
+from datetime import timedelta
+from http.cookies import SimpleCookie
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from requests.structures import CaseInsensitiveDict
+
+from api_engine import (BODY_CHUNK_SIZE, DEFAULT_WORKERS, BodyCapture, CapturePolicy, LazyBody, Phases, RequestResult,
+                        RequestSpec, Runner)
+
+DEFAULT_LIMIT_PER_HOST = 100
+USER_AGENT = "api-automation-tool"
+STREAM_LIMIT = 2 ** 20  # Longest status/header line accepted
+
+
+def _charset(headers: CaseInsensitiveDict) -> str:
+    content_type = headers.get('Content-Type', '')
+    for part in content_type.split(';')[1:]:
+        key, _, value = part.strip().partition('=')
+        if key.lower() == 'charset' and value:
+            return value.strip('"')
+    return 'utf-8'
+
+
+class AsyncResponse:
+    """Response with the attributes Runner.handle_response reads from a requests.Response"""
+
+    def __init__(self, status_code: int, reason: str, headers: CaseInsensitiveDict, body: LazyBody,
+                 elapsed: float, cookies: Dict[str, str], phases: Optional[Phases] = None, bytes_out: int = 0):
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.body = body  # As kept by the capture policy
+        self.content = body.content
+        self.elapsed = timedelta(seconds=elapsed)  # From connecting until headers were parsed, like requests
+        self.cookies = cookies
+        self.phases = phases
+        self.bytes_out = bytes_out  # Request body size
+
+    @property
+    def encoding(self) -> str:
+        return _charset(self.headers)
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class _HostPool:
+    """Idle keep-alive connections of one host plus its connection cap"""
+
+    def __init__(self, limit: int):
+        self.idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self.slots = asyncio.Semaphore(limit)
+
+
+class AsyncTransport:
+    """Pooled keep-alive HTTP/1.1 client; one instance per event loop"""
+
+    def __init__(self, limit_per_host: int = DEFAULT_LIMIT_PER_HOST, timeout: float = 30):
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.cookies: Dict[str, str] = {}  # Simple shared cookie jar (name -> value)
+        self.opened = 0
+        self.reused = 0
+        self._pools: Dict[Tuple[str, str, int], _HostPool] = {}
+        self._ssl_context = ssl.create_default_context()
+        # Same as verify=False on the requests session
+        self._ssl_context.check_hostname = False
+        self._ssl_context.verify_mode = ssl.CERT_NONE
+
+    async def send(self, spec: RequestSpec, timeout: Optional[Tuple[float, float]] = None,
+                   capture: Optional[CapturePolicy] = None) -> AsyncResponse:
+        """Send a request; raises asyncio.TimeoutError when connecting takes longer than timeout[0]
+        or the whole exchange longer than both timeouts together (default: `timeout` seconds each).
+        The body is passed to the capture policy (default: keep it all) chunk by chunk as it is read."""
+        connect, read = timeout or (self.timeout, self.timeout)
+        return await asyncio.wait_for(self._send(spec, connect, capture or CapturePolicy()), connect + read)
+
+    async def close(self):
+        """Close every idle connection"""
+        for pool in self._pools.values():
+            for _, writer in pool.idle:
+                writer.close()
+            pool.idle.clear()
+
+    def _encode(self, spec: RequestSpec, parts) -> bytes:
+        target = parts.path or '/'
+        query = parts.query
+        if spec.params:
+            extra = urlencode(spec.params, doseq=True)
+            query = f"{query}&{extra}" if query else extra
+        if query:
+            target = f"{target}?{query}"
+
+        headers = CaseInsensitiveDict(spec.headers)
+        body = b""
+        if spec.body is not None:
+            body = spec.body
+        elif spec.json_body is not None:
+            body = json.dumps(spec.json_body).encode('utf-8')
+            headers.setdefault('Content-Type', 'application/json')
+        if body or spec.method in ('POST', 'PUT'):
+            headers['Content-Length'] = str(len(body))
+        headers.setdefault('Host', parts.netloc)
+        headers.setdefault('User-Agent', USER_AGENT)
+        headers.setdefault('Accept', '*/*')
+        headers.setdefault('Accept-Encoding', 'identity')
+        headers.setdefault('Connection', 'keep-alive')
+        if self.cookies and 'Cookie' not in headers:
+            headers['Cookie'] = '; '.join(f"{name}={value}" for name, value in self.cookies.items())
+
+        head = [f"{spec.method} {target} HTTP/1.1"]
+        head.extend(f"{key}: {value}" for key, value in headers.items())
+        return ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body
+
+    async def _open(self, scheme: str, host: str, port: int, connect_timeout: float, phases: Phases):
+        connection = await asyncio.wait_for(self._connect(scheme, host, port, phases), connect_timeout)
+        self.opened += 1  # Once established, so refused and timed-out connects do not count
+        return connection
+
+    async def _connect(self, scheme: str, host: str, port: int, phases: Phases):
+        """Resolve, connect and (for https) handshake in separate steps so each can be timed"""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        addresses = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        resolved = time.perf_counter()
+        error = None
+        for family, kind, proto, _, address in addresses:
+            sock = socket.socket(family, kind, proto)
+            sock.setblocking(False)
+            try:
+                await loop.sock_connect(sock, address)
+                break
+            except OSError as e:
+                sock.close()
+                error = e
+            except BaseException:
+                sock.close()
+                raise
+        else:
+            raise error or OSError(f"Cannot connect to {host}:{port}")
+        connected = time.perf_counter()
+        try:
+            reader, writer = await asyncio.open_connection(
+                sock=sock, ssl=self._ssl_context if scheme == 'https' else None,
+                server_hostname=host if scheme == 'https' else None, limit=STREAM_LIMIT)
+        except BaseException:
+            sock.close()
+            raise
+        phases.dns, phases.connect = resolved - started, connected - resolved
+        phases.tls = time.perf_counter() - connected if scheme == 'https' else 0.0
+        phases.reused = False
+        return reader, writer
+
+    async def _send(self, spec: RequestSpec, connect_timeout: float, capture_policy: CapturePolicy) -> AsyncResponse:
+        parts = urlsplit(spec.url)
+        scheme = parts.scheme or 'http'
+        port = parts.port or (443 if scheme == 'https' else 80)
+        key = (scheme, parts.hostname, port)
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = _HostPool(self.limit_per_host)
+        payload = self._encode(spec, parts)
+        bytes_out = len(payload) - payload.index(b'\r\n\r\n') - 4
+
+        async with pool.slots:
+            # Response time counts from here, connecting included, as requests' elapsed does
+            started = time.perf_counter()
+            while True:
+                phases = Phases()
+                reused = bool(pool.idle)
+                if reused:
+                    reader, writer = pool.idle.pop()
+                    if writer.is_closing() or reader.at_eof():
+                        writer.close()
+                        continue
+                    self.reused += 1
+                else:
+                    reader, writer = await self._open(scheme, parts.hostname, port, connect_timeout, phases)
+
+                keep_alive = False
+                try:
+                    sent = time.perf_counter()
+                    writer.write(payload)
+                    await writer.drain()
+                    try:
+                        status_line = await reader.readuntil(b'\r\n')
+                    except (asyncio.IncompleteReadError, ConnectionError):
+                        if reused:
+                            # The server closed an idle keep-alive connection; retry on a fresh one
+                            continue
+                        raise
+                    status_code, reason, headers, set_cookies = await self._read_head(status_line, reader)
+                    headers_in = time.perf_counter()
+                    capture = BodyCapture(capture_policy, _charset(headers), spec.name)
+                    try:
+                        keep_alive = await self._read_body(reader, spec.method, status_code, headers,
+                                                           status_line.startswith(b'HTTP/1.0'), capture.feed)
+                    finally:
+                        capture.close()
+                    phases.ttfb, phases.download = headers_in - sent, time.perf_counter() - headers_in
+                finally:
+                    if keep_alive:
+                        pool.idle.append((reader, writer))
+                    else:
+                        writer.close()
+
+                cookies = {}
+                for set_cookie in set_cookies:
+                    parsed = SimpleCookie()
+                    try:
+                        parsed.load(set_cookie)
+                    except Exception:
+                        continue
+                    for name, morsel in parsed.items():
+                        cookies[name] = morsel.value
+                self.cookies.update(cookies)
+                return AsyncResponse(status_code, reason, headers, capture.finish(), headers_in - started, cookies,
+                                     phases, bytes_out)
+
+    @staticmethod
+    async def _read_head(status_line: bytes, reader: asyncio.StreamReader):
+        parts = status_line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+        status_code = int(parts[1])
+        reason = parts[2] if len(parts) > 2 else ''
+
+        headers = CaseInsensitiveDict()
+        set_cookies = []
+        while True:
+            line = await reader.readuntil(b'\r\n')
+            if line == b'\r\n':
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            key, value = key.strip(), value.strip()
+            if key.lower() == 'set-cookie':
+                set_cookies.append(value)
+            # Repeated headers are joined the way requests/urllib3 do it
+            headers[key] = f"{headers[key]}, {value}" if key in headers else value
+        return status_code, reason, headers, set_cookies
+
+    @staticmethod
+    async def _read_body(reader: asyncio.StreamReader, method: str, status_code: int,
+                         headers: CaseInsensitiveDict, http_10: bool, feed: Callable[[bytes], None]) -> bool:
+        """Read the body, passing it to feed in chunks of at most BODY_CHUNK_SIZE; returns keep-alive"""
+        connection = headers.get('Connection', '').lower()
+        keep_alive = 'keep-alive' in connection if http_10 else 'close' not in connection
+
+        if method == 'HEAD' or status_code in (204, 304) or 100 <= status_code < 200:
+            return keep_alive
+
+        async def read_exactly(size: int):
+            while size:
+                chunk = await reader.readexactly(min(size, BODY_CHUNK_SIZE))
+                feed(chunk)
+                size -= len(chunk)
+
+        if 'chunked' in headers.get('Transfer-Encoding', '').lower():
+            while True:
+                size_line = await reader.readuntil(b'\r\n')
+                size = int(size_line.split(b';', 1)[0].strip(), 16)
+                if size == 0:
+                    # Skip trailers
+                    while await reader.readuntil(b'\r\n') != b'\r\n':
+                        pass
+                    break
+                await read_exactly(size)
+                await reader.readexactly(2)
+            return keep_alive
+
+        content_length = headers.get('Content-Length')
+        if content_length is not None:
+            await read_exactly(int(content_length))
+            return keep_alive
+
+        # No framing: the body runs until the server closes the connection
+        while True:
+            chunk = await reader.read(BODY_CHUNK_SIZE)
+            if not chunk:
+                return False
+            feed(chunk)
+
+
+class AsyncRunner:
+    """Sends a Runner's requests through an AsyncTransport.
+
+    Request building, auth token handling and logging are the Runner's; only
+    the I/O is asynchronous. Call cancel() (from any thread) to stop a
+    run_many() in flight: pending requests are reported as "Cancelled" and
+    their connections are closed.
+    """
+
+    def __init__(self, runner: Runner, transport: Optional[AsyncTransport] = None,
+                 limit_per_host: int = DEFAULT_LIMIT_PER_HOST):
+        self.runner = runner
+        self.transport = transport or AsyncTransport(limit_per_host, timeout=runner.timeout)
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def send(self, spec: RequestSpec, title: str = "Custom Request",
+                   details_label: str = "REQUEST DETAILS") -> RequestResult:
+        """Async counterpart of Runner.send"""
+        runner = self.runner
+        result = runner.begin_request(spec, title)
+        if result is not None:
+            return result
+
+        retry = runner.retry_policy(spec)
+        breaker = runner.breaker(spec.url)
+        policy = runner.timeout_policy(spec)
+        deadline = runner.request_deadline(policy)
+        attempt = 0
+        waited = 0.0
+        while True:
+            attempt += 1
+            if breaker is not None and not breaker.allow():
+                result = runner.short_circuit_result(spec)
+                break
+            delay = runner.rate_limit_delay(spec)
+            if delay:
+                started = time.monotonic()
+                while delay:
+                    await asyncio.sleep(delay)
+                    delay = runner.rate_limit_delay(spec)
+                waited += time.monotonic() - started
+            if runner.cancelled.is_set():
+                result = runner.cancelled_result(spec)
+                break
+            timeout = runner.attempt_timeout(spec, policy, deadline)
+            if timeout is None:
+                result = runner.deadline_result(spec)
+                break
+            sent = time.monotonic()
+            try:
+                response = await self.transport.send(spec, timeout, runner.capture_policy(spec))
+                result = runner.handle_response(spec, response, details_label)
+                runner.check_throttled(spec, response, sent)
+                failure, transient = response.status_code >= 500, response.status_code in retry.retry_on
+            except asyncio.TimeoutError:
+                result = runner.timeout_result(spec, timeout)
+                failure = transient = True
+            except Exception as e:
+                result = runner.error_result(spec, e)
+                failure = transient = isinstance(e, (OSError, asyncio.IncompleteReadError))
+            delay = runner.finish_attempt(spec, result, attempt, retry, breaker, failure, transient, deadline)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+
+        result.endpoint = spec.endpoint
+        runner.finish_request(result, attempt, waited)
+        return result
+
+    async def execute_template(self, category: str, method_name: str, template: Dict) -> RequestResult:
+        """Async counterpart of Runner.execute_template"""
+        try:
+            spec = self.runner.template_request(category, method_name, template)
+        except ValueError as e:
+            return self.runner.failed(f"{category} > {method_name}", e)
+        return await self.send(spec, title=f"Testing: {spec.name} (Dynamic Template)",
+                               details_label="REQUEST DETAILS (Dynamic Template)")
+
+    async def run_many(self, methods: Optional[List[Tuple[str, str]]] = None,
+                       concurrency: int = DEFAULT_WORKERS) -> List[RequestResult]:
+        """Run methods with at most `concurrency` requests in flight; results come back in input order"""
+        collection = self.runner.collection
+        if methods is None:
+            methods = [(category, method_name) for category, method_name, _ in collection.iter_methods()]
+        templates = {}
+        for category, method_name in methods:
+            if (category, method_name) not in templates:
+                templates[category, method_name] = collection.template_for(category, method_name)
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def one(category, method_name):
+            with self.runner.capture() as buffered:
+                try:
+                    async with semaphore:
+                        result = await self.execute_template(category, method_name, templates[category, method_name])
+                except asyncio.CancelledError as e:
+                    result = self.runner.failed(f"{category} > {method_name}", e)
+            return result, buffered
+
+        self._loop = asyncio.get_running_loop()
+        self._tasks = [asyncio.ensure_future(one(category, method_name)) for category, method_name in methods]
+        try:
+            outcomes = await asyncio.gather(*self._tasks)
+        finally:
+            self._tasks = []
+
+        results = []
+        for result, buffered in outcomes:
+            self.runner.replay(buffered)
+            results.append(result)
+        return results
+
+    def cancel(self):
+        """Cancel every request of the current run_many(); safe to call from another thread"""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._cancel_tasks)
+
+    def _cancel_tasks(self):
+        for task in self._tasks:
+            task.cancel()
+
+    def run(self, methods: Optional[List[Tuple[str, str]]] = None,
+            concurrency: int = DEFAULT_WORKERS) -> List[RequestResult]:
+        """Blocking entry point: run_many() on a fresh event loop, then close the pool"""
+        async def main():
+            try:
+                return await self.run_many(methods, concurrency)
+            finally:
+                await self.transport.close()
+        return asyncio.run(main())
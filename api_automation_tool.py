@@ -1,14 +1,22 @@
-import requests
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog
 import json
-from typing import Dict, Optional, Tuple
-import urllib3
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+import time
 import webbrowser
-from datetime import datetime
 
-# Disable SSL warnings
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from api_engine import (DEFAULT_WORKERS, LOG_LEVELS, PACING_MODES, CategoryIndex, Collection, PacingPolicy,
+                        QueueSink, Runner, dependency_order, join_url, load_settings, parse_params)
+from api_distributed import LoadCoordinator
+from api_load import ClosedLoopPlan, LoadGenerator, OpenLoopPlan, parse_stages
+from api_result_view import ResultView
+from api_store import DEFAULT_STORE, ResultStore
+
+LOG_FRAME_MS = 50  # The results log is redrawn (and background results handled) at most this often...
+LOG_FRAME_LINES = 2000  # ...with at most this many new lines per redraw
+BACKGROUND_WORKERS = 4  # Threads that send requests for the UI (test, send, automation, load test)
 
 
 class APITestAutomationTool:
@@ -36,6 +44,7 @@ class APITestAutomationTool:
         }
         
         # Login methods storage
+        self.login_methods = {}  # "Folder/Name" -> login candidate, found while importing
         
         # Optimized dimensions for 15.6 inch laptop
         self.root.minsize(1200, 700)
@@ -54,37 +63,88 @@ class APITestAutomationTool:
         
         
         
-        self.session = requests.Session()
-        self.session.verify = False
+        # GUI-free core: collection model + runner (session, auth tokens)
+        # Log lines are queued and drawn in batches by _drain_log, not one redraw per line
+        self.log_sink = QueueSink()
+        self.collection = Collection(log=self.log_message)
+        self.runner = Runner(self.collection, sink=self.log_sink)
+        
+        # Every request is also recorded in a local SQLite store (python api_cli.py history api_results.db),
+        # created when the first request is recorded rather than at every launch
+        self.runner.store = ResultStore(DEFAULT_STORE, lazy=True, on_error=lambda e: self.log_message(
+            f"⚠️ Requests are not recorded: cannot open {DEFAULT_STORE} ({e})"))
+        
+        # Network I/O runs on these workers; their results come back through ui_queue (see run_in_background)
+        self.executor = ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS, thread_name_prefix="api-worker")
+        self.ui_queue = queue.Queue()
+        self.background_tasks = 0
         self.base_url = ""
-        self.xsrf_token = ""
-        self.auth_token = ""  # For Bearer token authentication
-        self.session_id = ""
         self.selected_category = ""
         self.selected_method = ""
         
         # Dynamic template storage - store current templates for each method
         self.dynamic_templates = {}
         
-        # Separate storage for saved fields
-        self.saved_headers = {}
-        self.saved_bodies = {}
-        self.saved_params = {}
-        self.saved_urls = {}
-        self.saved_paths = {}
+        # Saved fields live on each imported Endpoint (endpoint.save / endpoint.saved_value)
         
         # For API collection import
-        self.imported_apis = {}
-        self.category_structure = {}
-        self.expanded_categories = set()  # Track which categories are expanded
+        self.category_index = CategoryIndex({})
+        self._tree_folders = {}  # Treeview item -> category node ("Users|Admin")
+        self._tree_methods = {}  # Treeview item -> (category, method name)
+        self._tree_filled = set()  # Folder items whose content was inserted (on first open)
         self.collection_loaded = False
-        self.collection_variables = {}  # Store collection variables like baseUrl
         
         # No hardcoded APIs - collection must be imported first
         self.sample_apis = {}
         
         self.create_widgets()
+        self._drain_log()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+    
+    # Collection and auth state live in the engine; these keep the old attribute names working
+    @property
+    def imported_apis(self):
+        return self.collection.imported_apis
+    
+    @imported_apis.setter
+    def imported_apis(self, value):
+        self.collection.imported_apis = value
+    
+    @property
+    def collection_variables(self):
+        return self.collection.collection_variables
+    
+    @collection_variables.setter
+    def collection_variables(self, value):
+        self.collection.collection_variables = value
+    
+    @property
+    def session(self):
+        return self.runner.session
+    
+    @property
+    def xsrf_token(self):
+        return self.runner.xsrf_token
+    
+    @xsrf_token.setter
+    def xsrf_token(self, value):
+        self.runner.xsrf_token = value
+    
+    @property
+    def auth_token(self):
+        return self.runner.auth_token
+    
+    @auth_token.setter
+    def auth_token(self, value):
+        self.runner.auth_token = value
+    
+    @property
+    def session_id(self):
+        return self.runner.session_id
     
+    @session_id.setter
+    def session_id(self, value):
+        self.runner.session_id = value
     
     def create_widgets(self):
         # Create main frame - modern theme
@@ -144,6 +204,10 @@ class APITestAutomationTool:
         self.remove_collection_button = ttk.Button(import_button_frame, text="🗑 Remove", command=self.remove_collection, state=tk.NORMAL)
         self.remove_collection_button.grid(row=0, column=2, sticky=tk.W, padx=(0, 5))
         
+        # Connection pools etc. per base URL / category / method
+        ttk.Button(import_button_frame, text="⚙️ Settings", command=self.edit_settings).grid(row=0, column=3, sticky=tk.W,
+                                                                                          padx=(0, 5))
+        
         # Import status label
         self.import_status_label = ttk.Label(import_frame, text="No collection imported", foreground="gray")
         self.import_status_label.grid(row=1, column=0, sticky=tk.W, pady=2)
@@ -152,35 +216,31 @@ class APITestAutomationTool:
         api_frame = ttk.LabelFrame(parent, text="🎯 API Selection", padding="10")
         api_frame.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
         
-        # API categories (flexible size)
-        ttk.Label(api_frame, text="Category:").grid(row=0, column=0, sticky=tk.W, pady=2)
+        # API categories and methods (flexible size)
+        ttk.Label(api_frame, text="Category / Method:").grid(row=0, column=0, sticky=tk.W, pady=2)
         
-        # Category listbox with scrollbar
+        # Folder tree with scrollbar; a folder's subfolders and methods are inserted when it is first opened
         category_frame = ttk.Frame(api_frame)
         category_frame.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=2)
         
-        self.category_listbox = tk.Listbox(category_frame, height=8, width=35)
-        self.category_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.api_tree = ttk.Treeview(category_frame, height=16, show="tree", selectmode="browse")
+        self.api_tree.column("#0", width=280)
+        self.api_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
-        category_scrollbar = ttk.Scrollbar(category_frame, orient=tk.VERTICAL, command=self.category_listbox.yview)
+        category_scrollbar = ttk.Scrollbar(category_frame, orient=tk.VERTICAL, command=self.api_tree.yview)
         category_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.category_listbox.config(yscrollcommand=category_scrollbar.set)
+        self.api_tree.config(yscrollcommand=category_scrollbar.set)
         
-        self.category_listbox.bind('<<ListboxSelect>>', self.on_category_select)
+        self.api_tree.bind('<<TreeviewOpen>>', self.on_category_open)
+        self.api_tree.bind('<<TreeviewSelect>>', self.on_tree_select)
         
         # Categories will be populated when collection is imported
-        self.category_listbox.insert(tk.END, "⚠️ No collection imported")
-        
-        # API methods (flexible size)
-        ttk.Label(api_frame, text="Method:").grid(row=2, column=0, sticky=tk.W, pady=(10, 2))
-        self.method_listbox = tk.Listbox(api_frame, height=8, width=35)
-        self.method_listbox.grid(row=3, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=2)
-        self.method_listbox.bind('<<ListboxSelect>>', self.on_method_select)
+        self.api_tree.insert("", tk.END, text="⚠️ No collection imported")
         
         # Test buttons
         # Load Template Button
         self.load_template_button = ttk.Button(api_frame, text="Load Template", command=self.load_template, state=tk.NORMAL)
-        self.load_template_button.grid(row=4, column=0, columnspan=2, pady=10, sticky=(tk.W, tk.E))
+        self.load_template_button.grid(row=2, column=0, columnspan=2, pady=10, sticky=(tk.W, tk.E))
         
         # Automation section - Modern style (compact)
         automation_frame = ttk.LabelFrame(parent, text="🤖 Automation", padding="10")
@@ -199,6 +259,7 @@ class APITestAutomationTool:
         ttk.Button(order_button_frame, text="↓", command=self.move_method_down, width=3).grid(row=0, column=1, padx=1)
         ttk.Button(order_button_frame, text="Remove", command=self.remove_from_order, width=8).grid(row=0, column=2, padx=1)
         ttk.Button(order_button_frame, text="Add", command=self.add_to_order, width=8).grid(row=0, column=3, padx=1)
+        ttk.Button(order_button_frame, text="Depends on...", command=self.set_dependencies, width=12).grid(row=0, column=4, padx=1)
         
         # Automation buttons
         automation_button_frame = ttk.Frame(automation_frame)
@@ -210,14 +271,44 @@ class APITestAutomationTool:
         self.stop_automation_button = ttk.Button(automation_button_frame, text="Stop", command=self.stop_automation, state=tk.NORMAL)
         self.stop_automation_button.grid(row=0, column=1, padx=2)
         
+        # Test every imported method; more than one worker runs them in parallel
+        self.test_all_button = ttk.Button(automation_button_frame, text="Test All", command=self.test_all_apis, state=tk.NORMAL)
+        self.test_all_button.grid(row=0, column=2, padx=2)
+        
+        # Drive the automation list's endpoints at a fixed request rate
+        ttk.Button(automation_button_frame, text="Load Test...", command=self.load_test).grid(row=0, column=5, padx=2)
+        
+        ttk.Label(automation_button_frame, text="Workers:").grid(row=0, column=3, padx=(6, 2))
+        self.workers_var = tk.IntVar(value=DEFAULT_WORKERS)
+        ttk.Spinbox(automation_button_frame, from_=1, to=64, width=4, textvariable=self.workers_var).grid(row=0, column=4, padx=2)
+        
+        # Run Automation honours declared dependencies and runs independent steps in parallel
+        self.parallel_automation_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(automation_button_frame, text="Parallel (by dependencies)",
+                        variable=self.parallel_automation_var).grid(row=1, column=0, columnspan=5, sticky=tk.W, pady=(4, 0))
+        
+        # Delay between sequential steps: none, fixed/random think time (seconds) or target rate (req/s)
+        pacing_frame = ttk.Frame(automation_button_frame)
+        pacing_frame.grid(row=2, column=0, columnspan=5, sticky=tk.W, pady=(4, 0))
+        ttk.Label(pacing_frame, text="Pacing:").pack(side=tk.LEFT, padx=(0, 2))
+        self.pacing_mode_var = tk.StringVar(value="fixed")
+        ttk.Combobox(pacing_frame, textvariable=self.pacing_mode_var, values=PACING_MODES, state="readonly",
+                     width=7).pack(side=tk.LEFT, padx=2)
+        self.pacing_value_var = tk.StringVar(value="2")
+        ttk.Entry(pacing_frame, textvariable=self.pacing_value_var, width=8).pack(side=tk.LEFT, padx=2)
+        ttk.Label(pacing_frame, text="(s, min-max s, or req/s)", foreground="gray").pack(side=tk.LEFT, padx=2)
+        
         # Otomasyon durumu
         self.automation_status_label = ttk.Label(automation_frame, text="Ready", foreground="blue")
         self.automation_status_label.grid(row=4, column=0, columnspan=2, pady=2, sticky=(tk.W, tk.E))
         
         # Automation variables
         self.automation_running = False
+        self.automation_pacing = PacingPolicy()
         self.automation_methods = []
         self._automation_queue = []  # Copy to be consumed during active execution
+        self.load_runner = None  # LoadGenerator or LoadCoordinator while a load test runs
+        self.automation_dependencies = {}  # method -> set of methods that must succeed first
         self.automation_results = {}  # To store method results
         
         # Grid weights
@@ -313,9 +404,24 @@ class APITestAutomationTool:
         ttk.Button(toolbar, text="Export", command=self.export_results).grid(row=0, column=1, padx=2)
         ttk.Button(toolbar, text="Copy", command=self.copy_results).grid(row=0, column=2, padx=2)
         
-        # Results text with better sizing and scrollbar
-        self.result_text = scrolledtext.ScrolledText(results_frame, width=90, height=50, wrap=tk.WORD, font=('Consolas', 9))
-        self.result_text.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(0, 0), pady=(0, 0))
+        # Verbosity: "results" logs one line per request, "bodies" adds status, timings and body, "full" adds headers
+        ttk.Label(toolbar, text="Log:").grid(row=0, column=3, padx=(12, 2))
+        self.log_level_var = tk.StringVar(value=self.log_sink.level)
+        log_level_combo = ttk.Combobox(toolbar, textvariable=self.log_level_var, values=LOG_LEVELS, state="readonly", width=8)
+        log_level_combo.grid(row=0, column=4, padx=2)
+        log_level_combo.bind("<<ComboboxSelected>>", lambda event: setattr(self.log_sink, "level", self.log_level_var.get()))
+        
+        # Jump to the log of the Nth request
+        ttk.Label(toolbar, text="Request #:").grid(row=0, column=5, padx=(12, 2))
+        self.jump_var = tk.StringVar()
+        jump_entry = ttk.Entry(toolbar, textvariable=self.jump_var, width=7)
+        jump_entry.grid(row=0, column=6, padx=2)
+        jump_entry.bind("<Return>", lambda event: self.jump_to_request())
+        ttk.Button(toolbar, text="Go", command=self.jump_to_request).grid(row=0, column=7, padx=2)
+        
+        # Results log: bounded, draws only the visible lines, bodies expand on click
+        self.result_view = ResultView(results_frame, font=('Consolas', 9))
+        self.result_view.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(0, 0), pady=(0, 0))
         
         # Grid weights
         parent.columnconfigure(0, weight=1)
@@ -324,175 +430,48 @@ class APITestAutomationTool:
         results_frame.rowconfigure(1, weight=1)
     
     
-    def on_category_select(self, event):
-        selection = event.widget.curselection()
-        if selection:
-            index = selection[0]
-            category_name = event.widget.get(index)
-            
-            # Check if "No collection imported" message is selected
-            if category_name == "⚠️ No collection imported":
-                self.log_message("⚠️ Please import an API collection first")
-                return
-            
-            # Handle main category selection (📁 prefix)
-            if category_name.startswith("📁 "):
-                # Extract main category name
-                main_category = category_name.replace("📁 ", "", 1).split(" (")[0]
-                
-                # Toggle expansion of this category
-                if main_category in self.expanded_categories:
-                    # Collapse - remove subcategories
-                    self._collapse_category(main_category)
-                else:
-                    # Expand - show subcategories
-                    self._expand_category(main_category)
-                    
-                # Show all methods from this main category (including nested subcategories)
-                self.method_listbox.delete(0, tk.END)
-                all_methods = []
-                for cat_key, methods in self.imported_apis.items():
-                    if cat_key == main_category or cat_key.startswith(f"{main_category}|"):
-                        all_methods.extend(list(methods.keys()))
-                
-                # Display in original order without de-duplication
-                for method_name in all_methods:
-                    self.method_listbox.insert(tk.END, method_name)
-                
-                self.log_message(f"📋 Loaded {len(all_methods)} methods from category: {main_category}")
-                self.selected_category = main_category
-                
-                # Auto-select first method if available
-                if all_methods:
-                    self.method_listbox.selection_set(0)
-                    self.on_method_select(None)  # Trigger method selection
-            
-            # Handle subcategory selection (📂 prefix)
-            elif category_name.startswith("  📂 "):
-                # Subcategory selected - show only methods in this subcategory
-                subcategory_info = category_name.replace("  📂 ", "", 1)
-                subcategory = subcategory_info.split(" (")[0]
-                
-                # Find the parent category and get methods from imported_apis
-                for main_category in self.category_structure.keys():
-                    if subcategory in self.category_structure[main_category]:
-                        # Get methods for this specific subcategory from imported_apis
-                        subcategory_key = f"{main_category}|{subcategory}"
-                        if subcategory_key in self.imported_apis:
-                            filtered_methods = list(self.imported_apis[subcategory_key].keys())
-                            
-                            if filtered_methods:
-                                # Clear method list and add filtered methods
-                                self.method_listbox.delete(0, tk.END)
-                                for method_name in filtered_methods:
-                                    self.method_listbox.insert(tk.END, method_name)
-                                self.log_message(f"📋 Loaded {len(filtered_methods)} methods from subcategory: {subcategory}")
-                                self.selected_category = subcategory_key  # Use full key for subcategory
-                                
-                                # Auto-select first method if available
-                                if filtered_methods:
-                                    self.method_listbox.selection_set(0)
-                                    self.on_method_select(None)  # Trigger method selection
-                                break
-                        else:
-                            self.log_message(f"⚠️ No methods found for subcategory: {subcategory}")
-                            break
-                else:
-                    self.log_message(f"⚠️ No methods found for subcategory: {subcategory}")
-            else:
-                # Legacy format or other cases
-                if category_name in self.imported_apis:
-                    methods = list(self.imported_apis[category_name].keys())
-                    for method_name in methods:
-                        self.method_listbox.insert(tk.END, method_name)
-                    self.log_message(f"📋 Loaded {len(methods)} methods from category: {category_name}")
-                    self.selected_category = category_name
-                    
-                    # Auto-select first method if available
-                    if methods:
-                        self.method_listbox.selection_set(0)
-                        self.on_method_select(None)  # Trigger method selection
-                else:
-                    self.log_message(f"⚠️ No methods found for category: {category_name}")
+    def _insert_folder(self, parent: str, node: str):
+        """Tree item of a category node, with a placeholder child so it can be opened before it is filled"""
+        item = self.api_tree.insert(parent, tk.END,
+                                    text=f"📁 {CategoryIndex.name(node)} ({self.category_index.counts[node]} methods)")
+        self._tree_folders[item] = node
+        self.api_tree.insert(item, tk.END)
     
-    def _expand_category(self, main_category):
-        """Expand a category to show its subcategories"""
-        if main_category not in self.category_structure:
-            return
-        
-        # Find the category index in the listbox
-        category_index = None
-        for i in range(self.category_listbox.size()):
-            item = self.category_listbox.get(i)
-            if item.startswith("📁 ") and main_category in item:
-                category_index = i
-                break
-        
-        if category_index is None:
+    def _fill_folder(self, item: str):
+        """Replace a folder's placeholder with its subfolders and methods: O(children), once per folder"""
+        node = self._tree_folders.get(item)
+        if node is None or item in self._tree_filled:
             return
-        
-        # Add subcategories after the main category
-        subcategories = self.category_structure[main_category]
-        insert_index = category_index + 1
-        
-        for subcategory in sorted(subcategories.keys()):
-            method_count = len(subcategories[subcategory])
-            self.category_listbox.insert(insert_index, f"  📂 {subcategory} ({method_count} methods)")
-            insert_index += 1
-        
-        # Mark as expanded
-        self.expanded_categories.add(main_category)
-        self.log_message(f"📂 Expanded category: {main_category}")
+        self._tree_filled.add(item)
+        self.api_tree.delete(*self.api_tree.get_children(item))
+        for child in sorted(self.category_index.children[node]):
+            self._insert_folder(item, child)
+        for method_name in self.category_index.methods(node):
+            self._tree_methods[self.api_tree.insert(item, tk.END, text=method_name)] = (node, method_name)
     
-    def _collapse_category(self, main_category):
-        """Collapse a category to hide its subcategories"""
-        if main_category not in self.category_structure:
+    def on_category_open(self, event):
+        self._fill_folder(self.api_tree.focus())
+    
+    def on_tree_select(self, event):
+        selection = self.api_tree.selection()
+        if not selection:
             return
-        
-        # Find and remove subcategories
-        items_to_remove = []
-        for i in range(self.category_listbox.size()):
-            item = self.category_listbox.get(i)
-            if item.startswith("  📂 "):
-                # Check if this subcategory belongs to the main category
-                subcategory_name = item.replace("  📂 ", "", 1).split(" (")[0]
-                if subcategory_name in self.category_structure[main_category]:
-                    items_to_remove.append(i)
-        
-        # Remove subcategories (in reverse order to maintain indices)
-        for i in reversed(items_to_remove):
-            self.category_listbox.delete(i)
-        
-        # Mark as collapsed
-        self.expanded_categories.discard(main_category)
-        self.log_message(f"📁 Collapsed category: {main_category}")
-    
-    def on_method_select(self, event):
-        if event is None:
-            # Called programmatically, select first item
-            if self.method_listbox.size() > 0:
-                self.method_listbox.selection_set(0)
-                self.selected_method = self.method_listbox.get(0)
-            else:
-                return
+        item = selection[0]
+        
+        if item in self._tree_methods:
+            self.selected_category, self.selected_method = self._tree_methods[item]
+            self.on_method_select()
+        elif item in self._tree_folders:
+            # Folder selected - methods are picked inside it
+            self.selected_category = self._tree_folders[item]
+            self.selected_method = ""
+            self.log_message(f"📋 {self.category_index.counts[self.selected_category]} methods in category: "
+                             f"{self.selected_category}")
         else:
-            selection = event.widget.curselection()
-            if selection:
-                index = selection[0]
-                self.selected_method = event.widget.get(index)
-            else:
-                return
-        
-        # Find the correct category for this method
-        if self.selected_method and self.selected_category:
-            # Look for the method in the imported APIs
-            for category_key in self.imported_apis.keys():
-                if self.selected_method in self.imported_apis[category_key]:
-                    # Update selected_category to the actual category key
-                    self.selected_category = category_key
-                    self.log_message(f"🔍 Found method '{self.selected_method}' in category: {category_key}")
-                    break
-        
+            # "No collection imported" message
+            self.log_message("⚠️ Please import an API collection first")
+    
+    def on_method_select(self):
         # Activate save buttons
         self.save_headers_button.config(state=tk.NORMAL)
         self.save_body_button.config(state=tk.NORMAL)
@@ -515,77 +494,10 @@ class APITestAutomationTool:
             messagebox.showerror("Error", "Selected method not found")
             return
         
-        # Get base URL from method info or use default
-        base_url = api_info.get('base_url', 'https://api.example.com')
-        url_path = api_info.get('url_path', '/')
-        method = api_info.get('method', 'GET')
-        
-        # Construct full URL
-        if url_path.startswith('http'):
-            url = url_path
-        else:
-            url = f"{base_url}{url_path}"
-        
-        # Get headers and body
-        headers = api_info.get('headers', {})
-        body = api_info.get('body', '')
-        params = api_info.get('params', '')
-        
-        try:
-            self.log_message(f"Testing {method} {url}...")
-            
-            # Make request based on method
-            if method.upper() == 'GET':
-                # Parse URL-encoded parameters
-                parsed_params = {}
-                if params:
-                    from urllib.parse import parse_qs
-                    parsed_params = parse_qs(params)
-                    # Convert from {key: [value]} to {key: value} format
-                    parsed_params = {key: value[0] if len(value) == 1 else value for key, value in parsed_params.items()}
-                response = self.session.get(url, headers=headers, params=parsed_params, verify=False)
-            elif method.upper() == 'POST':
-                response = self.session.post(url, json=json.loads(body) if body else None, headers=headers, verify=False)
-            elif method.upper() == 'PUT':
-                response = self.session.put(url, json=json.loads(body) if body else None, headers=headers, verify=False)
-            elif method.upper() == 'DELETE':
-                response = self.session.delete(url, headers=headers, verify=False)
-            else:
-                response = self.session.request(method, url, headers=headers, verify=False)
-            
-            # Log response details
-            self.log_message(f"📊 Status Code: {response.status_code}")
-            self.log_message(f"⏱️ Response Time: {response.elapsed.total_seconds():.3f}s")
-            
-            # Log response headers
-            self.log_message(f"📋 Response Headers:")
-            for key, value in response.headers.items():
-                self.log_message(f"   {key}: {value}")
-            
-            # Log response body
-            try:
-                if response.text:
-                    response_json = response.json()
-                    formatted_json = json.dumps(response_json, indent=2, ensure_ascii=False)
-                    self.log_message(f"📄 Response Body:\n{formatted_json}")
-                else:
-                    self.log_message("📄 Response Body: (Empty)")
-            except:
-                self.log_message(f"📄 Response Body: {response.text}")
-            
-            # Store authentication tokens if present
-            if 'XSRF-TOKEN' in response.cookies:
-                self.xsrf_token = response.cookies['XSRF-TOKEN']
-                self.log_message(f"🔐 XSRF Token stored: {self.xsrf_token[:20]}...")
-            
-            # Store session ID if present in response
-            try:
-                response_data = response.json()
-                if 'sessionId' in response_data:
-                    self.session_id = response_data['sessionId']
-                    self.log_message(f"🔑 Session ID stored: {self.session_id[:20]}...")
-            except:
-                pass
+        def done(result):
+            if result.error and result.status_code is None:
+                failed(RuntimeError(result.error))
+                return
             
             # Enable buttons
             self.send_button.config(state=tk.NORMAL)
@@ -594,291 +506,152 @@ class APITestAutomationTool:
             
             self.log_message("✅ API test completed!")
         
-        except Exception as e:
+        def failed(e):
             self.log_message(f"❌ API test error: {str(e)}")
             messagebox.showerror("Error", f"API test failed: {str(e)}")
+        
+        self.log_message(f"Testing {api_info.method} {api_info.path}...")
+        category, method_name = self.selected_category, self.selected_method
+        self.run_in_background(lambda: self.runner.execute(category, method_name), done, failed)
     
     def test_api(self):
         if not self.selected_category or not self.selected_method:
             messagebox.showwarning("Warning", "Please select a category and method")
             return
         
-        self.execute_api_test(self.selected_category, self.selected_method)
+        category, method_name = self.selected_category, self.selected_method
+        self.run_in_background(lambda: self.execute_api_test(category, method_name))
     
     def test_all_apis(self):
+        try:
+            workers = max(1, int(self.workers_var.get()))
+        except (tk.TclError, ValueError):
+            workers = 1
+        
         self.log_message("\n" + "="*80)
-        self.log_message("STARTING FULL API TEST")
+        self.log_message(f"STARTING FULL API TEST ({workers} worker{'s' if workers > 1 else ''})")
         self.log_message("="*80 + "\n")
         
-        for category, methods in self.imported_apis.items():
-            self.log_message(f"\n{'='*80}")
-            self.log_message(f"Testing Category: {category}")
-            self.log_message(f"{'='*80}\n")
-            
-            for method_name in methods.keys():
+        methods = [(category, method_name) for category, methods in self.imported_apis.items() for method_name in methods]
+        
+        self.runner.begin_run(label="Test All")
+        self.run_in_background(lambda: self._test_all_apis(methods, workers), lambda _: self.runner.end_run())
+    
+    def _test_all_apis(self, methods, workers):
+        """Body of test_all_apis, on a worker thread (only logs, never touches widgets)"""
+        if workers == 1:
+            ordered_results = ((category, method_name, None, None) for category, method_name in methods)
+        else:
+            # Requests run on a thread pool; logs and results still come back in collection order
+            ordered_results = self.runner.iter_parallel(methods, workers, execute=self.runner.execute)
+        
+        current_category = None
+        for category, method_name, result, buffered in ordered_results:
+            if category != current_category:
+                current_category = category
+                self.log_message(f"\n{'='*80}")
+                self.log_message(f"Testing Category: {category}")
+                self.log_message(f"{'='*80}\n")
+            
+            if buffered is None:
+                if self.runner.cancelled.is_set():
+                    break
                 self.execute_api_test(category, method_name)
-                self.root.update()
+            else:
+                self.runner.replay(buffered)
         
         self.log_message("\n" + "="*80)
-        self.log_message("FULL API TEST COMPLETED")
+        self.log_message("FULL API TEST STOPPED" if self.runner.cancelled.is_set() else "FULL API TEST COMPLETED")
+        for line in self.runner.transport_report():
+            self.log_message(line)
         self.log_message("="*80 + "\n")
     
     def execute_api_test(self, category: str, method_name: str):
-        # Get API info - only from imported APIs
-        if category in self.imported_apis:
-            api_info = self.imported_apis[category][method_name]
-        else:
-            self.log_message(f"❌ API method not found: {category} - {method_name}")
-            return False
-        
-        method = api_info["method"]
-        path = api_info["path"]
-        
-        # Get base URL from API info or use default
-        base_url = api_info.get('base_url', 'https://api.example.com')
-        
-        # Construct full URL
-        if path.startswith('http'):
-            url = path
-        else:
-            url = f"{base_url}{path}"
-        
-        # Get headers from API info
-        headers = api_info.get("headers", {})
-        headers["Content-Type"] = "application/json"
-        
-        # Clean Postman variables from headers
-        cleaned_headers = {}
-        for key, value in headers.items():
-            if isinstance(value, str):
-                cleaned_value = self._clean_postman_variables(value)
-                cleaned_headers[key] = cleaned_value
-            else:
-                cleaned_headers[key] = value
-        
-        headers = cleaned_headers
-        
-        # Add authentication headers
-        self._add_auth_headers(headers, "test request")
-        
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.log_message(f"\n{'═'*100}")
-        self.log_message(f"🕐 {timestamp} | Testing: {category} > {method_name}")
-        self.log_message(f"📡 Method: {method}")
-        self.log_message(f"🔗 URL: {url}")
-        self.log_message(f"{'═'*100}")
-        
-        try:
-            # Make API call
-            if method == "GET":
-                params = api_info.get("params", {})
-                response = self.session.get(url, headers=headers, params=params, verify=False, timeout=30)
-            elif method == "POST":
-                response = self.session.post(url, headers=headers, json={}, verify=False, timeout=30)
-            elif method == "PUT":
-                response = self.session.put(url, headers=headers, json={}, verify=False, timeout=30)
-            elif method == "DELETE":
-                response = self.session.delete(url, headers=headers, verify=False, timeout=30)
-            else:
-                self.log_message(f"❌ Unsupported method: {method}")
-                return False
-            
-            # Log result in detail
-            success = response.status_code < 400
-            status_icon = "✅" if success else "❌"
-            self.log_message(f"\n{status_icon} STATUS CODE: {response.status_code}")
-            self.log_message(f"📊 RESPONSE TIME: {response.elapsed.total_seconds():.3f}s")
-            
-            # Show headers
-            self.log_message(f"\n📋 RESPONSE HEADERS:")
-            for key, value in response.headers.items():
-                self.log_message(f"   {key}: {value}")
-            
-            # Automatically extract and store XSRF token
-            if 'XSRF-TOKEN' in response.headers:
-                new_xsrf_token = response.headers['XSRF-TOKEN']
-                if new_xsrf_token and new_xsrf_token != self.xsrf_token:
-                    self.xsrf_token = new_xsrf_token
-                    self.log_message(f"🔐 XSRF Token updated from header: {self.xsrf_token[:20]}...")
-            
-            # Extract XSRF token from Set-Cookie header
-            if 'Set-Cookie' in response.headers:
-                set_cookie = response.headers['Set-Cookie']
-                if 'XSRF-TOKEN=' in set_cookie:
-                    # Extract XSRF token from Set-Cookie header
-                    import re
-                    match = re.search(r'XSRF-TOKEN=([^;]+)', set_cookie)
-                    if match:
-                        new_xsrf_token = match.group(1)
-                        if new_xsrf_token and new_xsrf_token != self.xsrf_token:
-                            self.xsrf_token = new_xsrf_token
-                            self.log_message(f"🔐 XSRF Token extracted from Set-Cookie: {self.xsrf_token[:20]}...")
-            
-            # Debug: Show current XSRF token status
-            if self.xsrf_token:
-                self.log_message(f"🔐 Current XSRF Token: {self.xsrf_token[:20]}...")
-            else:
-                self.log_message("⚠️ No XSRF Token available")
-            
-            # Show response body in detail
-            if response.text:
-                self.log_message(f"\n📄 RESPONSE BODY:")
-                try:
-                    response_json = response.json()
-                    formatted_json = json.dumps(response_json, indent=2, ensure_ascii=False)
-                    self.log_message(formatted_json)
-                except:
-                    self.log_message(response.text)
-            else:
-                self.log_message("📄 RESPONSE BODY: (Empty)")
-            
-            # Show request details
-            self.log_message(f"\n📤 REQUEST DETAILS:")
-            self.log_message(f"   Headers: {json.dumps(headers, indent=2)}")
-            if method == "GET" and api_info.get("params"):
-                self.log_message(f"   Query Params: {json.dumps(api_info['params'], indent=2)}")
-            
-            self.log_message(f"\n{'─'*100}")
-            return success
-        
-        except requests.exceptions.Timeout:
-            self.log_message(f"⏰ Timeout error (30 seconds)")
-            return False
-        except Exception as e:
-            self.log_message(f"💥 Error: {str(e)}")
-            import traceback
-            self.log_message(f"📋 Traceback: {traceback.format_exc()}")
-            return False
+        return self.runner.execute(category, method_name).success
     
     def execute_api_test_with_template(self, category: str, method_name: str, template_key: str):
         """Dynamic template ile API test et"""
-        template = self.dynamic_templates[template_key]
-        method = template["method"]
-        base_url = template.get('base_url', 'https://api.example.com')
-        path = template.get('path', '/')
-        
-        # Construct full URL - path should never be a full URL, only path portion
-        # Ensure base_url ends with / and path starts with /
-        if not base_url.endswith('/') and not path.startswith('/'):
-            url = f"{base_url}/{path}"
-        elif base_url.endswith('/') and path.startswith('/'):
-            url = f"{base_url}{path[1:]}"
-        else:
-            url = f"{base_url}{path}"
-        
-        # Parse headers
-        try:
-            headers = json.loads(template["headers"]) if template["headers"] else {}
-        except:
-            headers = {"Content-Type": "application/json"}
-        
-        # Clean Postman variables from headers
-        cleaned_headers = {}
-        for key, value in headers.items():
-            if isinstance(value, str):
-                cleaned_value = self._clean_postman_variables(value)
-                cleaned_headers[key] = cleaned_value
-            else:
-                cleaned_headers[key] = value
-        
-        headers = cleaned_headers
-        
-        # Add authentication tokens to headers
-        self._add_auth_headers(headers, "automation request")
-        
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.log_message(f"\n{'═'*100}")
-        self.log_message(f"🕐 {timestamp} | Testing: {category} > {method_name} (Dynamic Template)")
-        self.log_message(f"📡 Method: {method}")
-        self.log_message(f"🔗 URL: {url}")
-        self.log_message(f"{'═'*100}")
+        return self.runner.execute_template(category, method_name, self.dynamic_templates[template_key]).success
+    
+    def log_message(self, message: str):
+        """Queue a line for the results log (safe from any thread)"""
+        self.log_sink.log(message)
+    
+    def _drain_log(self):
+        """Once per frame: run callbacks queued by background work, then draw the queued log lines in one batch"""
+        while True:
+            try:
+                callback, args = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            callback(*args)
+        self._flush_log(LOG_FRAME_LINES)
+        self.root.after(LOG_FRAME_MS, self._drain_log)
+    
+    def call_on_ui(self, callback: Callable, *args):
+        """Run callback(*args) on the Tk thread (safe from any thread)"""
+        self.ui_queue.put((callback, args))
+    
+    def run_in_background(self, work: Callable, on_done: Optional[Callable] = None,
+                          on_error: Optional[Callable] = None):
+        """Run work() on a worker thread so the window never waits on the network.
+        
+        on_done(result) or on_error(exception) then runs on the Tk thread; only
+        they may touch widgets. Stop cancels the requests work() has in flight.
+        """
+        if not self.background_tasks and not self.automation_running:
+            self.runner.cancelled.clear()  # Left set by an earlier Stop
+        self.background_tasks += 1
+        self.stop_automation_button.config(state=tk.NORMAL)
         
-        try:
-            # Make API call
-            if method == "GET":
-                # Parse URL-encoded parameters
-                params = {}
-                if template["params"]:
-                    from urllib.parse import parse_qs
-                    parsed_params = parse_qs(template["params"])
-                    params = {key: value[0] if len(value) == 1 else value for key, value in parsed_params.items()}
-                response = self.session.get(url, headers=headers, params=params, verify=False, timeout=30)
-            elif method == "POST":
-                body = json.loads(template["body"]) if template["body"] else {}
-                response = self.session.post(url, headers=headers, json=body, verify=False, timeout=30)
-            elif method == "PUT":
-                body = json.loads(template["body"]) if template["body"] else {}
-                response = self.session.put(url, headers=headers, json=body, verify=False, timeout=30)
-            elif method == "DELETE":
-                # For DELETE method, use body if available, otherwise use params
-                if template["body"]:
-                    body = json.loads(template["body"])
-                    response = self.session.delete(url, headers=headers, json=body, verify=False, timeout=30)
-                elif template["params"]:
-                    # Parse URL-encoded parameters
-                    from urllib.parse import parse_qs
-                    parsed_params = parse_qs(template["params"])
-                    params = {key: value[0] if len(value) == 1 else value for key, value in parsed_params.items()}
-                    response = self.session.delete(url, headers=headers, params=params, verify=False, timeout=30)
-                else:
-                    response = self.session.delete(url, headers=headers, verify=False, timeout=30)
-            else:
-                self.log_message(f"❌ Unsupported method: {method}")
-                return False
-            
-            # Log result in detail
-            success = response.status_code < 400
-            status_icon = "✅" if success else "❌"
-            self.log_message(f"\n{status_icon} STATUS CODE: {response.status_code}")
-            self.log_message(f"📊 RESPONSE TIME: {response.elapsed.total_seconds():.3f}s")
-            
-            # Show headers
-            self.log_message(f"\n📋 RESPONSE HEADERS:")
-            for key, value in response.headers.items():
-                self.log_message(f"   {key}: {value}")
-            # Extract authentication tokens from response
-            self._extract_auth_tokens(response)
-            
-            # Show response body in detail
-            if response.text:
-                self.log_message(f"\n📄 RESPONSE BODY:")
-                try:
-                    response_json = response.json()
-                    formatted_json = json.dumps(response_json, indent=2, ensure_ascii=False)
-                    self.log_message(formatted_json)
-                except:
-                    self.log_message(response.text)
-            else:
-                self.log_message("📄 RESPONSE BODY: (Empty)")
-            
-            # Show request details
-            self.log_message(f"\n📤 REQUEST DETAILS (Dynamic Template):")
-            self.log_message(f"   Headers: {json.dumps(headers, indent=2)}")
-            if template["body"]:
-                try:
-                    body_data = json.loads(template["body"])
-                    self.log_message(f"   Body: {json.dumps(body_data, indent=2)}")
-                except:
-                    self.log_message(f"   Body: {template['body']}")
-            if template["params"]:
-                self.log_message(f"   Query Params: {template['params']}")
-            
-            self.log_message(f"\n{'─'*100}")
-            return success
+        def task():
+            try:
+                outcome = (on_done, work())
+            except Exception as e:
+                outcome = (on_error or self._background_error, e)
+            self.call_on_ui(self._background_done, *outcome)
         
-        except requests.exceptions.Timeout:
-            self.log_message(f"⏰ Timeout error (30 seconds)")
-            return False
-        except Exception as e:
-            self.log_message(f"💥 Error: {str(e)}")
-            import traceback
-            self.log_message(f"📋 Traceback: {traceback.format_exc()}")
-            return False
+        self.executor.submit(task)
     
-    def log_message(self, message: str):
-        self.result_text.insert(tk.END, message + "\n")
-        self.result_text.see(tk.END)
-        self.root.update()
+    def _background_done(self, callback, value):
+        self.background_tasks -= 1
+        if not self.background_tasks and not self.automation_running and self.load_runner is None:
+            self.stop_automation_button.config(state=tk.DISABLED)
+        if callback is not None:
+            callback(value)
+    
+    def _background_error(self, error):
+        self.log_message(f"❌ Error: {str(error)}")
+    
+    def on_close(self):
+        """Abort requests in flight so worker threads do not keep the process alive, then close"""
+        self.automation_running = False
+        if self.load_runner is not None:
+            self.load_runner.stop()
+        self.runner.cancel()
+        self.executor.shutdown(wait=False)
+        if self.runner.store is not None:
+            self.runner.end_run()
+            self.runner.store.close()
+        self.root.destroy()
+    
+    def _flush_log(self, limit=None):
+        items = self.log_sink.drain(limit)
+        if items:
+            self.result_view.append(items)
+    
+    def jump_to_request(self):
+        """Scroll the results log to the request number typed in the toolbar"""
+        self._flush_log()
+        count = self.result_view.request_count
+        try:
+            number = int(self.jump_var.get())
+        except ValueError:
+            messagebox.showwarning("Warning", f"Enter a request number (1-{count})")
+            return
+        if not self.result_view.jump_to_request(number):
+            messagebox.showwarning("Warning", f"Request #{number} is not in the log ({count} requests, "
+                                              f"the oldest {self.result_view.requests_dropped} were dropped)")
     
     def send_custom_request(self):
         """Custom request builder ile API çağrısı yap"""
@@ -895,13 +668,7 @@ class APITestAutomationTool:
             return
         
         # Construct full URL - path should never be a full URL, only path portion
-        # Ensure base_url ends with / and path starts with /
-        if not base_url.endswith('/') and not path.startswith('/'):
-            url = f"{base_url}/{path}"
-        elif base_url.endswith('/') and path.startswith('/'):
-            url = f"{base_url}{path[1:]}"
-        else:
-            url = f"{base_url}{path}"
+        url = join_url(base_url, path)
         
         # Validate URL format
         if not self._is_valid_url(url):
@@ -912,20 +679,6 @@ class APITestAutomationTool:
         try:
             headers_text = self.headers_text.get("1.0", tk.END).strip()
             headers = json.loads(headers_text) if headers_text else {}
-            
-            # Clean Postman variables from headers
-            cleaned_headers = {}
-            for key, value in headers.items():
-                if isinstance(value, str):
-                    cleaned_value = self._clean_postman_variables(value)
-                    cleaned_headers[key] = cleaned_value
-                else:
-                    cleaned_headers[key] = value
-            
-            headers = cleaned_headers
-            
-            # Add authentication headers
-            self._add_auth_headers(headers, "request")
         except json.JSONDecodeError:
             messagebox.showerror("Error", "Invalid JSON in headers")
             return
@@ -945,108 +698,15 @@ class APITestAutomationTool:
         if self.params_text.winfo_viewable():
             try:
                 params_text = self.params_text.get("1.0", tk.END).strip()
-                if params_text:
-                    # Parse URL-encoded parameters (param1=value1&param2=value2)
-                    from urllib.parse import parse_qs, unquote
-                    # Use parse_qs to handle URL-encoded parameters
-                    parsed_params = parse_qs(params_text)
-                    # Convert from {key: [value]} to {key: value} format
-                    params = {key: value[0] if len(value) == 1 else value for key, value in parsed_params.items()}
+                # Parse URL-encoded parameters (param1=value1&param2=value2)
+                params = parse_params(params_text)
             except Exception as e:
                 messagebox.showerror("Error", f"Invalid query parameters format: {str(e)}")
                 return
         
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.log_message(f"\n{'═'*100}")
-        self.log_message(f"🕐 {timestamp} | Custom Request")
-        self.log_message(f"📡 Method: {method}")
-        self.log_message(f"🔗 URL: {url}")
-        self.log_message(f"{'═'*100}")
-        
-        try:
-            # Make API call
-            if method == "GET":
-                response = self.session.get(url, headers=headers, params=params, verify=False, timeout=30)
-            elif method == "POST":
-                response = self.session.post(url, headers=headers, json=body, params=params, verify=False, timeout=30)
-            elif method == "PUT":
-                response = self.session.put(url, headers=headers, json=body, params=params, verify=False, timeout=30)
-            elif method == "DELETE":
-                # For DELETE method, use body if available, otherwise use params
-                if body:
-                    response = self.session.delete(url, headers=headers, json=body, verify=False, timeout=30)
-                elif params:
-                    response = self.session.delete(url, headers=headers, params=params, verify=False, timeout=30)
-                else:
-                    response = self.session.delete(url, headers=headers, verify=False, timeout=30)
-            else:
-                self.log_message(f"❌ Unsupported method: {method}")
-                return
-            
-            # Log result in detail
-            status_icon = "✅" if response.status_code < 400 else "❌"
-            self.log_message(f"\n{status_icon} STATUS CODE: {response.status_code}")
-            self.log_message(f"📊 RESPONSE TIME: {response.elapsed.total_seconds():.3f}s")
-            
-            # Show headers
-            self.log_message(f"\n📋 RESPONSE HEADERS:")
-            for key, value in response.headers.items():
-                self.log_message(f"   {key}: {value}")
-            
-            # Automatically extract and store XSRF token
-            if 'XSRF-TOKEN' in response.headers:
-                new_xsrf_token = response.headers['XSRF-TOKEN']
-                if new_xsrf_token and new_xsrf_token != self.xsrf_token:
-                    self.xsrf_token = new_xsrf_token
-                    self.log_message(f"🔐 XSRF Token updated from header: {self.xsrf_token[:20]}...")
-            
-            # Extract XSRF token from Set-Cookie header
-            if 'Set-Cookie' in response.headers:
-                set_cookie = response.headers['Set-Cookie']
-                if 'XSRF-TOKEN=' in set_cookie:
-                    # Extract XSRF token from Set-Cookie header
-                    import re
-                    match = re.search(r'XSRF-TOKEN=([^;]+)', set_cookie)
-                    if match:
-                        new_xsrf_token = match.group(1)
-                        if new_xsrf_token and new_xsrf_token != self.xsrf_token:
-                            self.xsrf_token = new_xsrf_token
-                            self.log_message(f"🔐 XSRF Token extracted from Set-Cookie: {self.xsrf_token[:20]}...")
-            
-            # Debug: Show current XSRF token status
-            if self.xsrf_token:
-                self.log_message(f"🔐 Current XSRF Token: {self.xsrf_token[:20]}...")
-            else:
-                self.log_message("⚠️ No XSRF Token available")
-            
-            # Show response body in detail
-            if response.text:
-                self.log_message(f"\n📄 RESPONSE BODY:")
-                try:
-                    response_json = response.json()
-                    formatted_json = json.dumps(response_json, indent=2, ensure_ascii=False)
-                    self.log_message(formatted_json)
-                except:
-                    self.log_message(response.text)
-            else:
-                self.log_message("📄 RESPONSE BODY: (Empty)")
-            
-            # Show request details
-            self.log_message(f"\n📤 REQUEST DETAILS:")
-            self.log_message(f"   Headers: {json.dumps(headers, indent=2)}")
-            if body:
-                self.log_message(f"   Body: {json.dumps(body, indent=2)}")
-            if params:
-                self.log_message(f"   Query Params: {json.dumps(params, indent=2)}")
-            
-            self.log_message(f"\n{'─'*100}")
-        
-        except requests.exceptions.Timeout:
-            self.log_message(f"⏰ Timeout error (30 seconds)")
-        except Exception as e:
-            self.log_message(f"💥 Error: {str(e)}")
-            import traceback
-            self.log_message(f"📋 Traceback: {traceback.format_exc()}")
+        # Clean Postman variables, add authentication headers and send
+        spec = self.runner.build_request("Custom Request", method, url, headers, body=body or None, params=params)
+        self.run_in_background(lambda: self.runner.send(spec, title="Custom Request"))
     
     def load_template(self):
         """Load template from selected API"""
@@ -1062,15 +722,14 @@ class APITestAutomationTool:
             return
 
         # Method'u set et
-        self.method_combo.set(api_info["method"])
+        self.method_combo.set(api_info.method)
 
         # Set base URL - use baseUrl variable from collection
-        method_key = f"{self.selected_category} - {self.selected_method}"
-        
-        if method_key in self.saved_urls:
+        saved_url = api_info.saved_value("base_url")
+        if saved_url is not None:
             # Save edilen URL'yi kullan
             self.base_url_entry.delete(0, tk.END)
-            self.base_url_entry.insert(0, self.saved_urls[method_key])
+            self.base_url_entry.insert(0, saved_url)
             self.log_message(f"💾 Loaded saved URL for: {self.selected_method}")
         else:
             # Use baseUrl variable from collection
@@ -1081,7 +740,7 @@ class APITestAutomationTool:
                 self.log_message(f"🔗 Loaded base URL from collection: {collection_base_url}")
             else:
                 # Fallback to API info if no collection variable
-                base_url = api_info.get("base_url", "")
+                base_url = api_info.base_url
                 if base_url:
                     cleaned_base_url = self._clean_postman_variables(base_url)
                     self.base_url_entry.delete(0, tk.END)
@@ -1091,39 +750,33 @@ class APITestAutomationTool:
                     self.log_message("⚠️ No base URL found in collection or API info")
 
         # Set path - use saved one if available, otherwise use path from API
-        if method_key in self.saved_paths:
+        saved_path = api_info.saved_value("path")
+        if saved_path is not None:
             # Save edilen path'i kullan
             self.path_entry.delete(0, tk.END)
-            self.path_entry.insert(0, self.saved_paths[method_key])
+            self.path_entry.insert(0, saved_path)
             self.log_message(f"💾 Loaded saved path for: {self.selected_method}")
         else:
             # Use path from API - take only the path part
-            original_path = api_info.get("path", "/")
+            original_path = api_info.path
             path = self._extract_path_from_url(original_path)
             self.path_entry.delete(0, tk.END)
             self.path_entry.insert(0, path)
 
         # Set headers - use saved ones if available, otherwise use headers from API
         
-        if method_key in self.saved_headers:
+        saved_headers = api_info.saved_value("headers")
+        if saved_headers is not None:
             # Use saved headers
             self.headers_text.delete("1.0", tk.END)
-            self.headers_text.insert("1.0", self.saved_headers[method_key])
+            self.headers_text.insert("1.0", saved_headers)
             self.log_message(f"💾 Loaded saved headers for: {self.selected_method}")
         else:
             # Use headers from API, automatically add XSRF token
-            headers = api_info.get("headers", {})
+            headers = api_info.headers
             
             # Clean Postman variables from headers
-            cleaned_headers = {}
-            for key, value in headers.items():
-                if isinstance(value, str):
-                    cleaned_value = self._clean_postman_variables(value)
-                    cleaned_headers[key] = cleaned_value
-                else:
-                    cleaned_headers[key] = value
-            
-            headers = cleaned_headers
+            headers = self.collection.clean_headers(headers)
             
             if self.xsrf_token:
                 headers["X-XSRF-TOKEN"] = self.xsrf_token
@@ -1134,14 +787,15 @@ class APITestAutomationTool:
             self.headers_text.insert("1.0", json.dumps(headers, indent=2))
 
         # Set body - use saved one if available, otherwise use body from API
-        if method_key in self.saved_bodies:
+        saved_body = api_info.saved_value("body")
+        if saved_body is not None:
             # Save edilen body'yi kullan
             self.body_text.delete("1.0", tk.END)
-            self.body_text.insert("1.0", self.saved_bodies[method_key])
+            self.body_text.insert("1.0", saved_body)
             self.log_message(f"💾 Loaded saved body for: {self.selected_method}")
         else:
             # Use body from API
-            body = api_info.get("body", "")
+            body = api_info.body
             if body:
                 # Try to prettify JSON if it's valid JSON
                 try:
@@ -1156,19 +810,20 @@ class APITestAutomationTool:
                     # If not valid JSON, use as is
                     self.body_text.delete("1.0", tk.END)
                     self.body_text.insert("1.0", body)
-            elif api_info["method"] in ["POST", "PUT"]:
+            elif api_info.method in ["POST", "PUT"]:
                 self.body_text.delete("1.0", tk.END)
                 self.body_text.insert("1.0", json.dumps({}, indent=2))
 
         # Set parameters - use saved ones if available, otherwise use params from API
-        if method_key in self.saved_params:
+        saved_params = api_info.saved_value("params")
+        if saved_params is not None:
             # Use saved params
             self.params_text.delete("1.0", tk.END)
-            self.params_text.insert("1.0", self.saved_params[method_key])
+            self.params_text.insert("1.0", saved_params)
             self.log_message(f"💾 Loaded saved params for: {self.selected_method}")
         else:
             # Use params from API
-            params = api_info.get("params", {})
+            params = api_info.params
             if params:
                 self.params_text.delete("1.0", tk.END)
                 # Convert params dict to URL-encoded format
@@ -1197,38 +852,66 @@ class APITestAutomationTool:
         if not file_path:
             return
         
+        self.log_message("📥 Importing API collection...")
+        # A quick scan lists the categories; only the selected ones are then read
+        progress = self._import_progress("🔍 Scanning collection")
+        self.run_in_background(lambda: self.collection.scan_categories(file_path, progress),
+                               lambda categories: self._collection_scanned(file_path, categories),
+                               self._collection_read_failed)
+    
+    def _import_progress(self, label):
+        """Progress callback for reading the collection file, updating the import status as `label... N%`"""
+        self.import_status_label.config(text=f"{label}... 0%", foreground="gray")
+        shown = [-1]
+        
+        def progress(read_bytes, size):
+            # Worker thread: one label update per percent, never per item
+            percent = read_bytes * 100 // max(size, 1)
+            if percent != shown[0]:
+                shown[0] = percent
+                self.call_on_ui(lambda: self.import_status_label.config(text=f"{label}... {percent}%"))
+        return progress
+    
+    def _collection_read_failed(self, error):
+        self.log_message(f"❌ Error importing collection: {str(error)}")
+        self.import_status_label.config(text="❌ Import failed", foreground="red")
+    
+    def _collection_scanned(self, file_path, available_categories):
+        """Categories listed: pick some, then read only their requests"""
+        if not available_categories:
+            self.log_message("⚠️ No categories found in the collection.")
+            self.import_status_label.config(text="⚠️ No categories found", foreground="orange")
+            return
+        
+        # Show category selection dialog
+        selected_categories = self._show_category_selection_dialog(available_categories)
+        
+        if not selected_categories:
+            self.log_message("❌ No categories selected. Import cancelled.")
+            self.import_status_label.config(text="Import cancelled", foreground="gray")
+            return
+        
+        progress = self._import_progress("📥 Reading collection")
+        self.run_in_background(lambda: self.collection.read(file_path, selected_categories, progress),
+                               lambda found: self._collection_read(found, selected_categories),
+                               self._collection_read_failed)
+    
+    def _collection_read(self, found, selected_categories):
+        """Selected categories read in one pass: add them"""
         try:
-            self.log_message("📥 Importing API collection...")
-            
-            # Read JSON file
-            with open(file_path, 'r', encoding='utf-8') as f:
-                collection_data = json.load(f)
-            
-            # First find categories in collection
-            available_categories = self._find_categories_in_collection(collection_data)
-            
-            if not available_categories:
-                self.log_message("⚠️ No categories found in the collection.")
-                self.import_status_label.config(text="⚠️ No categories found", foreground="orange")
-                return
-            
-            # Show category selection dialog
-            selected_categories = self._show_category_selection_dialog(available_categories)
-            
-            if not selected_categories:
-                self.log_message("❌ No categories selected. Import cancelled.")
-                return
+            self.login_methods = found.login_methods
+            if self.login_methods:
+                self.log_message(f"🔐 Found {len(self.login_methods)} login methods")
             
             # Import selected categories
-            imported_count = self._parse_api_collection(collection_data, selected_categories)
+            imported_count = self.collection.add(found, selected_categories)
             
             if imported_count > 0:
                 self.collection_loaded = True
                 self.log_message(f"✅ Successfully imported {imported_count} API methods from {len(selected_categories)} categories!")
                 self.log_message(f"📊 Imported categories: {list(self.imported_apis.keys())}")
                 
-                # Clear method list (remove old values)
-                self.method_listbox.delete(0, tk.END)
+                # Clear selection (the tree is rebuilt below)
                 self.selected_category = ""
                 self.selected_method = ""
                 
@@ -1268,8 +951,6 @@ class APITestAutomationTool:
         
         # Clear collection
         self.imported_apis = {}
-        self.category_structure = {}
-        self.expanded_categories.clear()
         self.collection_loaded = False
         self.collection_variables = {}
         self.auth_token = ""  # Clear auth token when collection is removed
@@ -1279,8 +960,6 @@ class APITestAutomationTool:
         # Remove button stays active
         self.export_collection_button.config(state=tk.DISABLED)
         
-        # Method listesini temizle
-        self.method_listbox.delete(0, tk.END)
         self.selected_category = ""
         self.selected_method = ""
         
@@ -1292,17 +971,12 @@ class APITestAutomationTool:
         
         # Automation listesini temizle
         self.automation_methods.clear()
+        self.automation_dependencies.clear()
         self.method_order_listbox.delete(0, tk.END)
         
         # Dynamic templates'i temizle
         self.dynamic_templates.clear()
-        
-        # Clear saved values
-        self.saved_headers.clear()
-        self.saved_bodies.clear()
-        self.saved_params.clear()
-        self.saved_urls.clear()
-        self.saved_paths.clear()
+        self.runner.forget_prepared()
         
         self.log_message("🗑️ Imported collection removed successfully!")
         self.log_message("🔄 All fields cleared. Please import a new collection.")
@@ -1359,135 +1033,9 @@ class APITestAutomationTool:
                 "item": []
             }
             
-            # Group categories by main category
-            main_categories = {}
-            for category_key in self.imported_apis.keys():
-                methods = self.imported_apis[category_key]
-                
-                # Parse category key (format: "MainCategory|SubCategory" or just "MainCategory")
-                if '|' in category_key:
-                    main_category, subcategory = category_key.split('|', 1)
-                else:
-                    main_category = category_key
-                    subcategory = "Main"
-                
-                # Initialize main category if not exists
-                if main_category not in main_categories:
-                    main_categories[main_category] = {}
-                
-                # Add subcategory to main category
-                main_categories[main_category][subcategory] = methods
-            
-            # Create folder structure for each main category
-            for main_category, subcategories in main_categories.items():
-                folder = {
-                    "name": main_category,
-                    "item": []
-                }
-                
-                # Add subcategories and their methods
-                for subcategory, methods in subcategories.items():
-                    if subcategory != "Main" or len(subcategories) == 1:
-                        # Create subcategory folder or add methods directly
-                        if subcategory != "Main":
-                            subfolder = {
-                                "name": subcategory,
-                                "item": []
-                            }
-                        else:
-                            subfolder = folder
-                        
-                        # Add methods to subcategory
-                        for method_name, api_info in methods.items():
-                            method_key = f"{category_key} - {method_name}"
-                            
-                            # Get saved values or use original values
-                            saved_url = self.saved_urls.get(method_key, api_info.get('base_url', 'https://api.example.com'))
-                            saved_path = self.saved_paths.get(method_key, api_info.get('path', '/'))
-                            saved_headers = self.saved_headers.get(method_key, json.dumps(api_info.get('headers', {}), indent=2))
-                            saved_body = self.saved_bodies.get(method_key, api_info.get('body', ''))
-                            saved_params = self.saved_params.get(method_key, json.dumps(api_info.get('params', {}), indent=2))
-                            
-                            # Construct full URL - path should never be a full URL, only path portion
-                            if not saved_url.endswith('/') and not saved_path.startswith('/'):
-                                full_url = f"{saved_url}/{saved_path}"
-                            elif saved_url.endswith('/') and saved_path.startswith('/'):
-                                full_url = f"{saved_url}{saved_path[1:]}"
-                            else:
-                                full_url = f"{saved_url}{saved_path}"
-                            
-                            # Parse headers
-                            try:
-                                headers_dict = json.loads(saved_headers) if saved_headers else {}
-                            except:
-                                headers_dict = api_info.get('headers', {})
-                            
-                            # Parse body
-                            try:
-                                body_dict = json.loads(saved_body) if saved_body else {}
-                            except:
-                                body_dict = {}
-                            
-                            # Parse params (URL-encoded format)
-                            params_dict = {}
-                            if saved_params:
-                                from urllib.parse import parse_qs
-                                try:
-                                    parsed_params = parse_qs(saved_params)
-                                    params_dict = {key: value[0] if len(value) == 1 else value for key, value in parsed_params.items()}
-                                except:
-                                    params_dict = api_info.get('params', {})
-                            else:
-                                params_dict = api_info.get('params', {})
-                            
-                            # Create request item
-                            request_item = {
-                                "name": method_name,
-                                "request": {
-                                    "method": api_info.get('method', 'GET'),
-                                    "header": [
-                                        {
-                                            "key": key,
-                                            "value": value,
-                                            "enabled": True
-                                        }
-                                        for key, value in headers_dict.items()
-                                    ],
-                                    "url": {
-                                        "raw": full_url,
-                                        "protocol": full_url.split('://')[0] if '://' in full_url else 'https',
-                                        "host": full_url.split('://')[1].split('/')[0] if '://' in full_url else full_url.split('/')[0],
-                                        "path": full_url.split('://')[1].split('/')[1:] if '://' in full_url and '/' in full_url.split('://')[1] else []
-                                    }
-                                }
-                            }
-                            
-                            # Add body if present
-                            if body_dict and api_info.get('method') in ['POST', 'PUT']:
-                                request_item["request"]["body"] = {
-                                    "mode": "raw",
-                                    "raw": json.dumps(body_dict, indent=2)
-                                }
-                            
-                            # Add query parameters if present
-                            if params_dict:
-                                request_item["request"]["url"]["query"] = [
-                                    {
-                                        "key": key,
-                                        "value": value,
-                                        "enabled": True
-                                    }
-                                    for key, value in params_dict.items()
-                                ]
-                            
-                            subfolder["item"].append(request_item)
-                        
-                        # Add subfolder to main folder if it's a subcategory
-                        if subcategory != "Main":
-                            folder["item"].append(subfolder)
-                    
-                    # Add main folder to collection
-                    collection["item"].append(folder)
+            # Folders nest like the imported ones (category keys are folder paths)
+            index = CategoryIndex(self.imported_apis)
+            collection["item"] = [self._export_folder(index, node) for node in index.roots]
             
             # Write to file
             with open(file_path, 'w', encoding='utf-8') as f:
@@ -1503,38 +1051,96 @@ class APITestAutomationTool:
             self.log_message(f"📋 Traceback: {traceback.format_exc()}")
             messagebox.showerror("Error", f"Failed to export collection: {str(e)}")
     
-    def _find_categories_in_collection(self, collection_data):
-        """Find all categories in the collection"""
-        categories = set()  # Use set to avoid duplicates
+    def _export_folder(self, index: CategoryIndex, node: str) -> Dict:
+        """Postman folder of a category node: its methods, then its subfolders"""
+        return {
+            "name": CategoryIndex.name(node),
+            "item": [self._export_request(method_name, api_info) for method_name, api_info in index.methods(node).items()]
+                    + [self._export_folder(index, child) for child in index.children[node]]
+        }
+    
+    def _export_request(self, method_name: str, api_info) -> Dict:
+        """Postman request item of a method, with its saved values"""
+        # Get saved values or use original values
+        saved_url = api_info.saved_value("base_url", api_info.base_url)
+        saved_path = api_info.saved_value("path", api_info.path)
+        saved_headers = api_info.saved_value("headers", json.dumps(api_info.headers, indent=2))
+        saved_body = api_info.saved_value("body", api_info.body)
+        saved_params = api_info.saved_value("params", json.dumps(api_info.params, indent=2))
+        
+        # Construct full URL - path should never be a full URL, only path portion
+        if not saved_url.endswith('/') and not saved_path.startswith('/'):
+            full_url = f"{saved_url}/{saved_path}"
+        elif saved_url.endswith('/') and saved_path.startswith('/'):
+            full_url = f"{saved_url}{saved_path[1:]}"
+        else:
+            full_url = f"{saved_url}{saved_path}"
         
+        # Parse headers
         try:
-            items = collection_data.get('item', [])
-            self.log_message(f"🔍 Found {len(items)} items in collection")
-            
-            def process_items(items_list, level=0):
-                for item in items_list:
-                    if item.get('item'):  # This is a folder
-                        folder_name = item.get('name', '')
-                        if folder_name:
-                            # Only add top-level folders to avoid duplicates
-                            if level == 0:
-                                categories.add(folder_name)
-                                self.log_message(f"📁 Found main category: {folder_name}")
-                            # Recursively process subfolders
-                            process_items(item.get('item', []), level + 1)
-                    else:
-                        # Single request item
-                        request_name = item.get('name', '')
-                        self.log_message(f"📄 Found single request: {request_name}")
-            
-            process_items(items)
-                        
-        except Exception as e:
-            self.log_message(f"❌ Error finding categories: {str(e)}")
-            
-        categories_list = list(categories)
-        self.log_message(f"📋 Total main categories found: {len(categories_list)}")
-        return categories_list
+            headers_dict = json.loads(saved_headers) if saved_headers else {}
+        except:
+            headers_dict = api_info.headers
+        
+        # Parse body
+        try:
+            body_dict = json.loads(saved_body) if saved_body else {}
+        except:
+            body_dict = {}
+        
+        # Parse params (URL-encoded format)
+        params_dict = {}
+        if saved_params:
+            from urllib.parse import parse_qs
+            try:
+                parsed_params = parse_qs(saved_params)
+                params_dict = {key: value[0] if len(value) == 1 else value for key, value in parsed_params.items()}
+            except:
+                params_dict = api_info.params
+        else:
+            params_dict = api_info.params
+        
+        # Create request item
+        request_item = {
+            "name": method_name,
+            "request": {
+                "method": api_info.method,
+                "header": [
+                    {
+                        "key": key,
+                        "value": value,
+                        "enabled": True
+                    }
+                    for key, value in headers_dict.items()
+                ],
+                "url": {
+                    "raw": full_url,
+                    "protocol": full_url.split('://')[0] if '://' in full_url else 'https',
+                    "host": full_url.split('://')[1].split('/')[0] if '://' in full_url else full_url.split('/')[0],
+                    "path": full_url.split('://')[1].split('/')[1:] if '://' in full_url and '/' in full_url.split('://')[1] else []
+                }
+            }
+        }
+        
+        # Add body if present
+        if body_dict and api_info.method in ['POST', 'PUT']:
+            request_item["request"]["body"] = {
+                "mode": "raw",
+                "raw": json.dumps(body_dict, indent=2)
+            }
+        
+        # Add query parameters if present
+        if params_dict:
+            request_item["request"]["url"]["query"] = [
+                {
+                    "key": key,
+                    "value": value,
+                    "enabled": True
+                }
+                for key, value in params_dict.items()
+            ]
+        
+        return request_item
     
     def _show_category_selection_dialog(self, categories):
         """Show dialog to select categories"""
@@ -1625,426 +1231,36 @@ class APITestAutomationTool:
         dialog.wait_window()
         
         return selected_categories
-
-    def _parse_api_collection(self, collection_data, selected_categories=None):
-        """Parse API collection and extract APIs"""
-        imported_count = 0
-        
-        try:
-            # Extract collection variables (like baseUrl)
-            self.collection_variables = {}
-            variables = collection_data.get('variable', [])
-            for var in variables:
-                if isinstance(var, dict) and 'key' in var and 'value' in var:
-                    self.collection_variables[var['key']] = var['value']
-            
-            if self.collection_variables:
-                self.log_message(f"🔧 Found collection variables: {list(self.collection_variables.keys())}")
-            
-            # Check collection items
-            items = collection_data.get('item', [])
-            self.log_message(f"🔍 Processing {len(items)} items for import")
-            self.log_message(f"📋 Selected categories: {selected_categories}")
-            
-            for item in items:
-                # Folder (category) check
-                if item.get('item'):  # This is a folder
-                    folder_name = item.get('name', '')
-                    
-                    # Only process selected categories
-                    if selected_categories is None or folder_name in selected_categories:
-                        self.log_message(f"📁 Processing folder: {folder_name}")
-                        
-                        # Check if folder has items
-                        folder_items = item.get('item', [])
-                        self.log_message(f"   📋 Found {len(folder_items)} items in folder: {folder_name}")
-                        
-                        if len(folder_items) == 0:
-                            self.log_message(f"   ⚠️ No API methods found in folder: {folder_name}")
-                        
-                        # Process requests in folder (recursive for nested folders)
-                        for request_item in folder_items:
-                            if self._parse_request_item_recursive(request_item, folder_name):
-                                imported_count += 1
-                    else:
-                        self.log_message(f"⏭️ Skipping folder: {folder_name} (not selected)")
-                else:
-                    # Single request - only import if no category selection or if "Imported APIs" is selected
-                    if selected_categories is None or "Imported APIs" in selected_categories:
-                        if self._parse_request_item(item, "Imported APIs"):
-                            imported_count += 1
-                        
-        except Exception as e:
-            self.log_message(f"❌ Error parsing collection: {str(e)}")
-        
-            
-        return imported_count
-    
-    def _find_login_methods(self, collection_data):
-        """Find login methods in the collection and add them to dropdown"""
-        try:
-            self.login_methods = {}
-            items = collection_data.get('item', [])
-            
-            for item in items:
-                self._search_login_methods_recursive(item, "")
-            
-            # Update dropdown
-            if self.login_methods:
-                login_names = list(self.login_methods.keys())
-                self.login_method_combo['values'] = login_names
-                if login_names:
-                    self.login_method_combo.set(login_names[0])  # Select first one by default
-                    self.on_login_method_change()
-                self.log_message(f"🔐 Found {len(login_names)} login methods: {', '.join(login_names)}")
-            else:
-                self.login_method_combo['values'] = ["Default Login"]
-                self.login_method_combo.set("Default Login")
-                self.log_message("🔐 No login methods found, using default")
-                
-        except Exception as e:
-            self.log_message(f"❌ Error finding login methods: {str(e)}")
-    
-    def _search_login_methods_recursive(self, item, path):
-        """Recursively search for login methods"""
-        try:
-            if 'request' in item:
-                # It's a request
-                request_name = item.get('name', '')
-                request_data = item['request']
-                
-                # Check if this looks like a login method
-                if self._is_login_method(request_name, request_data):
-                    full_name = f"{path}/{request_name}" if path else request_name
-                    method = request_data.get('method', 'POST')
-                    url_path = request_data.get('url', {}).get('raw', '')
-                    
-                    # Extract headers
-                    headers = {}
-                    for header in request_data.get('header', []):
-                        if header.get('enabled', True):
-                            headers[header.get('key', '')] = header.get('value', '')
-                    
-                    # Extract body
-                    body = '{}'
-                    if 'body' in request_data:
-                        body_data = request_data['body']
-                        if body_data.get('mode') == 'raw':
-                            body = body_data.get('raw', '{}')
-                    
-                    self.login_methods[full_name] = {
-                        'name': full_name,
-                        'method': method,
-                        'url_path': url_path,
-                        'headers': headers,
-                        'body': body
-                    }
-            
-            elif 'item' in item:
-                # It's a folder, search recursively
-                folder_name = item.get('name', '')
-                new_path = f"{path}/{folder_name}" if path else folder_name
-                for sub_item in item['item']:
-                    self._search_login_methods_recursive(sub_item, new_path)
-                    
-        except Exception as e:
-            self.log_message(f"❌ Error searching login methods: {str(e)}")
-    
-    def _is_login_method(self, name, request_data):
-        """Check if a request looks like a login method"""
-        name_lower = name.lower()
-        login_keywords = ['login', 'auth', 'authenticate', 'signin', 'sign-in', 'token', 'session']
-        
-        # Check name
-        if any(keyword in name_lower for keyword in login_keywords):
-            return True
-        
-        # Check URL
-        url = request_data.get('url', {})
-        if isinstance(url, dict):
-            url_str = url.get('raw', '').lower()
-            if any(keyword in url_str for keyword in login_keywords):
-                return True
-        
-        return False
-    
-    def _parse_request_item_recursive(self, request_item, category_name, subcategory_name=None):
-        """Parse request item recursively (handles nested folders)"""
-        try:
-            # Check if it's a request (has 'request' key)
-            if 'request' in request_item:
-                # Use the correct category structure
-                if subcategory_name:
-                    full_category_key = f"{category_name}|{subcategory_name}"
-                else:
-                    full_category_key = category_name
-                return self._parse_request_item(request_item, full_category_key)
-            
-            # Check if it's a nested folder (has 'item' key)
-            elif 'item' in request_item:
-                subfolder_name = request_item.get('name', 'Unknown')
-                self.log_message(f"    📂 Processing subfolder: {subfolder_name}")
-                
-                subfolder_items = request_item.get('item', [])
-                self.log_message(f"      📋 Found {len(subfolder_items)} items in subfolder: {subfolder_name}")
-                
-                imported_count = 0
-                for sub_item in subfolder_items:
-                    # Pass the subfolder name as the subcategory for nested items
-                    if self._parse_request_item_recursive(sub_item, category_name, subfolder_name):
-                        imported_count += 1
-                
-                if imported_count == 0:
-                    self.log_message(f"      ⚠️ No API methods found in subfolder: {subfolder_name}")
-                else:
-                    self.log_message(f"      ✅ Imported {imported_count} methods from subfolder: {subfolder_name}")
-                
-                return imported_count > 0
-                
-        except Exception as e:
-            self.log_message(f"  ❌ Error parsing item recursively: {str(e)}")
-            
-        return False
-
-    def _parse_request_item(self, request_item, category_name):
-        """Parse single request item"""
-        try:
-            request_name = request_item.get('name', '')
-            request_data = request_item.get('request', {})
-            
-            if not request_data:
-                return False
-            
-            # Method and URL
-            method = request_data.get('method', 'GET')
-            url_data = request_data.get('url', {})
-            
-            # Build URL path and clean Postman variables
-            if isinstance(url_data, str):
-                full_url = url_data
-            else:
-                full_url = url_data.get('raw', '') or url_data.get('path', '')
-                if isinstance(full_url, list):
-                    full_url = '/' + '/'.join(full_url)
-            
-            # Clean Postman variables from the URL
-            cleaned_url = self._clean_postman_variables(full_url)
-            
-            # Extract base URL and path
-            if '://' in cleaned_url:
-                # It's a full URL, extract base URL and path
-                try:
-                    from urllib.parse import urlparse
-                    parsed = urlparse(cleaned_url)
-                    base_url = f"{parsed.scheme}://{parsed.netloc}"
-                    path = parsed.path if parsed.path else "/"
-                except:
-                    # Fallback: simple string manipulation
-                    parts = cleaned_url.split('/', 3)
-                    if len(parts) >= 3:
-                        base_url = f"{parts[0]}//{parts[2]}"
-                        path = '/' + parts[3] if len(parts) > 3 else "/"
-                    else:
-                        base_url = "https://api.example.com"
-                        path = "/"
-            else:
-                # It's just a path
-                base_url = "https://api.example.com"
-                path = cleaned_url if cleaned_url.startswith('/') else '/' + cleaned_url
-            
-            # Headers
-            headers = {}
-            for header in request_data.get('header', []):
-                if header.get('enabled', True):
-                    headers[header.get('key', '')] = header.get('value', '')
-            
-            # Body
-            body = ""
-            body_data = request_data.get('body', {})
-            if body_data:
-                if body_data.get('mode') == 'raw':
-                    body = body_data.get('raw', '')
-                elif body_data.get('mode') == 'formdata':
-                    # Convert form data to JSON
-                    form_data = {}
-                    for form_item in body_data.get('formdata', []):
-                        if form_item.get('enabled', True):
-                            form_data[form_item.get('key', '')] = form_item.get('value', '')
-                    body = json.dumps(form_data, indent=2)
-            
-            # Query parameters
-            params = {}
-            for param in request_data.get('url', {}).get('query', []):
-                if param.get('enabled', True):
-                    params[param.get('key', '')] = param.get('value', '')
-            
-            # Add to imported APIs (preserve duplicates by uniquifying the name)
-            if category_name not in self.imported_apis:
-                self.imported_apis[category_name] = {}
-            
-            unique_name = request_name
-            if unique_name in self.imported_apis[category_name]:
-                counter = 2
-                while f"{request_name} ({counter})" in self.imported_apis[category_name]:
-                    counter += 1
-                unique_name = f"{request_name} ({counter})"
-            
-            self.imported_apis[category_name][unique_name] = {
-                "method": method,
-                "base_url": base_url,
-                "path": path,
-                "headers": headers,
-                "body": body,
-                "params": params
-            }
-            
-            self.log_message(f"  ✅ Imported: {unique_name} ({method} {base_url}{path})")
-            return True
-            
-        except Exception as e:
-            self.log_message(f"  ❌ Error parsing request: {str(e)}")
-            return False
     
     def _update_category_list(self):
-        """Update category list with subcategories (initially collapsed)"""
-        # Clear existing categories
-        self.category_listbox.delete(0, tk.END)
+        """Index the categories as a folder tree and show its top-level folders (subfolders are filled in on open)"""
+        self.api_tree.delete(*self.api_tree.get_children())
+        self._tree_folders.clear()
+        self._tree_methods.clear()
+        self._tree_filled.clear()
+        self.category_index = CategoryIndex(self.imported_apis)
         
         if self.imported_apis:
-            # Group APIs by category and subcategory
-            category_structure = {}
-            for category_key in self.imported_apis.keys():
-                methods = self.imported_apis[category_key]
-                
-                # Parse category key (format: "MainCategory|SubCategory" or just "MainCategory")
-                if '|' in category_key:
-                    main_category, subcategory = category_key.split('|', 1)
-                else:
-                    main_category = category_key
-                    subcategory = "Main"  # Use "Main" instead of "General" for top-level categories
-                
-                # Initialize main category if not exists
-                if main_category not in category_structure:
-                    category_structure[main_category] = {}
-                
-                # Initialize subcategory if not exists
-                if subcategory not in category_structure[main_category]:
-                    category_structure[main_category][subcategory] = []
-                
-                # Add all methods (including duplicates with suffixes) to the subcategory preserving order
-                for method_name in methods.keys():
-                    category_structure[main_category][subcategory].append(method_name)
-                
+            for node in sorted(self.category_index.roots):
+                self._insert_folder("", node)
             
-            # Store category structure for later use
-            self.category_structure = category_structure
-            
-            # Display only main categories (subcategories collapsed initially)
-            for category in sorted(category_structure.keys()):
-                total_methods = sum(len(methods) for methods in category_structure[category].values())
-                self.category_listbox.insert(tk.END, f"📁 {category} ({total_methods} methods)")
-            
-            self.log_message(f"📋 Updated category list with {len(category_structure)} categories (subcategories collapsed)")
+            self.log_message(f"📋 Updated category list with {len(self.category_index.roots)} categories (subcategories collapsed)")
         else:
             # No collection imported - show message
-            self.category_listbox.insert(tk.END, "⚠️ No collection imported")
+            self.api_tree.insert("", tk.END, text="⚠️ No collection imported")
             self.log_message("⚠️ Please import an API collection first")
     
     def _clean_postman_variables(self, url_or_path):
         """Replace Postman variables with actual values from collection variables"""
-        if not url_or_path:
-            return ""
-        
-        import re
-        
-        # Replace collection variables with their values
-        cleaned = url_or_path
-        for var_name, var_value in self.collection_variables.items():
-            pattern = r'\{\{' + re.escape(var_name) + r'\}\}'
-            cleaned = re.sub(pattern, var_value, cleaned)
-        
-        # Remove any remaining unresolved variables
-        cleaned = re.sub(r'\{\{[^}]+\}\}', '', cleaned)
-        
-        # Fix protocol issues - ensure https:// or http:// is properly formatted
-        cleaned = re.sub(r'https?:/+', 'https://', cleaned)
-        
-        # Clean up any double slashes that might result from variable removal, but preserve protocol
-        # Split by protocol first to avoid breaking https://
-        if '://' in cleaned:
-            protocol, rest = cleaned.split('://', 1)
-            # Clean up multiple slashes in the rest part
-            rest = re.sub(r'/+', '/', rest)
-            cleaned = f"{protocol}://{rest}"
-        else:
-            # If no protocol, just clean up multiple slashes
-            cleaned = re.sub(r'/+', '/', cleaned)
-        
-        return cleaned.strip()
+        return self.collection.clean_variables(url_or_path)
     
     def _add_auth_headers(self, headers, context=""):
         """Add authentication headers (Bearer token, XSRF token) to request headers"""
-        # Add Bearer token if available and not already present
-        if self.auth_token and not headers.get("Authorization"):
-            headers["Authorization"] = f"Bearer {self.auth_token}"
-            self.log_message(f"🔐 Added Bearer Token to {context}: {self.auth_token[:20]}...")
-        
-        # Add XSRF token if available and not already present
-        if self.xsrf_token and (not headers.get("X-XSRF-TOKEN") or headers.get("X-XSRF-TOKEN") == "{{xsrf_token}}" or headers.get("X-XSRF-TOKEN") == ""):
-            headers["X-XSRF-TOKEN"] = self.xsrf_token
-            self.log_message(f"🔐 Added XSRF Token to {context}: {self.xsrf_token[:20]}...")
-        
-        # Log if no tokens available
-        if not self.auth_token and not self.xsrf_token:
-            self.log_message(f"⚠️ No authentication tokens available for {context}")
+        self.runner.add_auth_headers(headers, context)
     
     def _extract_auth_tokens(self, response):
         """Extract authentication tokens from response (XSRF, Bearer, etc.)"""
-        # Extract Bearer token from response body (for login responses)
-        try:
-            if response.text:
-                response_json = response.json()
-                if 'token' in response_json:
-                    new_auth_token = response_json['token']
-                    if new_auth_token and new_auth_token != self.auth_token:
-                        self.auth_token = new_auth_token
-                        self.log_message(f"🔐 Auth Token extracted from response: {self.auth_token[:20]}...")
-        except:
-            pass
-        
-        # Extract XSRF token from headers
-        if 'XSRF-TOKEN' in response.headers:
-            new_xsrf_token = response.headers['XSRF-TOKEN']
-            if new_xsrf_token and new_xsrf_token != self.xsrf_token:
-                self.xsrf_token = new_xsrf_token
-                self.log_message(f"🔐 XSRF Token updated from header: {self.xsrf_token[:20]}...")
-        
-        # Extract XSRF token from cookies
-        if hasattr(response, 'cookies') and 'XSRF-TOKEN' in response.cookies:
-            new_xsrf_cookie = response.cookies.get('XSRF-TOKEN')
-            if new_xsrf_cookie and new_xsrf_cookie != self.xsrf_token:
-                self.xsrf_token = new_xsrf_cookie
-                self.log_message(f"🔐 XSRF Token updated from cookie: {self.xsrf_token[:20]}...")
-        
-        # Extract XSRF token from Set-Cookie header
-        if 'Set-Cookie' in response.headers:
-            set_cookie = response.headers['Set-Cookie']
-            if 'XSRF-TOKEN=' in set_cookie:
-                import re
-                match = re.search(r'XSRF-TOKEN=([^;]+)', set_cookie)
-                if match:
-                    new_xsrf_token = match.group(1)
-                    if new_xsrf_token and new_xsrf_token != self.xsrf_token:
-                        self.xsrf_token = new_xsrf_token
-                        self.log_message(f"🔐 XSRF Token extracted from Set-Cookie: {self.xsrf_token[:20]}...")
-        
-        # Debug: Show current token status
-        if self.auth_token:
-            self.log_message(f"🔐 Current Auth Token: {self.auth_token[:20]}...")
-        if self.xsrf_token:
-            self.log_message(f"🔐 Current XSRF Token: {self.xsrf_token[:20]}...")
-        if not self.auth_token and not self.xsrf_token:
-            self.log_message("⚠️ No authentication tokens available")
+        self.runner.extract_auth_tokens(response)
     
     def _is_valid_url(self, url):
         """Validate URL format"""
@@ -2105,9 +1321,9 @@ class APITestAutomationTool:
     
     def _update_field_visibility(self, api_info):
         """Show/hide fields based on method type"""
-        method = api_info.get("method", "GET")
-        has_body = api_info.get("body", "") != ""
-        has_params = api_info.get("params", {}) != {}
+        method = api_info.method
+        has_body = api_info.body != ""
+        has_params = api_info.params != {}
         
         # Show/hide body field
         if has_body or method in ["POST", "PUT"]:
@@ -2143,11 +1359,12 @@ class APITestAutomationTool:
             return
         
         method_key = f"{self.selected_category} - {self.selected_method}"
+        endpoint = self.imported_apis[self.selected_category][self.selected_method]
         
         # Use saved values first, otherwise use current form values
-        headers_text = self.saved_headers.get(method_key, self.headers_text.get("1.0", tk.END).strip())
-        base_url = self.saved_urls.get(method_key, self.base_url_entry.get().strip())
-        path = self.saved_paths.get(method_key, self.path_entry.get().strip())
+        headers_text = endpoint.saved_value("headers", self.headers_text.get("1.0", tk.END).strip())
+        base_url = endpoint.saved_value("base_url", self.base_url_entry.get().strip())
+        path = endpoint.saved_value("path", self.path_entry.get().strip())
         
         # Parse and clean headers
         try:
@@ -2156,15 +1373,7 @@ class APITestAutomationTool:
             headers = {}
         
         # Clean Postman variables from headers
-        cleaned_headers = {}
-        for key, value in headers.items():
-            if isinstance(value, str):
-                cleaned_value = self._clean_postman_variables(value)
-                cleaned_headers[key] = cleaned_value
-            else:
-                cleaned_headers[key] = value
-        
-        headers = cleaned_headers
+        headers = self.collection.clean_headers(headers)
         
         # Ensure XSRF token is properly set
         if self.xsrf_token and (not headers.get("X-XSRF-TOKEN") or headers.get("X-XSRF-TOKEN") == "{{xsrf_token}}" or headers.get("X-XSRF-TOKEN") == ""):
@@ -2172,15 +1381,15 @@ class APITestAutomationTool:
         
         # For body - use empty string if field is hidden
         if self.body_text.winfo_viewable():
-            body = self.saved_bodies.get(method_key, self.body_text.get("1.0", tk.END).strip())
+            body = endpoint.saved_value("body", self.body_text.get("1.0", tk.END).strip())
         else:
-            body = self.saved_bodies.get(method_key, "")
+            body = endpoint.saved_value("body", "")
         
         # For params - use empty string if field is hidden
         if self.params_text.winfo_viewable():
-            params = self.saved_params.get(method_key, self.params_text.get("1.0", tk.END).strip())
+            params = endpoint.saved_value("params", self.params_text.get("1.0", tk.END).strip())
         else:
-            params = self.saved_params.get(method_key, "")
+            params = endpoint.saved_value("params", "")
         
         current_template = {
             "method": self.method_combo.get(),
@@ -2196,21 +1405,18 @@ class APITestAutomationTool:
         self.log_message(f"🔄 Dynamic template updated for: {self.selected_method}")
         
         # Log saved values if they exist
-        saved_items = []
-        if method_key in self.saved_headers:
-            saved_items.append("Headers")
-        if method_key in self.saved_bodies:
-            saved_items.append("Body")
-        if method_key in self.saved_params:
-            saved_items.append("Params")
-        if method_key in self.saved_urls:
-            saved_items.append("URL")
-        if method_key in self.saved_paths:
-            saved_items.append("Path")
+        saved_items = [label for field, label in (("headers", "Headers"), ("body", "Body"), ("params", "Params"),
+                                                  ("base_url", "URL"), ("path", "Path"))
+                       if endpoint.saved_value(field) is not None]
         
         if saved_items:
             self.log_message(f"💾 Using saved values for: {', '.join(saved_items)}")
     
+    def _saved_field_changed(self, method_key: str):
+        """A saved field changes what the method sends: rebuild its template and drop its prepared request"""
+        self._update_dynamic_template()
+        self.runner.forget_prepared(method_key)
+    
     def save_headers(self):
         """Save headers"""
         if not self.selected_category or not self.selected_method:
@@ -2220,7 +1426,8 @@ class APITestAutomationTool:
         method_key = f"{self.selected_category} - {self.selected_method}"
         headers_content = self.headers_text.get("1.0", tk.END).strip()
         
-        self.saved_headers[method_key] = headers_content
+        self.imported_apis[self.selected_category][self.selected_method].save("headers", headers_content)
+        self._saved_field_changed(method_key)
         self.log_message(f"💾 Headers saved for: {self.selected_method}")
         
         # Make save button green
@@ -2236,7 +1443,8 @@ class APITestAutomationTool:
         method_key = f"{self.selected_category} - {self.selected_method}"
         body_content = self.body_text.get("1.0", tk.END).strip()
         
-        self.saved_bodies[method_key] = body_content
+        self.imported_apis[self.selected_category][self.selected_method].save("body", body_content)
+        self._saved_field_changed(method_key)
         self.log_message(f"💾 Request Body saved for: {self.selected_method}")
         
         # Make save button green
@@ -2252,7 +1460,8 @@ class APITestAutomationTool:
         method_key = f"{self.selected_category} - {self.selected_method}"
         params_content = self.params_text.get("1.0", tk.END).strip()
         
-        self.saved_params[method_key] = params_content
+        self.imported_apis[self.selected_category][self.selected_method].save("params", params_content)
+        self._saved_field_changed(method_key)
         self.log_message(f"💾 Query Parameters saved for: {self.selected_method}")
         
         # Make save button green
@@ -2268,7 +1477,8 @@ class APITestAutomationTool:
         method_key = f"{self.selected_category} - {self.selected_method}"
         url_content = self.base_url_entry.get().strip()
         
-        self.saved_urls[method_key] = url_content
+        self.imported_apis[self.selected_category][self.selected_method].save("base_url", url_content)
+        self._saved_field_changed(method_key)
         self.log_message(f"💾 Base URL saved for: {self.selected_method}")
         
         # Make save button green
@@ -2284,7 +1494,8 @@ class APITestAutomationTool:
         method_key = f"{self.selected_category} - {self.selected_method}"
         path_content = self.path_entry.get().strip()
         
-        self.saved_paths[method_key] = path_content
+        self.imported_apis[self.selected_category][self.selected_method].save("path", path_content)
+        self._saved_field_changed(method_key)
         self.log_message(f"💾 Path saved for: {self.selected_method}")
         
         # Make save button green
@@ -2320,6 +1531,10 @@ class APITestAutomationTool:
             # Remove from automation_methods list
             if method_name in self.automation_methods:
                 self.automation_methods.remove(method_name)
+            # Drop its dependencies and every dependency on it
+            self.automation_dependencies.pop(method_name, None)
+            for dependencies in self.automation_dependencies.values():
+                dependencies.discard(method_name)
             self.log_message(f"✓ Removed from automation: {method_name}")
         else:
             messagebox.showwarning("Warning", "Please select a method to remove!")
@@ -2354,12 +1569,262 @@ class APITestAutomationTool:
             # Move in list as well
             self.automation_methods.insert(index + 1, self.automation_methods.pop(index))
     
+    def set_dependencies(self):
+        """Choose which automation steps must succeed before the selected one"""
+        selection = self.method_order_listbox.curselection()
+        if not selection:
+            messagebox.showwarning("Warning", "Please select a method in the automation list!")
+            return
+        
+        method_name = self.automation_methods[selection[0]]
+        candidates = [name for name in self.automation_methods if name != method_name]
+        if not candidates:
+            messagebox.showinfo("Info", "Add more methods to the automation list first!")
+            return
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Step Dependencies")
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        main_frame = ttk.Frame(dialog)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        ttk.Label(main_frame, text=f"🔗 {method_name}", font=('Arial', 11, 'bold')).pack(pady=5)
+        ttk.Label(main_frame, text="Runs only after these steps succeed (e.g. tick Login for steps that need a token):",
+                  font=('Arial', 9)).pack(pady=5)
+        
+        current = self.automation_dependencies.get(method_name, set())
+        dependency_vars = {}
+        for candidate in candidates:
+            var = tk.BooleanVar(value=candidate in current)
+            dependency_vars[candidate] = var
+            ttk.Checkbutton(main_frame, text=candidate, variable=var).pack(anchor=tk.W, pady=2)
+        
+        def confirm():
+            selected = {name for name, var in dependency_vars.items() if var.get()}
+            proposed = dict(self.automation_dependencies)
+            proposed[method_name] = selected
+            try:
+                dependency_order(self.automation_methods, proposed)
+            except ValueError as e:
+                messagebox.showerror("Error", str(e), parent=dialog)
+                return
+            if selected:
+                self.automation_dependencies[method_name] = selected
+                self.log_message(f"🔗 {method_name} depends on: {', '.join(sorted(selected))}")
+            else:
+                self.automation_dependencies.pop(method_name, None)
+                self.log_message(f"🔗 {method_name} has no dependencies")
+            dialog.destroy()
+        
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(pady=10)
+        ttk.Button(button_frame, text="Cancel", command=dialog.destroy, width=12).pack(side=tk.LEFT, padx=8)
+        ttk.Button(button_frame, text="Save", command=confirm, width=12).pack(side=tk.LEFT, padx=8)
+        
+        dialog.wait_window()
+    
+    def edit_settings(self):
+        """Edit the runner settings (JSON) in a dialog"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Settings")
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        main_frame = ttk.Frame(dialog)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        ttk.Label(main_frame, text="⚙️ Settings", font=('Arial', 11, 'bold')).pack(pady=5)
+        ttk.Label(main_frame, text='Sections: "pools" (per base URL), "retries", "circuit_breakers", "rate_limits", '
+                                   '"timeouts" and "capture". Entries are keyed by "*", a base URL, a category or "Category - Method"; '
+                                   'more specific keys override (rate limits all apply). e.g. {"retries": {"*": {"attempts": 3}}, '
+                                   '"timeouts": {"*": {"connect": 3, "read": 10, "run": 600}}}',
+                  font=('Arial', 9), wraplength=600).pack(pady=5)
+        
+        settings_text = scrolledtext.ScrolledText(main_frame, width=80, height=20, font=('Consolas', 10))
+        settings_text.pack(fill=tk.BOTH, expand=True, pady=5)
+        settings_text.insert("1.0", json.dumps(self.runner.settings or {"pools": {}}, indent=2))
+        
+        def load_file():
+            filename = filedialog.askopenfilename(filetypes=[("JSON files", "*.json"), ("All files", "*.*")], parent=dialog)
+            if filename:
+                try:
+                    settings = load_settings(filename)
+                except (OSError, ValueError) as e:
+                    messagebox.showerror("Error", f"Failed to load settings: {str(e)}", parent=dialog)
+                    return
+                settings_text.delete("1.0", tk.END)
+                settings_text.insert("1.0", json.dumps(settings, indent=2))
+        
+        def save_file():
+            filename = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON files", "*.json")],
+                                                    parent=dialog)
+            if filename:
+                try:
+                    with open(filename, 'w', encoding='utf-8') as f:
+                        f.write(settings_text.get("1.0", tk.END))
+                except OSError as e:
+                    messagebox.showerror("Error", f"Failed to save settings: {str(e)}", parent=dialog)
+        
+        def apply():
+            try:
+                self.runner.apply_settings(json.loads(settings_text.get("1.0", tk.END)))
+            except ValueError as e:
+                messagebox.showerror("Error", f"Invalid settings: {str(e)}", parent=dialog)
+                return
+            self.log_message("⚙️ Settings applied")
+            dialog.destroy()
+        
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(pady=10)
+        ttk.Button(button_frame, text="Load File...", command=load_file, width=12).pack(side=tk.LEFT, padx=8)
+        ttk.Button(button_frame, text="Save File...", command=save_file, width=12).pack(side=tk.LEFT, padx=8)
+        ttk.Button(button_frame, text="Cancel", command=dialog.destroy, width=12).pack(side=tk.LEFT, padx=8)
+        ttk.Button(button_frame, text="Apply", command=apply, width=12).pack(side=tk.LEFT, padx=8)
+        
+        dialog.wait_window()
+    
+    def load_test(self):
+        """Load the automation list's endpoints (constant rate or virtual users) and report latency percentiles"""
+        if not self.automation_methods:
+            messagebox.showwarning("Warning", "Please add methods to automation list first!")
+            return
+        if self.load_runner is not None:
+            messagebox.showinfo("Info", "A load test is already running!")
+            return
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Load Test")
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        main_frame = ttk.Frame(dialog)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        ttk.Label(main_frame, text="🔥 Load Test", font=('Arial', 11, 'bold')).grid(row=0, column=0, columnspan=2, pady=5)
+        ttk.Label(main_frame, text=f"Cycles through the {len(self.automation_methods)} method(s) of the automation list,\n"
+                                   "using saved templates and the current auth token:",
+                  font=('Arial', 9)).grid(row=1, column=0, columnspan=2, pady=5)
+        
+        mode_var = tk.StringVar(value="rate")
+        ttk.Radiobutton(main_frame, text="Constant rate", variable=mode_var, value="rate").grid(row=2, column=0, columnspan=2,
+                                                                                              sticky=tk.W, pady=2)
+        ttk.Label(main_frame, text="Requests/sec:").grid(row=3, column=0, sticky=tk.W, padx=(20, 0), pady=2)
+        rate_var = tk.StringVar(value="50")
+        ttk.Entry(main_frame, textvariable=rate_var, width=10).grid(row=3, column=1, sticky=tk.W, pady=2)
+        ttk.Label(main_frame, text="Duration (s):").grid(row=4, column=0, sticky=tk.W, padx=(20, 0), pady=2)
+        duration_var = tk.StringVar(value="30")
+        ttk.Entry(main_frame, textvariable=duration_var, width=10).grid(row=4, column=1, sticky=tk.W, pady=2)
+        
+        # Each virtual user runs the list in order with its own cookies and token, paced by the Pacing setting
+        ttk.Radiobutton(main_frame, text="Virtual users (Pacing = think time)", variable=mode_var,
+                        value="users").grid(row=5, column=0, columnspan=2, sticky=tk.W, pady=(8, 2))
+        ttk.Label(main_frame, text="Stages (s:users,...):").grid(row=6, column=0, sticky=tk.W, padx=(20, 0), pady=2)
+        stages_var = tk.StringVar(value="10:5,30:5,10:0")
+        ttk.Entry(main_frame, textvariable=stages_var, width=20).grid(row=6, column=1, sticky=tk.W, pady=2)
+        
+        # One event loop saturates one core; more processes spread the load over the others
+        ttk.Label(main_frame, text="Processes:").grid(row=7, column=0, sticky=tk.W, pady=(8, 2))
+        processes_var = tk.IntVar(value=1)
+        ttk.Spinbox(main_frame, from_=1, to=64, width=4, textvariable=processes_var).grid(row=7, column=1, sticky=tk.W,
+                                                                                        pady=(8, 2))
+        
+        # Load agents started with "api_cli.py agent" share the load instead of this process
+        ttk.Label(main_frame, text="Agents (host:port,...):").grid(row=8, column=0, sticky=tk.W, pady=2)
+        agents_var = tk.StringVar(value="")
+        ttk.Entry(main_frame, textvariable=agents_var, width=30).grid(row=8, column=1, sticky=tk.W, pady=2)
+        
+        def start():
+            try:
+                processes = max(1, int(processes_var.get()))
+            except (tk.TclError, ValueError):
+                processes = 1
+            agents = [address.strip() for address in agents_var.get().split(",") if address.strip()]
+            try:
+                coordinator = LoadCoordinator(agents) if agents else None
+            except ValueError as e:
+                messagebox.showerror("Error", str(e), parent=dialog)
+                return
+            if mode_var.get() == "users":
+                try:
+                    plan = ClosedLoopPlan(parse_stages(stages_var.get()), list(self.automation_methods),
+                                          pacing=PacingPolicy.parse(f"{self.pacing_mode_var.get()}:{self.pacing_value_var.get()}"))
+                except ValueError as e:
+                    messagebox.showerror("Error", str(e), parent=dialog)
+                    return
+            else:
+                try:
+                    rate = float(rate_var.get())
+                    duration = float(duration_var.get())
+                    if rate <= 0 or duration <= 0:
+                        raise ValueError
+                except ValueError:
+                    messagebox.showerror("Error", "Requests/sec and duration must be positive numbers", parent=dialog)
+                    return
+                plan = OpenLoopPlan(rate, duration, list(self.automation_methods))
+            dialog.destroy()
+            self._start_load_test(plan, processes, coordinator)
+        
+        button_frame = ttk.Frame(main_frame)
+        button_frame.grid(row=9, column=0, columnspan=2, pady=10)
+        ttk.Button(button_frame, text="Cancel", command=dialog.destroy, width=12).pack(side=tk.LEFT, padx=8)
+        ttk.Button(button_frame, text="Start", command=start, width=12).pack(side=tk.LEFT, padx=8)
+        
+        dialog.wait_window()
+    
+    def _start_load_test(self, plan, processes=1, coordinator=None):
+        """Run a load plan on a background thread (or on agents) and report when it finishes"""
+        generator = LoadGenerator(self.collection, templates=self.dynamic_templates, auth=self.runner,
+                                  rate_limits=self.runner.settings.get("rate_limits"))
+        self.load_runner = coordinator or generator
+        
+        def run():
+            if coordinator is not None:
+                return coordinator.run(generator.to_state(), plan)
+            return generator.run(plan, processes)
+        
+        self.run_automation_button.config(state=tk.DISABLED)
+        self.stop_automation_button.config(state=tk.NORMAL)
+        if isinstance(plan, ClosedLoopPlan):
+            description = f"up to {max(stage.users for stage in plan.stages)} virtual users for {plan.duration:g}s"
+        else:
+            description = f"{plan.rate:g} req/s for {plan.duration:g}s"
+        self.automation_status_label.config(text=f"Load test: {description}...", foreground="green")
+        if coordinator is not None:
+            description += f" on {len(coordinator.agents)} agent(s)"
+        elif processes > 1:
+            description += f" on {processes} processes"
+        self.log_message(f"🔥 Load test started: {description} over {len(self.automation_methods)} endpoint(s)")
+        self.run_in_background(run, self._load_test_done, self._load_test_failed)
+    
+    def _load_test_done(self, report):
+        self.load_runner = None
+        self.run_automation_button.config(state=tk.NORMAL)
+        self.stop_automation_button.config(state=tk.DISABLED)
+        self.automation_status_label.config(text="Load test completed", foreground="blue")
+        for line in report.lines():
+            self.log_message(line)
+    
+    def _load_test_failed(self, error):
+        self.load_runner = None
+        self.run_automation_button.config(state=tk.NORMAL)
+        self.stop_automation_button.config(state=tk.DISABLED)
+        self.automation_status_label.config(text="Load test failed", foreground="red")
+        self.log_message(f"❌ Load test error: {str(error)}")
+    
     def run_automation(self):
         """Start automation"""
         if not self.automation_methods:
             messagebox.showwarning("Warning", "Please add methods to automation list first!")
             return
         
+        try:
+            self.automation_pacing = PacingPolicy.parse(f"{self.pacing_mode_var.get()}:{self.pacing_value_var.get()}")
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        
         # Clear previous results
         self.automation_results = {}
         # Create a fresh queue copy so original order remains for subsequent runs
@@ -2375,16 +1840,24 @@ class APITestAutomationTool:
                 self.method_order_listbox.insert(i, method_name)
         
         self.automation_running = True
+        self.runner.begin_run(label="Automation")
         self.run_automation_button.config(state=tk.DISABLED)
         self.stop_automation_button.config(state=tk.NORMAL)
         self.automation_status_label.config(text="Running...", foreground="green")
         
-        self.log_message("🚀 Starting automation...")
-        self.root.after(1000, self._run_next_automation_method)
+        if self.parallel_automation_var.get():
+            self.log_message("🚀 Starting automation...")
+            self.root.after(0, self._run_automation_by_dependencies)
+        else:
+            self.log_message(f"🚀 Starting automation (pacing: {self.automation_pacing})...")
+            self.root.after(0, self._run_next_automation_method)
     
     def stop_automation(self):
-        """Stop automation"""
+        """Stop automation, a load test and any request in flight"""
         self.automation_running = False
+        if self.load_runner is not None:
+            self.load_runner.stop()
+        self.runner.cancel()
         self.run_automation_button.config(state=tk.NORMAL)
         self.stop_automation_button.config(state=tk.DISABLED)
         self.automation_status_label.config(text="Stopped", foreground="red")
@@ -2397,35 +1870,68 @@ class APITestAutomationTool:
             return
         
         method_name = self._automation_queue.pop(0)
+        step_started = time.monotonic()
+        self.automation_status_label.config(text=f"Running: {method_name.split(' - ', 1)[1]}")
+        
+        def failed(e):
+            self.log_message(f"❌ Error in automation: {str(e)}")
+            self._automation_step_done(method_name, False, step_started)
+        
+        self.run_in_background(lambda: self._run_automation_step(method_name),
+                               lambda result: self._automation_step_done(method_name, result.success, step_started),
+                               failed)
+    
+    def _automation_step_done(self, method_name, success, step_started):
+        """Record a sequential step's result and schedule the next step after the pacing delay"""
+        self.automation_results[method_name] = success
+        
+        # Update method in listbox (with icon)
+        self._update_method_status(method_name, success)
         
-        # Split category and method from method name
+        delay = self.automation_pacing.delay(step_started) if self._automation_queue and self.automation_running else 0
+        self.root.after(int(delay * 1000), self._run_next_automation_method)
+    
+    def _run_automation_step(self, method_name):
+        """Execute one automation step (may run on a worker thread, so only logs through the runner)"""
+        category, method = method_name.split(" - ", 1)
+        self.runner.log(f"🔄 Running: {method_name}")
+        
+        # Use dynamic template if available, otherwise use original API info
+        template = self.dynamic_templates.get(method_name)
+        if template is not None:
+            self.runner.log(f"💾 Using dynamic template for: {method}")
+            return self.runner.execute_template(category, method, template)
+        self.runner.log(f"📋 Using original template for: {method}")
+        return self.runner.execute(category, method)
+    
+    def _run_automation_by_dependencies(self):
+        """Run automation steps in parallel wherever the declared dependencies allow it"""
         try:
-            category, method = method_name.split(" - ", 1)
-            self.log_message(f"🔄 Running: {method_name}")
-            self.automation_status_label.config(text=f"Running: {method}")
-            
-            # Use dynamic template if available, otherwise use original API info
-            if method_name in self.dynamic_templates:
-                self.log_message(f"💾 Using dynamic template for: {method}")
-                success = self.execute_api_test_with_template(category, method, method_name)
-            else:
-                self.log_message(f"📋 Using original template for: {method}")
-                success = self.execute_api_test(category, method)
-            
-            # Save result
-            self.automation_results[method_name] = success
-            
-            # Update method in listbox (with icon)
-            self._update_method_status(method_name, success)
-            
-            # Wait 2 seconds and move to next
-            self.root.after(2000, self._run_next_automation_method)
-            
-        except Exception as e:
+            workers = max(1, int(self.workers_var.get()))
+        except (tk.TclError, ValueError):
+            workers = 1
+        
+        steps, dependencies = list(self._automation_queue), dict(self.automation_dependencies)
+        self._automation_queue = []
+        
+        def run():
+            for method_name, result, buffered in self.runner.iter_dag(steps, dependencies, self._run_automation_step,
+                                                                     workers,
+                                                                     should_stop=lambda: not self.automation_running):
+                self.runner.replay(buffered)
+                self.call_on_ui(self._automation_step_finished, method_name, result.success)
+        
+        def failed(e):
             self.log_message(f"❌ Error in automation: {str(e)}")
-            self.automation_results[method_name] = False
-            self._update_method_status(method_name, False)
-            self.root.after(1000, self._run_next_automation_method)
+            self._finish_automation()
+        
+        self.run_in_background(run, lambda _: self._finish_automation(), failed)
+    
+    def _automation_step_finished(self, method_name, success):
+        """Show a parallel step's result as it comes in"""
+        self.automation_results[method_name] = success
+        self._update_method_status(method_name, success)
+        self.automation_status_label.config(text=f"Done: {method_name.split(' - ', 1)[-1]}")
     
     def _update_method_status(self, method_name, success):
         """Update method status in listbox"""
@@ -2442,23 +1948,31 @@ class APITestAutomationTool:
                 break
     
     def _finish_automation(self):
-        """Finish automation"""
+        """Finish automation, also after Stop once the steps in flight are done"""
+        stopped = not self.automation_running
         self.automation_running = False
+        self.runner.end_run()
         self.run_automation_button.config(state=tk.NORMAL)
         self.stop_automation_button.config(state=tk.DISABLED)
-        self.automation_status_label.config(text="Completed", foreground="blue")
+        if stopped:
+            self.automation_status_label.config(text="Stopped", foreground="red")
+        else:
+            self.automation_status_label.config(text="Completed", foreground="blue")
         
         # Summarize results
         total_methods = len(self.automation_results)
         successful_methods = sum(1 for success in self.automation_results.values() if success)
         failed_methods = total_methods - successful_methods
         
-        self.log_message("✅ Automation completed!")
+        self.log_message("⏹️ Automation stopped" if stopped else "✅ Automation completed!")
         self.log_message(f"📊 Results: {successful_methods} successful, {failed_methods} failed out of {total_methods} total")
+        for line in self.runner.transport_report():
+            self.log_message(line)
     
     def clear_results(self):
         """Clear results"""
-        self.result_text.delete("1.0", tk.END)
+        self.log_sink.drain()
+        self.result_view.clear()
     
     def export_results(self):
         """Export results to file"""
@@ -2467,18 +1981,20 @@ class APITestAutomationTool:
             filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
         )
         if filename:
+            self._flush_log()
             try:
                 with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(self.result_text.get("1.0", tk.END))
+                    f.write(self.result_view.get_text())
                 messagebox.showinfo("Success", f"Results exported to {filename}")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to export: {str(e)}")
     
     def copy_results(self):
         """Copy results to clipboard"""
+        self._flush_log()
         try:
             self.root.clipboard_clear()
-            self.root.clipboard_append(self.result_text.get("1.0", tk.END))
+            self.root.clipboard_append(self.result_view.get_text())
             messagebox.showinfo("Success", "Results copied to clipboard")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to copy: {str(e)}")
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Headless command line runner for the API Test Automation Tool.
+
+Runs an imported Postman collection without a display (CI boxes, load
+agents). Only depends on api_engine, never on tkinter.
+
+    python api_cli.py run Test_API_Collection.json
+    python api_cli.py run Test_API_Collection.json --category Authentication --category System -v
+    python api_cli.py load Test_API_Collection.json --setup "Authentication - Login" --rate 200 --duration 30
+    python api_cli.py load Test_API_Collection.json --stages 30:20,120:20,30:0 --pacing fixed:1
+    python api_cli.py agent --listen 0.0.0.0:7070
+    python api_cli.py run Test_API_Collection.json --store api_results.db
+    python api_cli.py history api_results.db --endpoint "Authentication - Login" --since 2024-05-01
+    python api_cli.py regress api_results.db --baseline-runs 10
+    python api_cli.py load Test_API_Collection.json --rate 2000 --duration 60 --agents host1:7070,host2:7070
+"""
+
+import argparse
+import os
+import signal
+import sys
+from datetime import datetime
+
+from api_engine import (DEFAULT_TIMEOUT, LOG_LEVELS, Collection, ConsoleSink, PacingPolicy, Runner, load_settings,
+                        new_session)
+
+
+def _select_methods(collection, methods):
+    """Turn "Category - Method" arguments into (category key, method) pairs"""
+    if not methods:
+        return None
+    selected = []
+    for method_key in methods:
+        category, _, method_name = method_key.partition(" - ")
+        if category not in collection.imported_apis or method_name not in collection.imported_apis[category]:
+            raise SystemExit(f"❌ API method not found: {method_key}")
+        selected.append((category, method_name))
+    return selected
+
+
+def _pacing(spec):
+    """argparse type for --pacing"""
+    try:
+        return PacingPolicy.parse(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _load_settings(path):
+    try:
+        return load_settings(path)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"❌ Invalid settings file: {e}")
+
+
+def _timestamp(value):
+    """argparse type for --since/--until: ISO date or time (local), or epoch seconds"""
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid time: {value} (use e.g. 2024-05-01 or 2024-05-01T14:30)")
+
+
+def _open_store(path):
+    from api_store import ResultStore
+    import sqlite3
+    try:
+        return ResultStore(path)
+    except sqlite3.Error as e:
+        raise SystemExit(f"❌ Cannot open result store {path}: {e}")
+
+
+def _run_by_dependencies(runner, methods, depends, workers):
+    """Run "Category - Method" steps in parallel wherever --depends allows it"""
+    if methods is None:
+        methods = [(category, method_name) for category, method_name, _ in runner.collection.iter_methods()]
+    steps = {f"{category} - {method_name}": (category, method_name) for category, method_name in methods}
+
+    dependencies = {}
+    for rule in depends:
+        step, _, dependency = rule.partition("=")
+        for name in (step, dependency):
+            if name not in steps:
+                raise SystemExit(f"❌ Unknown step in --depends: {name}")
+        dependencies.setdefault(step, set()).add(dependency)
+
+    def execute(step):
+        return runner.execute_template(*steps[step], runner.collection.template_for(*steps[step]))
+
+    results = []
+    try:
+        for _, result, buffered in runner.iter_dag(list(steps), dependencies, execute, max(workers, 1)):
+            runner.replay(buffered)
+            results.append(result)
+    except ValueError as e:
+        raise SystemExit(f"❌ {e}")
+    return results
+
+
+def cmd_run(args) -> int:
+    sink = ConsoleSink(verbose=args.verbose, level=args.log_level)
+    collection = Collection.load(args.collection, selected_categories=args.category or None,
+                                 log=sink.log if sink.verbose else None)
+    if args.base_url:
+        collection.collection_variables['baseUrl'] = args.base_url
+
+    runner = Runner(collection, sink=sink, session=new_session(pool_size=args.workers), timeout=args.timeout,
+                    max_per_host=args.per_host)
+    if args.settings:
+        runner.apply_settings(_load_settings(args.settings))
+    methods = _select_methods(collection, args.method)
+    if args.regress and not args.store:
+        raise SystemExit("❌ --regress compares with earlier runs in the result store: add --store FILE")
+    if args.store:
+        runner.store = _open_store(args.store)
+    runner.begin_run(args.run_deadline, label=args.label or os.path.basename(args.collection))
+    if args.depends:
+        results = _run_by_dependencies(runner, methods, args.depends, args.workers)
+    elif args.use_async:
+        from api_async import DEFAULT_LIMIT_PER_HOST, AsyncRunner
+        async_runner = AsyncRunner(runner, limit_per_host=args.per_host or DEFAULT_LIMIT_PER_HOST)
+        results = async_runner.run(methods, concurrency=args.workers)
+    elif args.workers > 1:
+        results = runner.run_parallel(methods, workers=args.workers)
+    else:
+        results = runner.run_collection(methods, pacing=args.pacing)
+    run_id = runner.run_id
+    runner.end_run()
+
+    successful = sum(1 for result in results if result.success)
+    failed = len(results) - successful
+    for line in runner.transport_report():
+        print(line)
+    print(f"📊 Results: {successful} successful, {failed} failed out of {len(results)} total")
+    status = 1 if failed or not results else 0
+    if runner.store is not None:
+        if args.regress:
+            status = _check_regressions(runner.store, run_id, args) or status
+        runner.store.close()
+    return status
+
+
+def cmd_load(args) -> int:
+    from api_async import DEFAULT_LIMIT_PER_HOST
+    from api_load import ClosedLoopPlan, LoadGenerator, OpenLoopPlan, parse_stages
+
+    collection = Collection.load(args.collection)
+    if args.base_url:
+        collection.collection_variables['baseUrl'] = args.base_url
+    endpoints = args.method or [f"{category} - {method_name}" for category, method_name, _ in collection.iter_methods()]
+    _select_methods(collection, endpoints + (args.setup or []))
+
+    # Setup steps (e.g. Login) run once, in order; the load starts from their tokens
+    settings = _load_settings(args.settings) if args.settings else {}
+    runner = Runner(collection, sink=ConsoleSink(), timeout=args.timeout)
+    runner.apply_settings(settings)
+    for category, method_name in _select_methods(collection, args.setup) or []:
+        runner.execute_template(category, method_name, collection.template_for(category, method_name))
+
+    generator = LoadGenerator(collection, timeout=args.timeout, auth=runner,
+                              limit_per_host=args.per_host or DEFAULT_LIMIT_PER_HOST,
+                              rate_limits=settings.get("rate_limits"))
+    if args.stages:
+        try:
+            plan = ClosedLoopPlan(parse_stages(args.stages), endpoints, pacing=args.pacing)
+        except ValueError as e:
+            raise SystemExit(f"❌ {e}")
+        print(f"🚀 Running up to {max(stage.users for stage in plan.stages)} virtual users for {plan.duration:g}s, "
+              f"each looping through {len(endpoints)} step(s)...")
+    else:
+        plan = OpenLoopPlan(args.rate, args.duration, endpoints)
+        print(f"🚀 Sending {args.rate:g} req/s for {args.duration:g}s to {len(endpoints)} endpoint(s)...")
+
+    if args.agents:
+        from api_distributed import LoadCoordinator
+        if args.processes > 1:
+            raise SystemExit("❌ --processes applies to local runs; start one agent per core instead")
+        try:
+            coordinator = LoadCoordinator([address for value in args.agents for address in value.split(",") if address],
+                                          on_interval=_print_interval)
+        except ValueError as e:
+            raise SystemExit(f"❌ {e}")
+        stoppable, run = coordinator, lambda: coordinator.run(generator.to_state(), plan)
+    else:
+        stoppable, run = generator, lambda: generator.run(plan, processes=max(args.processes, 1))
+
+    # The first Ctrl+C ends the run and still prints the report; a second one aborts
+    def interrupt(signum, frame):
+        print("⏹️ Stopping...", flush=True)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        stoppable.stop()
+
+    previous_handler = signal.signal(signal.SIGINT, interrupt)
+    try:
+        report = run()
+    except (ConnectionError, RuntimeError) as e:
+        raise SystemExit(f"❌ {e}")
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+    for line in report.lines():
+        print(line)
+    return 0 if report.total().requests else 1
+
+
+def _print_interval(report):
+    """One live line per second of a distributed load run"""
+    total = report.total()
+    print(f"⏱️ {total.requests / (report.duration or 1):8.1f} req/s  {total.errors} errors  "
+          f"p50 {total.latency.percentile(50) * 1000:.1f} ms  p99 {total.latency.percentile(99) * 1000:.1f} ms",
+          flush=True)
+
+
+def cmd_history(args) -> int:
+    store = _open_store(args.store)
+    try:
+        if args.run is None and args.endpoint is None and args.since is None and args.until is None:
+            runs = store.runs(label=args.label, limit=args.limit)
+            for run in runs:
+                started = datetime.fromtimestamp(run["started"]).strftime("%Y-%m-%d %H:%M:%S")
+                duration = f"{run['finished'] - run['started']:.1f}s" if run["finished"] else "unfinished"
+                print(f"#{run['id']:<6} {started}  {duration:>10}  {run['requests']:6} requests  "
+                      f"{run['failures']:5} failed  {run['label']}")
+            return 0 if runs else 1
+        rows = store.requests(run_id=args.run, endpoint=args.endpoint, since=args.since, until=args.until,
+                              limit=args.limit)
+        for row in rows:
+            timestamp = datetime.fromtimestamp(row["time"]).strftime("%Y-%m-%d %H:%M:%S")
+            status = row["status"] if row["status"] is not None else row["error"]
+            print(f"{timestamp}  #{row['run_id'] or '-':<6} {'✅' if row['success'] else '❌'} {row['method']:6} "
+                  f"{status} {row['elapsed']:.3f}s {row['bytes_out']}B out {row['bytes_in']}B in  {row['endpoint']}")
+        return 0 if rows else 1
+    finally:
+        store.close()
+
+
+def _check_regressions(store, run_id, args) -> int:
+    """Print the latency comparison of a stored run with its baseline; 1 if any percentile regressed"""
+    from api_regress import check_run
+
+    try:
+        run, baseline_ids, changes = check_run(store, run_id, baseline_runs=args.baseline_runs,
+                                               label=getattr(args, "label", None), qs=args.percentiles,
+                                               threshold=args.threshold, min_delta=args.min_delta_ms / 1000,
+                                               confidence=args.confidence)
+    except ValueError as e:
+        raise SystemExit(f"❌ {e}")
+    if not baseline_ids:
+        print(f"⚠️ No baseline yet: run #{run['id']} is the first with label {run['label']!r}")
+        return 0
+    print(f"📈 Run #{run['id']} vs baseline runs {', '.join(f'#{run_id}' for run_id in reversed(baseline_ids))}")
+    for change in changes:
+        print(change)
+    regressed = sum(1 for change in changes if change.regressed)
+    if regressed:
+        print(f"❌ {regressed} latency regression(s)")
+        return 1
+    print("✅ No latency regressions" if changes else "⚠️ Too few successful requests to compare")
+    return 0
+
+
+def cmd_regress(args) -> int:
+    store = _open_store(args.store)
+    try:
+        return _check_regressions(store, args.run, args)
+    finally:
+        store.close()
+
+
+def _percentiles(value):
+    """argparse type for --percentiles: comma separated, e.g. 50,95,99"""
+    try:
+        qs = tuple(int(q) for q in value.split(","))
+    except ValueError:
+        qs = ()
+    if not qs or not all(0 < q < 100 for q in qs):
+        raise argparse.ArgumentTypeError(f"Invalid percentiles: {value} (use e.g. 50,95,99)")
+    return qs
+
+
+def _add_regress_arguments(parser):
+    from api_regress import (DEFAULT_BASELINE_RUNS, DEFAULT_CONFIDENCE, DEFAULT_MIN_DELTA, DEFAULT_THRESHOLD,
+                             PERCENTILES)
+
+    parser.add_argument("--baseline-runs", type=int, default=DEFAULT_BASELINE_RUNS,
+                        help=f"Compare with this many earlier runs of the same label (default: {DEFAULT_BASELINE_RUNS})")
+    parser.add_argument("--percentiles", type=_percentiles, default=PERCENTILES,
+                        help=f"Percentiles to compare (default: {','.join(map(str, PERCENTILES))})")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Relative growth that counts as a regression (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA * 1000,
+                        help=f"Ignore growth below this many ms (default: {DEFAULT_MIN_DELTA * 1000:g})")
+    parser.add_argument("--confidence", type=float, default=DEFAULT_CONFIDENCE,
+                        help=f"Bootstrap confidence that the growth is real (default: {DEFAULT_CONFIDENCE})")
+
+
+def cmd_agent(args) -> int:
+    from api_distributed import LoadAgent, parse_address
+
+    try:
+        host, port = parse_address(args.listen)
+    except ValueError as e:
+        raise SystemExit(f"❌ {e}")
+    try:
+        LoadAgent(host, port).run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Run Postman collections headless")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="Run every request of a collection once, in order")
+    run.add_argument("collection", help="Postman collection JSON file")
+    run.add_argument("--category", action="append", help="Top-level folder to import (repeatable, default: all)")
+    run.add_argument("--method", action="append", help='Only run "Category - Method" (repeatable, keeps the given order)')
+    run.add_argument("--base-url", help="Override the collection's baseUrl variable")
+    run.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                     help="Connect and read timeout in seconds (--settings can set them per method)")
+    run.add_argument("--run-deadline", type=float, metavar="SECONDS",
+                     help='Fail requests not done within SECONDS of the start (default: the "run" timeout of --settings)')
+    run.add_argument("--workers", type=int, default=1, help="Send requests on N threads (results keep collection order)")
+    run.add_argument("--per-host", type=int, help="Max concurrent requests (connections with --async) per host")
+    run.add_argument("--async", dest="use_async", action="store_true",
+                     help="Use the asyncio transport; --workers is then the number of requests in flight")
+    run.add_argument("--pacing", type=_pacing, default=PacingPolicy(),
+                     help='Delay between sequential requests: none (default), fixed:SECONDS, random:MIN-MAX, rate:REQ_PER_SEC; '
+                          'only for sequential runs, so it cannot be combined with --workers above 1, --async or --depends')
+    run.add_argument("--depends", action="append", metavar='"STEP=DEPENDENCY"',
+                     help='Run STEP only after DEPENDENCY succeeded (both "Category - Method", repeatable); '
+                          'steps then run in parallel on --workers threads wherever the dependencies allow')
+    run.add_argument("--settings", metavar="FILE",
+                     help='Settings JSON, e.g. {"pools": {"https://api.example.com": {"pool_maxsize": 50}}, '
+                          '"rate_limits": {"*": {"rate": 10}}}')
+    run.add_argument("-v", "--verbose", action="store_true", help="Log headers and bodies of every request")
+    run.add_argument("--log-level", choices=LOG_LEVELS,
+                     help="results: one line per request (default), bodies: add status, timings and bodies, "
+                          "full: add headers (same as -v)")
+    run.add_argument("--store", metavar="FILE", help="Record every request of the run in this SQLite result store")
+    run.add_argument("--label", help="Name of the run in the store (default: the collection file name)")
+    run.add_argument("--regress", action="store_true",
+                     help="After the run, fail on latency regressions against earlier runs in the store")
+    _add_regress_arguments(run)
+    run.set_defaults(func=cmd_run)
+
+    load = subparsers.add_parser("load", help="Generate load (constant rate or virtual users) and report latency percentiles")
+    load.add_argument("collection", help="Postman collection JSON file")
+    load.add_argument("--method", action="append", help='Endpoint to load, "Category - Method" (repeatable, default: all); '
+                                                        'requests cycle through them in order')
+    load.add_argument("--setup", action="append", help='Run "Category - Method" once before the load, e.g. a login (repeatable)')
+    mode = load.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--rate", type=float, help="Requests per second, sent whether or not earlier ones returned")
+    mode.add_argument("--stages", metavar="SECONDS:USERS,...",
+                      help="Virtual users, each looping through the methods with its own cookies and token; "
+                           "the user count ramps linearly per stage, e.g. 30:20,120:20,30:0")
+    load.add_argument("--duration", type=float, default=60, help="Seconds to send for (with --rate)")
+    load.add_argument("--processes", type=int, default=1,
+                      help="Split the load across N worker processes (e.g. one per core); reports are merged")
+    load.add_argument("--agents", action="append", metavar="HOST:PORT,...",
+                      help="Split the load between running agents (api_cli.py agent) and merge their live reports")
+    load.add_argument("--pacing", type=_pacing, default=PacingPolicy(),
+                      help="Think time between a virtual user's steps (with --stages), same format as run --pacing")
+    load.add_argument("--base-url", help="Override the collection's baseUrl variable")
+    load.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Request timeout in seconds")
+    load.add_argument("--per-host", type=int, help="Max open connections per host")
+    load.add_argument("--settings", metavar="FILE",
+                      help="Settings JSON; the load honours its rate_limits (shared by all processes, "
+                           "split between agents), --setup steps use all of it")
+    load.set_defaults(func=cmd_load)
+
+    history = subparsers.add_parser("history", help="List the runs of a result store, or their requests")
+    history.add_argument("store", help="SQLite result store (run --store)")
+    history.add_argument("--run", type=int, help="Only the requests of this run id")
+    history.add_argument("--endpoint", help='Only requests of "Category - Method"')
+    history.add_argument("--since", type=_timestamp, help="Only requests from this time on (e.g. 2024-05-01T14:30)")
+    history.add_argument("--until", type=_timestamp, help="Only requests before this time")
+    history.add_argument("--label", help="Only list runs with this label")
+    history.add_argument("--limit", type=int, default=50, help="How many of the latest runs or requests to show (default: 50)")
+    history.set_defaults(func=cmd_history)
+
+    regress = subparsers.add_parser("regress", help="Compare a stored run's latency percentiles with earlier runs")
+    regress.add_argument("store", help="SQLite result store (run --store)")
+    regress.add_argument("--run", type=int, help="Run id to check (default: the latest)")
+    regress.add_argument("--label", help="Check the latest run with this label")
+    _add_regress_arguments(regress)
+    regress.set_defaults(func=cmd_regress)
+
+    agent = subparsers.add_parser("agent", help="Wait for load runs from a coordinator (api_cli.py load --agents)")
+    agent.add_argument("--listen", default="127.0.0.1:7070", metavar="HOST:PORT",
+                       help="Address to listen on (default: 127.0.0.1:7070; agents run any plan they are sent, "
+                            "so only expose them on trusted networks)")
+    agent.set_defaults(func=cmd_agent)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.func is cmd_run and args.pacing.mode != "none" and (args.workers > 1 or args.use_async or args.depends):
+        parser.error("--pacing only applies to sequential runs: drop it, or --workers above 1, --async and --depends")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""
+Distributed load: one coordinator drives load agents over TCP.
+
+An agent (python api_cli.py agent) waits for a "run" message carrying the
+compiled collection (imported_apis, collection_variables, templates and
+tokens) and its share of a load plan. It runs the plan with a LoadGenerator
+and streams back a compact report of every second's results. The
+coordinator splits a plan (and any rate limits) between its agents, merges
+the streamed reports and stops the agents when it is stopped or disconnects. Messages are JSON,
+one per line.
+"""
+
+import asyncio
+import json
+from typing import Callable, Dict, List, Optional, Tuple
+
+from api_engine import RateLimitConfig
+from api_load import REPORT_INTERVAL, LoadGenerator, LoadPlan, LoadReport, plan_from_dict, plan_to_dict
+
+DEFAULT_AGENT_PORT = 7070
+MESSAGE_LIMIT = 64 * 2 ** 20  # Largest message accepted (the run message carries the whole collection)
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """Split "host:port" (or just "host") into host and port"""
+    host, _, port = address.rpartition(":")
+    if not host:
+        return port or "127.0.0.1", DEFAULT_AGENT_PORT
+    try:
+        return host, int(port)
+    except ValueError:
+        raise ValueError(f"Invalid agent address: {address} (expected HOST:PORT)")
+
+
+def share_rate_limits(rate_limits: Dict[str, Dict], parts: int) -> Dict[str, Dict]:
+    """Rate limits for one of `parts` agents that each enforce their own buckets"""
+    return {key: dict(entry, rate=entry["rate"] / parts,
+                      min_rate=entry.get("min_rate", RateLimitConfig.min_rate) / parts)
+            for key, entry in rate_limits.items()}
+
+
+async def _send(writer: asyncio.StreamWriter, message: Dict):
+    writer.write(json.dumps(message).encode("utf-8") + b"\n")
+    await writer.drain()
+
+
+async def _receive(reader: asyncio.StreamReader) -> Optional[Dict]:
+    """Next message, or None once the other side has closed the connection"""
+    line = await reader.readline()
+    return json.loads(line) if line else None
+
+
+class LoadAgent:
+    """Runs load plans sent by coordinators; one run per connection"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_AGENT_PORT,
+                 log: Callable[[str], None] = lambda message: print(message, flush=True)):
+        self.host = host
+        self.port = port
+        self.log = log
+
+    async def serve(self):
+        server = await asyncio.start_server(self._handle, self.host, self.port, limit=MESSAGE_LIMIT)
+        self.log(f"🛰️ Load agent listening on {self.host}:{self.port}")
+        async with server:
+            await server.serve_forever()
+
+    def run(self):
+        """Blocking entry point: serve until interrupted"""
+        asyncio.run(self.serve())
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        peer = "{}:{}".format(*writer.get_extra_info("peername")[:2])
+        generator = None
+        run_task = None
+        try:
+            while True:
+                message = await _receive(reader)
+                if message is None:
+                    break
+                if message["type"] == "run" and run_task is None:
+                    generator = LoadGenerator.from_state(message["state"])
+                    generator.on_interval = lambda delta: writer.write(
+                        json.dumps({"type": "interval", "report": delta.to_dict()}).encode("utf-8") + b"\n")
+                    plan = plan_from_dict(message["plan"])
+                    self.log(f"🚀 Run from {peer}: {json.dumps(message['plan'])[:200]}")
+                    run_task = asyncio.ensure_future(self._run(generator, plan, writer, peer))
+                elif message["type"] == "stop" and generator is not None:
+                    self.log(f"⏹️ Stop from {peer}")
+                    generator.stop()
+        except (ConnectionError, ValueError, KeyError) as e:
+            self.log(f"❌ Bad connection from {peer}: {str(e)}")
+        finally:
+            # The coordinator went away: stop its run instead of loading the target unattended
+            if generator is not None:
+                generator.stop()
+            if run_task is not None:
+                await run_task
+            writer.close()
+
+    async def _run(self, generator: LoadGenerator, plan: LoadPlan, writer: asyncio.StreamWriter, peer: str):
+        try:
+            report = await generator.run_async(plan)
+            message = {"type": "done", "duration": report.duration}
+            self.log(f"✅ Run from {peer} done: {report.total().requests} requests in {report.duration:.1f}s")
+        except Exception as e:
+            message = {"type": "error", "message": f"{type(e).__name__}: {str(e)}"}
+            self.log(f"❌ Run from {peer} failed: {message['message']}")
+        try:
+            await _send(writer, message)
+        except ConnectionError:
+            pass
+
+
+class LoadCoordinator:
+    """Splits a load plan between agents and merges the reports they stream back.
+
+    on_interval, if set, is called about once a second with a report of the
+    results all agents sent during that second. Call stop() from any thread
+    to end the run on every agent.
+    """
+
+    def __init__(self, agents: List[str], on_interval: Optional[Callable[[LoadReport], None]] = None):
+        self.agents = [parse_address(address) for address in agents]
+        self.on_interval = on_interval
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._writers: List[asyncio.StreamWriter] = []
+
+    async def run_async(self, state: Dict, plan: LoadPlan) -> LoadReport:
+        """Run `plan` on the agents; `state` is LoadGenerator.to_state() of the generator to replicate"""
+        self._loop = asyncio.get_running_loop()
+        connections = []
+        try:
+            for host, port in self.agents:
+                try:
+                    connections.append(await asyncio.open_connection(host, port, limit=MESSAGE_LIMIT))
+                except OSError as e:
+                    raise ConnectionError(f"Agent {host}:{port} is unreachable: {str(e)}")
+            self._writers = [writer for _, writer in connections]
+
+            state = dict(state, rate_limits=share_rate_limits(state["rate_limits"], len(connections)))
+            total = LoadReport()
+            window = LoadReport()
+            started = self._loop.time()
+            for (_, writer), part in zip(connections, plan.split(len(connections))):
+                await _send(writer, {"type": "run", "state": state, "plan": plan_to_dict(part)})
+
+            async def follow(address, reader):
+                while True:
+                    message = await _receive(reader)
+                    if message is None:
+                        raise ConnectionError(f"Agent {address} disconnected")
+                    if message["type"] == "interval":
+                        delta = LoadReport.from_dict(message["report"])
+                        total.merge(delta)
+                        window.merge(delta)
+                    elif message["type"] == "error":
+                        raise RuntimeError(f"Agent {address} failed: {message['message']}")
+                    elif message["type"] == "done":
+                        return
+
+            window_started = started
+
+            def flush_window():
+                nonlocal window, window_started
+                now = self._loop.time()
+                window.duration = now - window_started
+                self.on_interval(window)
+                window, window_started = LoadReport(), now
+
+            async def report_intervals():
+                while True:
+                    await asyncio.sleep(REPORT_INTERVAL)
+                    flush_window()
+
+            ticker = asyncio.ensure_future(report_intervals()) if self.on_interval is not None else None
+            try:
+                await asyncio.gather(*(follow(f"{host}:{port}", reader)
+                                       for (host, port), (reader, _) in zip(self.agents, connections)))
+            finally:
+                if ticker is not None:
+                    ticker.cancel()
+            if ticker is not None:
+                # The last, partial window, so the windows add up to the final report
+                flush_window()
+            total.duration = self._loop.time() - started
+            return total
+        finally:
+            # Closing the connection also stops an agent that is still running
+            self._writers = []
+            for _, writer in connections:
+                writer.close()
+
+    def stop(self):
+        """Ask every agent to stop; safe to call from another thread"""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._send_stop)
+
+    def _send_stop(self):
+        for writer in self._writers:
+            if not writer.is_closing():
+                writer.write(json.dumps({"type": "stop"}).encode("utf-8") + b"\n")
+
+    def run(self, state: Dict, plan: LoadPlan) -> LoadReport:
+        """Blocking entry point"""
+        return asyncio.run(self.run_async(state, plan))
@@ -0,0 +1,2435 @@
+"""
+GUI-free execution core for the API Test Automation Tool.
+
+Holds the collection model, the request builder, the runner and the result
+sinks. The Tkinter UI (api_automation_tool.py) and the headless CLI
+(api_cli.py) are both thin clients on top of this module, so it must never
+import tkinter.
+"""
+
+import codecs
+import contextvars
+import hashlib
+import itertools
+import json
+import os
+import random
+import re
+import socket
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse, urlsplit
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.exceptions import ConnectTimeoutError
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Disable SSL warnings
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+DEFAULT_BASE_URL = "https://api.example.com"
+DEFAULT_TIMEOUT = 30
+DEFAULT_WORKERS = 8
+LOG_LEVELS = ("results", "bodies", "full")  # Per request: result line / + status, timings and body / + headers
+PACING_MODES = ("none", "fixed", "random", "rate")
+SUPPORTED_METHODS = ("GET", "POST", "PUT", "DELETE")
+XSRF_SET_COOKIE_PATTERN = re.compile(r'XSRF-TOKEN=([^;]+)')
+SETTINGS_SECTIONS = ("pools", "retries", "circuit_breakers", "rate_limits", "timeouts", "capture")
+CAPTURE_MODES = ("full", "truncate", "hash", "disk")
+BODY_CHUNK_SIZE = 64 * 1024  # Response bodies are read in chunks of this many bytes
+PHASES = ("dns", "connect", "tls", "ttfb", "download")
+CONNECTION_PHASES = ("dns", "connect", "tls")  # Only happen when a request opens a connection
+LATENCY_HISTORY = 1000  # Response times kept per method for p99-derived timeouts
+THROTTLE_FACTOR = 0.5  # A 429 response cuts the rate limit by this factor
+IMPORT_CHUNK_SIZE = 1024 * 1024  # Collection files are read in chunks of this many bytes
+TEMPLATE_CACHE_SIZE = 100_000  # Resolved variable templates kept per collection
+LOGIN_KEYWORDS = ('login', 'auth', 'authenticate', 'signin', 'sign-in', 'token', 'session')
+
+# Log buffer of the current worker thread / asyncio task (None = log straight to the sink)
+_log_buffer = contextvars.ContextVar('log_buffer', default=None)
+# Phases of the request the current thread is sending (set around session.request)
+_request_phases = contextvars.ContextVar('request_phases', default=None)
+
+
+# ---------------------------------------------------------------------------
+# Result sinks
+# ---------------------------------------------------------------------------
+
+class ResultSink:
+    """Receives log lines and per-request results from the runner (silent by default)"""
+
+    # How much the runner logs per request (one of LOG_LEVELS). At "results" it
+    # skips building the detailed log (headers, pretty-printed bodies), which
+    # is most of the per-request cost; "bodies" leaves out the headers.
+    level = "results"
+
+    @property
+    def verbose(self) -> bool:
+        return self.level != "results"
+
+    def log(self, message: str):
+        """A log line; response bodies arrive as LazyBody, str() formats them"""
+        pass
+
+    def result(self, result: "RequestResult"):
+        pass
+
+
+class CallbackSink(ResultSink):
+    """Forward every log line to a callable"""
+
+    level = "full"
+
+    def __init__(self, callback: Callable[[str], None]):
+        self.callback = callback
+
+    def log(self, message: str):
+        self.callback(str(message))
+
+
+class ConsoleSink(ResultSink):
+    """Print one line per request, plus the request log when verbose (or at a given level)"""
+
+    def __init__(self, verbose: bool = False, stream=None, level: Optional[str] = None):
+        self.level = level or ("full" if verbose else "results")
+        self.stream = stream or sys.stdout
+
+    def log(self, message: str):
+        if self.verbose:
+            print(message, file=self.stream)
+
+    def result(self, result: "RequestResult"):
+        print(result_line(result), file=self.stream)
+
+
+class QueueSink(ResultSink):
+    """Queue log lines from any thread for a UI to drain in batches, instead of redrawing per line.
+
+    Items are kept as logged: str lines, LazyBody response bodies and, after
+    each request's log, its RequestResult (so a viewer can index requests).
+    """
+
+    def __init__(self, level: str = "full"):
+        self.level = level
+        self._lines = deque()  # append/popleft are thread-safe
+
+    def log(self, message: str):
+        self._lines.append(message)
+
+    def result(self, result: "RequestResult"):
+        self._lines.append(result)
+
+    def drain(self, limit: Optional[int] = None) -> List[object]:
+        """Take up to `limit` (default: all) queued items, oldest first"""
+        lines = []
+        try:
+            while limit is None or len(lines) < limit:
+                lines.append(self._lines.popleft())
+        except IndexError:
+            pass
+        return lines
+
+
+class LazyBody:
+    """A captured response body, decoded and JSON-parsed at most once and pretty-printed only
+    when someone looks at it (str()). Capped capture policies keep a prefix of it or nothing."""
+
+    def __init__(self, content: bytes, encoding: Optional[str] = None, size: Optional[int] = None,
+                 mode: str = "full", sha256: Optional[str] = None, path: Optional[str] = None):
+        self.content = content  # The bytes kept
+        self.encoding = encoding or "utf-8"
+        self.size = len(content) if size is None else size  # The bytes received
+        self.mode = mode  # One of CAPTURE_MODES
+        self.sha256 = sha256  # Hex digest (modes "hash" and "disk")
+        self.path = path  # File the body was written to (mode "disk")
+        self._text = None
+        self._json = None
+        self._json_error = None
+        self._formatted = None
+
+    @property
+    def complete(self) -> bool:
+        return len(self.content) == self.size
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.content.decode(self.encoding, errors="replace")
+        return self._text
+
+    def json(self):
+        """The parsed body (parsed on first use); raises ValueError if it is not JSON or was not kept in full"""
+        if self._json is None and self._json_error is None:
+            try:
+                if not self.complete:
+                    raise ValueError(f"Body not captured in full ({self.describe()})")
+                self._json = json.loads(self.text)
+            except ValueError as e:
+                self._json_error = str(e)
+        if self._json_error is not None:
+            raise ValueError(self._json_error)
+        return self._json
+
+    def describe(self) -> str:
+        """Size and what was kept, e.g. 120,000 bytes, first 65,536 kept"""
+        description = f"{self.size:,} bytes"
+        if self.mode == "disk":
+            return f"{description}, saved to {self.path}"
+        if self.mode == "hash":
+            return f"{description}, sha256 {self.sha256}"
+        if not self.complete:
+            return f"{description}, first {len(self.content):,} kept"
+        return description
+
+    def __str__(self):
+        if self._formatted is None:
+            if self.mode in ("hash", "disk"):
+                self._formatted = f"({self.describe()})"
+            elif not self.complete:
+                self._formatted = f"{self.text}\n… (truncated: {self.describe()})"
+            else:
+                try:
+                    self._formatted = json.dumps(self.json(), indent=2, ensure_ascii=False)
+                except ValueError:
+                    self._formatted = self.text
+        return self._formatted
+
+
+def response_body(response) -> LazyBody:
+    """The captured body of a response (one not read by Runner._request is taken whole)"""
+    body = getattr(response, "body", None)
+    if body is None:
+        body = response.body = LazyBody(response.content or b"", response.encoding)
+    return body
+
+
+def result_line(result: "RequestResult") -> str:
+    """One-line summary of a result"""
+    status_icon = "✅" if result.success else "❌"
+    status = result.status_code if result.status_code is not None else result.error
+    attempts = f" ({result.attempts} attempts)" if result.attempts > 1 else ""
+    wait = f" (waited {result.wait:.3f}s for rate limit)" if result.wait else ""
+    return f"{status_icon} {result.method:6} {status} {result.elapsed:.3f}s {result.name}{attempts}{wait}"
+
+
+# ---------------------------------------------------------------------------
+# Request builder
+# ---------------------------------------------------------------------------
+
+@dataclass
+class RequestSpec:
+    """A fully built request, ready to be sent"""
+    name: str
+    method: str
+    url: str
+    headers: Dict[str, str]
+    params: Dict = field(default_factory=dict)
+    json_body: Optional[object] = None
+    endpoint: str = ""  # "Category - Method" of imported methods, used to look up per-endpoint settings
+    body: Optional[bytes] = None  # json_body serialized ahead of time (prepared requests)
+
+
+@dataclass
+class PreparedRequest:
+    """An imported method or template compiled once; copies only need the auth headers added"""
+    spec: RequestSpec
+    source: object  # The Endpoint or template it was built from
+    variables_version: int  # Collection variables version its headers were resolved with
+
+
+@dataclass
+class Phases:
+    """Where the time of one request went, in seconds (time.perf_counter)"""
+    dns: float = 0.0
+    connect: float = 0.0  # TCP handshake
+    tls: float = 0.0
+    ttfb: float = 0.0  # Request sent until the response headers were in
+    download: float = 0.0  # Reading the body
+    reused: bool = True  # False when the request opened a connection (dns, connect and tls are then set)
+
+    @property
+    def opening(self) -> float:
+        return self.dns + self.connect + self.tls
+
+    def __str__(self):
+        timings = ", ".join(f"{name} {getattr(self, name) * 1000:.1f} ms" for name in PHASES)
+        return f"{timings} ({'reused' if self.reused else 'new'} connection)"
+
+
+@dataclass
+class RequestResult:
+    """Outcome of a single request"""
+    name: str
+    method: str
+    url: str
+    success: bool
+    status_code: Optional[int] = None
+    elapsed: float = 0.0
+    error: str = ""
+    attempts: int = 1
+    wait: float = 0.0  # Seconds spent waiting on rate limiters (not part of elapsed)
+    phases: Optional[Phases] = None
+    endpoint: str = ""  # "Category - Method" of imported methods
+    bytes_in: int = 0  # Response body size
+    bytes_out: int = 0  # Request body size
+
+
+def join_url(base_url: str, path: str) -> str:
+    """Join base URL and path with exactly one slash between them"""
+    if path.startswith(('http://', 'https://')):
+        return path
+    if not base_url.endswith('/') and not path.startswith('/'):
+        return f"{base_url}/{path}"
+    if base_url.endswith('/') and path.startswith('/'):
+        return f"{base_url}{path[1:]}"
+    return f"{base_url}{path}"
+
+
+def parse_params(params) -> Dict:
+    """Parse URL-encoded parameters (param1=value1&param2=value2) into a dict"""
+    if not params:
+        return {}
+    if isinstance(params, dict):
+        return dict(params)
+    parsed_params = parse_qs(params)
+    # Convert from {key: [value]} to {key: value} format
+    return {key: value[0] if len(value) == 1 else value for key, value in parsed_params.items()}
+
+
+def parse_body(body) -> Optional[object]:
+    """Parse a JSON request body; empty bodies become None"""
+    if not body:
+        return None
+    if isinstance(body, str):
+        return json.loads(body)
+    return body
+
+
+def body_for_method(method: str, body, params: Dict) -> Tuple[Optional[object], Dict]:
+    """Pick the JSON body and query parameters each HTTP method sends"""
+    if method == "GET":
+        return None, params
+    if method in ("POST", "PUT"):
+        return (body if body is not None else {}), params
+    if method == "DELETE":
+        # For DELETE method, use body if available, otherwise use params
+        if body:
+            return body, {}
+        return None, params
+    return body, params
+
+
+# ---------------------------------------------------------------------------
+# Collection model
+# ---------------------------------------------------------------------------
+
+def request_entry(request_data: Dict) -> Optional[Dict]:
+    """Method, raw URL, headers, body and params of a Postman request (None if empty)"""
+    if not request_data:
+        return None
+
+    # Method and URL
+    method = request_data.get('method', 'GET')
+    url_data = request_data.get('url', {})
+
+    # Build URL path (Postman variables are cleaned by Collection.resolve_entry)
+    if isinstance(url_data, str):
+        full_url = url_data
+    else:
+        full_url = url_data.get('raw', '') or url_data.get('path', '')
+        if isinstance(full_url, list):
+            full_url = '/' + '/'.join(full_url)
+
+    # Headers
+    headers = {}
+    for header in request_data.get('header', []):
+        if header.get('enabled', True):
+            headers[header.get('key', '')] = header.get('value', '')
+
+    # Body
+    body = ""
+    body_data = request_data.get('body', {})
+    if body_data:
+        if body_data.get('mode') == 'raw':
+            body = body_data.get('raw', '')
+        elif body_data.get('mode') == 'formdata':
+            # Convert form data to JSON
+            form_data = {}
+            for form_item in body_data.get('formdata', []):
+                if form_item.get('enabled', True):
+                    form_data[form_item.get('key', '')] = form_item.get('value', '')
+            body = json.dumps(form_data, indent=2)
+
+    # Query parameters
+    params = {}
+    if isinstance(url_data, dict):
+        for param in url_data.get('query', []):
+            if param.get('enabled', True):
+                params[param.get('key', '')] = param.get('value', '')
+
+    return {"method": method, "url": full_url, "headers": headers, "body": body, "params": params}
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class Endpoint:
+    """One imported method. Slotted, with interned methods, base URLs and header names, so tens of
+    thousands of them stay small; fields saved in the GUI are a sparse overlay (`saved`)."""
+
+    __slots__ = ("method", "base_url", "path", "headers", "body", "params", "saved")
+    FIELDS = ("method", "base_url", "path", "headers", "body", "params")
+    SAVED_FIELDS = ("base_url", "path", "headers", "body", "params")
+
+    def __init__(self, method: str = "GET", base_url: str = DEFAULT_BASE_URL, path: str = "/",
+                 headers: Optional[Dict] = None, body="", params: Optional[Dict] = None):
+        self.method = _intern(method)
+        self.base_url = _intern(base_url)
+        self.path = path
+        self.headers = {_intern(key): value for key, value in (headers or {}).items()}
+        self.body = body
+        self.params = params if params is not None else {}
+        self.saved: Optional[Dict[str, str]] = None  # Field -> text as saved in the GUI (None: nothing saved)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Endpoint":
+        return cls(**{name: data[name] for name in cls.FIELDS if name in data})
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    # Read access like the dicts endpoints used to be (api_info["method"], api_info.get("body", ""))
+    def __getitem__(self, name: str):
+        if name not in self.FIELDS:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def get(self, name: str, default=None):
+        return getattr(self, name) if name in self.FIELDS else default
+
+    def save(self, name: str, text: str):
+        """Override a field with text saved in the GUI (headers and params as typed, JSON / URL-encoded)"""
+        if name not in self.SAVED_FIELDS:
+            raise KeyError(name)
+        if self.saved is None:
+            self.saved = {}
+        self.saved[name] = text
+
+    def saved_value(self, name: str, default=None):
+        """The saved text of a field, or default"""
+        return default if self.saved is None else self.saved.get(name, default)
+
+    def __eq__(self, other):
+        if not isinstance(other, Endpoint):
+            return NotImplemented
+        return self.to_dict() == other.to_dict() and self.saved == other.saved
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Endpoint({self.method} {self.base_url}{self.path})"
+
+
+def is_login_request(name: str, request_data: Dict) -> bool:
+    """Check if a request looks like a login method"""
+    name_lower = name.lower()
+
+    # Check name
+    if any(keyword in name_lower for keyword in LOGIN_KEYWORDS):
+        return True
+
+    # Check URL
+    url = request_data.get('url', {})
+    if isinstance(url, dict):
+        url_str = url.get('raw', '').lower()
+        if any(keyword in url_str for keyword in LOGIN_KEYWORDS):
+            return True
+
+    return False
+
+
+_JSON_WHITESPACE = re.compile(r'[ \t\r\n]*')
+
+
+class _JsonReader:
+    """Incremental reader of a JSON file: arrays and objects are walked one element at a time,
+    other values are decoded whole, so memory stays bounded by the largest leaf value"""
+
+    def __init__(self, f, progress: Optional[Callable[[int, int], None]] = None):
+        self.f = f
+        self.size = os.fstat(f.fileno()).st_size
+        self.read_bytes = 0
+        self.progress = progress
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size: int = IMPORT_CHUNK_SIZE) -> bool:
+        """Read at least `size` more bytes into the buffer; False at the end of the file"""
+        if self.eof:
+            return False
+        chunk = self.f.read(max(size, IMPORT_CHUNK_SIZE))
+        self.read_bytes += len(chunk)
+        self.eof = not chunk
+        if self.pos > len(self.buffer) // 2:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        self.buffer += self.text_decoder.decode(chunk, final=self.eof)
+        if self.progress is not None:
+            self.progress(self.read_bytes, self.size)
+        return not self.eof
+
+    def error(self, message: str) -> ValueError:
+        return ValueError(f"Invalid JSON near byte {self.read_bytes - len(self.buffer.encode('utf-8')) + self.pos}"
+                          f": {message}")
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at the end of the file), not consumed"""
+        while True:
+            self.pos = _JSON_WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, characters: str) -> str:
+        character = self.peek()
+        if not character or character not in characters:
+            raise self.error(f"expected one of {characters!r}, found {character!r}")
+        self.pos += 1
+        return character
+
+    def value(self):
+        """Decode the next value whole"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number at the end of the buffer may go on in the next chunk ("1" of "12", "1." of "1.5e-3")
+                if self.eof or end < len(self.buffer) and not (
+                        isinstance(value, (int, float)) and self.buffer[end] in ".eE+-"):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise self.error(e.msg)
+            # Read as much again as is pending, so a large value is not re-decoded once per chunk
+            self._fill(len(self.buffer) - self.pos)
+
+    def items(self) -> Iterator[None]:
+        """Walk an array: yields once per element, which the caller must read before continuing"""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            if self.expect(",]") == "]":
+                return
+
+    def members(self) -> Iterator[str]:
+        """Walk an object: yields each key, whose value the caller must read before continuing"""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise self.error("expected an object key")
+            self.expect(":")
+            yield key
+            if self.expect(",}") == "}":
+                return
+
+
+_variable_versions = itertools.count()
+_VARIABLE_PATTERN = re.compile(r'\{\{([^{}]+)\}\}')
+_UNRESOLVED_PATTERN = re.compile(r'\{\{[^}]+\}\}')
+_PROTOCOL_PATTERN = re.compile(r'https?:/+')
+_SLASHES_PATTERN = re.compile(r'/+')
+
+
+class Variables(dict):
+    """Collection variables; every change gets a new version, which drops the templates resolved with them"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = next(_variable_versions)
+
+    def _changed(self):
+        self.version = next(_variable_versions)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def __ior__(self, other):
+        result = super().__ior__(other)
+        self._changed()
+        return result
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def pop(self, *args):
+        result = super().pop(*args)
+        self._changed()
+        return result
+
+    def popitem(self):
+        result = super().popitem()
+        self._changed()
+        return result
+
+    def setdefault(self, key, default=None):
+        result = super().setdefault(key, default)
+        self._changed()
+        return result
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._changed()
+
+
+CATEGORY_SEPARATOR = "|"  # Joins the folder path of nested categories ("Users|Admin")
+
+
+@dataclass
+class ImportedCollection:
+    """What one pass over a collection file found (Collection.read), before it is added"""
+    categories: List[str] = field(default_factory=list)  # Top-level folders, in file order
+    requests: Dict[str, List[Tuple[str, Dict]]] = field(default_factory=dict)  # Category key -> (name, request_entry)
+    variables: Dict[str, str] = field(default_factory=dict)
+    login_methods: Dict[str, Dict] = field(default_factory=dict)  # "Folder/Sub/Name" -> login candidate
+    request_count: int = 0
+
+
+class CategoryIndex:
+    """Folder tree of a collection's categories. Category keys are folder paths joined by "|"
+    ("Users|Admin|Roles"); every folder on a path is a node, with its child folders (in file order),
+    its methods and the number of methods in and below it, so opening a folder is O(children)."""
+
+    def __init__(self, imported_apis: Dict[str, Dict]):
+        self.imported_apis = imported_apis
+        self.roots: List[str] = []  # Top-level folders
+        self.children: Dict[str, List[str]] = {}  # Node -> child folder nodes
+        self.counts: Dict[str, int] = {}  # Node -> methods in it and in its subfolders
+        for category, methods in imported_apis.items():
+            self._add(category, len(methods))
+
+    def _add(self, category: str, count: int):
+        parent = None
+        for node in self.ancestors(category):
+            if node not in self.children:
+                self.children[node] = []
+                self.counts[node] = 0
+                (self.roots if parent is None else self.children[parent]).append(node)
+            self.counts[node] += count
+            parent = node
+
+    @staticmethod
+    def ancestors(category: str) -> List[str]:
+        """Nodes from the top-level folder down to category ("A", "A|B", "A|B|C")"""
+        parts = category.split(CATEGORY_SEPARATOR)
+        return [CATEGORY_SEPARATOR.join(parts[:depth]) for depth in range(1, len(parts) + 1)]
+
+    @staticmethod
+    def name(node: str) -> str:
+        """Folder name of a node (its last path part)"""
+        return node.rpartition(CATEGORY_SEPARATOR)[2]
+
+    def methods(self, node: str) -> Dict:
+        """Methods directly in a folder (name -> Endpoint, in import order)"""
+        return self.imported_apis.get(node, {})
+
+
+class Collection:
+    """Imported Postman collection: endpoints grouped by category plus collection variables"""
+
+    def __init__(self, log: Optional[Callable[[str], None]] = None):
+        self.imported_apis = {}
+        self.collection_variables = {}  # Store collection variables like baseUrl
+        self._segments: Dict[str, Tuple[str, ...]] = {}  # Template -> split into literals and variable names
+        self._resolved: Tuple[int, Dict[str, str]] = (-1, {})  # Variables version, template -> clean_variables()
+        self._templates: Dict[Tuple[str, str], Tuple[int, Endpoint, Dict]] = {}  # -> (version, endpoint, template)
+        self.log = log or (lambda message: None)
+
+    @property
+    def collection_variables(self) -> "Variables":
+        return self._variables
+
+    @collection_variables.setter
+    def collection_variables(self, variables: Dict):
+        self._variables = variables if isinstance(variables, Variables) else Variables(variables)
+
+    @classmethod
+    def load(cls, file_path: str, selected_categories=None, log=None, progress=None) -> "Collection":
+        """Read a Postman collection file and import the selected categories"""
+        collection = cls(log=log)
+        collection.add(collection.read(file_path, selected_categories, progress))
+        return collection
+
+    def scan_categories(self, file_path: str, progress: Optional[Callable[[int, int], None]] = None) -> List[str]:
+        """Top-level folders of a collection file (the categories read() would find), in file order.
+
+        A quick pass that decodes no more than one request at a time, to choose the categories
+        before read() so only their requests are ever held in memory.
+        """
+        categories = []
+        with open(file_path, 'rb') as f:
+            reader = _JsonReader(f, progress)
+            for key in reader.members():
+                if key != 'item':
+                    reader.value()
+                    continue
+                for _ in reader.items():
+                    name, count = None, 0
+                    for item_key in reader.members():
+                        if item_key == 'name':
+                            name = reader.value()
+                        elif item_key == 'item' and reader.peek() == '[':
+                            for _ in reader.items():
+                                self._skip_item(reader)
+                                count += 1
+                        else:
+                            reader.value()
+                    if name and count:
+                        categories.append(name)
+        self.log(f"📋 Found {len(categories)} categories")
+        return categories
+
+    def _skip_item(self, reader: _JsonReader):
+        """Pass over one item; folders are walked rather than decoded whole"""
+        if reader.peek() != '{':
+            reader.value()
+            return
+        for key in reader.members():
+            if key == 'item' and reader.peek() == '[':
+                for _ in reader.items():
+                    self._skip_item(reader)
+            else:
+                reader.value()
+
+    def read(self, file_path: str, selected_categories=None,
+             progress: Optional[Callable[[int, int], None]] = None) -> ImportedCollection:
+        """Stream a collection file once: categories, requests of the selected categories and login candidates.
+
+        The file is never held in memory as a whole; progress(bytes read, file size) is called per chunk.
+        """
+        found = ImportedCollection()
+        with open(file_path, 'rb') as f:
+            reader = _JsonReader(f, progress)
+            for key in reader.members():
+                if key == 'item':
+                    for _ in reader.items():
+                        self._read_item(reader, found, selected_categories, (), None)
+                elif key == 'variable':
+                    for var in reader.value():
+                        if isinstance(var, dict) and 'key' in var and 'value' in var:
+                            found.variables[var['key']] = var['value']
+                else:
+                    reader.value()
+            if reader.peek():
+                raise reader.error("unexpected data after the collection")
+
+        if found.variables:
+            self.log(f"🔧 Found collection variables: {list(found.variables.keys())}")
+        self.log(f"📋 Found {len(found.categories)} categories and {found.request_count} requests")
+        return found
+
+    def _read_item(self, reader: _JsonReader, found: ImportedCollection, selected_categories, path: Tuple,
+                   category: Optional[str], keep: bool = True):
+        """Stream one item, a folder or a request; category is the key its requests go under (None at the top)"""
+        name = request_data = children = None
+        is_folder = False
+        for key in reader.members():
+            if key == 'name':
+                name = reader.value()
+            elif key == 'request':
+                request_data = reader.value()
+            elif key == 'item' and name is not None:
+                # Usual key order: the folder's name is known, so its items are streamed too
+                is_folder = True
+                folder = self._folder(selected_categories, path, category, keep, name)
+                count = 0
+                for _ in reader.items():
+                    self._read_item(reader, found, selected_categories, *folder)
+                    count += 1
+                self._end_folder(found, path, name, count)
+            elif key == 'item':
+                children = reader.value()  # Items before the folder's name: decoded whole
+            else:
+                reader.value()
+        if children is not None:
+            self._visit_item({'name': name, 'item': children}, found, selected_categories, path, category, keep)
+        elif not is_folder and request_data is not None:
+            self._add_request(found, selected_categories, path, category, keep, name or '', request_data)
+
+    def _visit_item(self, item: Dict, found: ImportedCollection, selected_categories, path: Tuple,
+                    category: Optional[str], keep: bool = True):
+        """_read_item for an item already decoded"""
+        children = item.get('item')
+        if children is not None:
+            name = item.get('name') or ('Unknown' if path else '')
+            folder = self._folder(selected_categories, path, category, keep, name)
+            for child in children:
+                self._visit_item(child, found, selected_categories, *folder)
+            self._end_folder(found, path, name, len(children))
+        elif 'request' in item:
+            self._add_request(found, selected_categories, path, category, keep, item.get('name', ''), item['request'])
+
+    @staticmethod
+    def _folder(selected_categories, path: Tuple, category: Optional[str], keep: bool, name: str):
+        """(path, category, keep) for the items of a folder: top-level folders are categories,
+        deeper ones subcategories keyed by their full path ("Users|Admin|Roles")"""
+        if category is None:
+            return (name,), name, selected_categories is None or name in selected_categories
+        return path + (name,), f"{category}{CATEGORY_SEPARATOR}{name}", keep
+
+    @staticmethod
+    def _end_folder(found: ImportedCollection, path: Tuple, name: str, count: int):
+        if not path and name and count:
+            found.categories.append(name)
+
+    def _add_request(self, found: ImportedCollection, selected_categories, path: Tuple, category: Optional[str],
+                     keep: bool, name: str, request_data):
+        if isinstance(request_data, dict) and is_login_request(name, request_data):
+            url = request_data.get('url', '')
+            body = request_data.get('body') or {}
+            found.login_methods["/".join(path + (name,))] = {
+                'name': "/".join(path + (name,)),
+                'method': request_data.get('method', 'POST'),
+                'url_path': url.get('raw', '') if isinstance(url, dict) else url,
+                'headers': {header.get('key', ''): header.get('value', '')
+                            for header in request_data.get('header', []) if header.get('enabled', True)},
+                'body': body.get('raw', '{}') if body.get('mode') == 'raw' else '{}'
+            }
+        if category is None:
+            # Single request outside any folder
+            category = "Imported APIs"
+            keep = selected_categories is None or category in selected_categories
+        if not keep:
+            return
+        try:
+            entry = request_entry(request_data)
+        except Exception as e:
+            self.log(f"  ❌ Error parsing request {name}: {str(e)}")
+            return
+        if entry is not None:
+            found.requests.setdefault(category, []).append((name, entry))
+            found.request_count += 1
+
+    def add(self, found: ImportedCollection, selected_categories=None) -> int:
+        """Import what read() found, only the selected top-level categories; returns the number of methods.
+        Empties found.requests as it goes, so the requests are not held twice."""
+        self.collection_variables = dict(found.variables)
+        imported_count = 0
+        while found.requests:
+            category = next(iter(found.requests))
+            requests = found.requests.pop(category)
+            if selected_categories is not None and category.split(CATEGORY_SEPARATOR)[0] not in selected_categories:
+                continue
+            for name, entry in requests:
+                self.store_entry(category, name, self.resolve_entry(entry))
+            imported_count += len(requests)
+            self.log(f"📁 Imported {len(requests)} methods into {category}")
+        return imported_count
+
+    def resolve_entry(self, entry: Dict) -> Endpoint:
+        """Turn a request_entry's raw URL into base_url and path, using the collection variables"""
+        # Clean Postman variables from the URL
+        cleaned_url = self.clean_variables(entry['url'])
+
+        # Extract base URL and path
+        if '://' in cleaned_url:
+            # It's a full URL, extract base URL and path
+            try:
+                parsed = urlparse(cleaned_url)
+                base_url = f"{parsed.scheme}://{parsed.netloc}"
+                path = parsed.path if parsed.path else "/"
+            except ValueError:
+                # Fallback: simple string manipulation
+                parts = cleaned_url.split('/', 3)
+                if len(parts) >= 3:
+                    base_url = f"{parts[0]}//{parts[2]}"
+                    path = '/' + parts[3] if len(parts) > 3 else "/"
+                else:
+                    base_url = DEFAULT_BASE_URL
+                    path = "/"
+        else:
+            # It's just a path
+            base_url = DEFAULT_BASE_URL
+            path = cleaned_url if cleaned_url.startswith('/') else '/' + cleaned_url
+
+        return Endpoint(entry['method'], base_url, path, entry['headers'], entry['body'], entry['params'])
+
+    def store_entry(self, category_name: str, request_name: str, entry: Endpoint) -> str:
+        """Add to imported APIs (preserve duplicates by uniquifying the name); returns the name used"""
+        methods = self.imported_apis.setdefault(category_name, {})
+        unique_name = request_name
+        if unique_name in methods:
+            counter = 2
+            while f"{request_name} ({counter})" in methods:
+                counter += 1
+            unique_name = f"{request_name} ({counter})"
+        methods[unique_name] = entry
+        return unique_name
+
+    def clean_variables(self, url_or_path):
+        """Replace Postman variables with actual values from collection variables.
+
+        Each template is split into literal and variable segments once; its result is
+        cached until the variables change, so repeated calls are one dict lookup.
+        """
+        if not url_or_path:
+            return ""
+
+        variables = self._variables
+        version, resolved = self._resolved
+        if version != variables.version:
+            self._resolved = (variables.version, {})
+            version, resolved = self._resolved
+        cleaned = resolved.get(url_or_path)
+        if cleaned is None:
+            if len(resolved) >= TEMPLATE_CACHE_SIZE:
+                resolved.clear()
+            cleaned = resolved[url_or_path] = self._resolve(url_or_path, variables)
+        return cleaned
+
+    def _resolve(self, url_or_path: str, variables: Dict) -> str:
+        segments = self._segments.get(url_or_path)
+        if segments is None:
+            if len(self._segments) >= TEMPLATE_CACHE_SIZE:
+                self._segments.clear()
+            # [literal, variable name, literal, ...]; () for stray braces like "{{{{id}}"
+            segments = tuple(_VARIABLE_PATTERN.split(url_or_path))
+            if '{{{' in url_or_path or any('{{' in literal for literal in segments[::2]):
+                segments = ()
+            self._segments[url_or_path] = segments
+
+        values = [str(variables.get(name, '')) for name in segments[1::2]]
+        if segments and not any('{' in value or '}' in value for value in values):
+            # Replace collection variables with their values; unresolved variables become empty
+            parts = list(segments)
+            parts[1::2] = values
+            cleaned = "".join(parts)
+        else:
+            # Stray braces in the template or in values: substitute one variable at a time
+            cleaned = url_or_path
+            for var_name, var_value in variables.items():
+                cleaned = cleaned.replace(f"{{{{{var_name}}}}}", str(var_value))
+            cleaned = _UNRESOLVED_PATTERN.sub('', cleaned)
+
+        if ':/' in cleaned or '//' in cleaned:
+            # Fix protocol issues - ensure https:// or http:// is properly formatted
+            cleaned = _PROTOCOL_PATTERN.sub('https://', cleaned)
+
+            # Clean up any double slashes that might result from variable removal, but preserve protocol
+            # Split by protocol first to avoid breaking https://
+            if '://' in cleaned:
+                protocol, rest = cleaned.split('://', 1)
+                cleaned = f"{protocol}://{_SLASHES_PATTERN.sub('/', rest)}"
+            else:
+                cleaned = _SLASHES_PATTERN.sub('/', cleaned)
+
+        return cleaned.strip()
+
+    def clean_headers(self, headers: Dict) -> Dict:
+        """Clean Postman variables from header values"""
+        cleaned_headers = {}
+        for key, value in headers.items():
+            if isinstance(value, str):
+                cleaned_headers[key] = self.clean_variables(value)
+            else:
+                cleaned_headers[key] = value
+        return cleaned_headers
+
+    def iter_methods(self) -> Iterator[Tuple[str, str, "Endpoint"]]:
+        """Yield (category, method name, endpoint) in import order"""
+        for category, methods in self.imported_apis.items():
+            for method_name, api_info in methods.items():
+                yield category, method_name, api_info
+
+    def template_for(self, category: str, method_name: str) -> Dict:
+        """Build the same request template the GUI's Load Template would produce.
+
+        The template is kept until the endpoint or the collection variables change, so repeated
+        runs get the same dict (and reuse the Runner's prepared request for it); do not modify it.
+        """
+        endpoint = self.imported_apis[category][method_name]
+        version = self._variables.version
+        cached = self._templates.get((category, method_name))
+        if cached is not None and cached[0] == version and cached[1] is endpoint:
+            return cached[2]
+        base_url = self.collection_variables.get('baseUrl', '') or self.clean_variables(endpoint.base_url)
+        params = endpoint.params
+        template = {
+            "method": endpoint.method,
+            "base_url": base_url,
+            "path": endpoint.path,
+            "headers": self.clean_headers(endpoint.headers),
+            "body": endpoint.body,
+            "params": urlencode(params) if isinstance(params, dict) else params
+        }
+        self._templates[category, method_name] = (version, endpoint, template)
+        return template
+
+    def forget_templates(self, endpoint: Optional[str] = None):
+        """Drop the templates of one "Category - Method" (default: all)"""
+        for key in list(self._templates):
+            if endpoint is None or f"{key[0]} - {key[1]}" == endpoint:
+                self._templates.pop(key, None)
+
+
+# ---------------------------------------------------------------------------
+# Settings and connection pooling
+# ---------------------------------------------------------------------------
+
+def load_settings(file_path: str) -> Dict:
+    """Read a settings JSON file ({"pools": {...}, ...}); raises ValueError for unknown sections"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        settings = json.load(f)
+    check_settings(settings)
+    return settings
+
+
+def check_settings(settings: Dict):
+    if not isinstance(settings, dict):
+        raise ValueError("Settings must be a JSON object")
+    unknown = set(settings) - set(SETTINGS_SECTIONS)
+    if unknown:
+        raise ValueError(f"Unknown settings section(s): {', '.join(sorted(unknown))} "
+                         f"(expected {', '.join(SETTINGS_SECTIONS)})")
+    for name, config_class in (("pools", PoolConfig), ("retries", RetryPolicy), ("circuit_breakers", BreakerConfig),
+                               ("rate_limits", RateLimitConfig), ("timeouts", TimeoutPolicy), ("capture", CapturePolicy)):
+        for entry in settings.get(name, {}).values():
+            config_class.from_dict(entry)
+
+
+def scoped_settings(section: Dict[str, Dict], endpoint: str = "", url: str = "") -> Dict:
+    """Merge the entries of a settings section that apply to a request.
+
+    Keys are "*" (everything), a base URL, a category or "Category - Method";
+    more specific entries override the fields they set, in that order.
+    """
+    merged = {}
+    for key in matching_keys(section, endpoint, url):
+        merged.update(section[key])
+    return merged
+
+
+def matching_keys(section: Dict[str, Dict], endpoint: str = "", url: str = "") -> List[str]:
+    """Keys of a settings section that apply to a request, least specific first"""
+    keys = ["*"] if "*" in section else []
+    url = url.lower()
+    keys.extend(sorted((key for key in section if "://" in key and url.startswith(key.lower())), key=len))
+    category = endpoint.partition(" - ")[0]
+    keys.extend(key for key in dict.fromkeys((category, endpoint)) if key and key in section)
+    return keys
+
+
+def retry_after_seconds(value: Optional[str]) -> float:
+    """Seconds to wait according to a Retry-After header (delay in seconds or an HTTP date)"""
+    if not value:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return 0.0
+
+
+@dataclass
+class RetryPolicy:
+    """When and how often a failed request is sent again"""
+    attempts: int = 1  # Total tries; 1 = no retries
+    backoff: float = 0.5  # Delay before the first retry (seconds), doubled for each further retry
+    max_backoff: float = 10.0
+    jitter: float = 0.5  # Each delay is randomly shortened by up to this fraction, so clients do not retry in step
+    retry_on: List[int] = field(default_factory=lambda: [502, 503, 504])  # Timeouts and connection errors always count
+    methods: List[str] = field(default_factory=lambda: ["GET", "PUT", "DELETE"])  # Idempotent methods only
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RetryPolicy":
+        try:
+            return cls(**data)
+        except TypeError as e:
+            raise ValueError(f"Invalid retry settings {data}: {e}")
+
+    def delay(self, retry: int) -> float:
+        """Seconds to wait before retry number `retry` (0 = first retry)"""
+        return min(self.max_backoff, self.backoff * 2 ** retry) * (1 - self.jitter * random.random())
+
+
+@dataclass
+class TimeoutPolicy:
+    """Timeouts of a request; connect and read default to the runner's timeout"""
+    connect: Optional[float] = None  # Seconds to open the connection
+    read: Optional[float] = None  # Seconds to wait for the response
+    deadline: Optional[float] = None  # Seconds for the whole request, rate limit waits, retries and backoff included
+    run: Optional[float] = None  # Seconds a whole run may take (only read from the "*" entry)
+    p99_factor: float = 0.0  # Above 0: cut the read timeout to this many times the method's p99 so far...
+    min_samples: int = 20  # ...once it has this many responses...
+    min_read: float = 1.0  # ...but never below this
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TimeoutPolicy":
+        try:
+            policy = cls(**data)
+        except TypeError as e:
+            raise ValueError(f"Invalid timeout settings {data}: {e}")
+        for name in ("connect", "read", "deadline", "run"):
+            value = getattr(policy, name)
+            if value is not None and value <= 0:
+                raise ValueError(f"Invalid timeout settings {data}: {name} must be above 0")
+        if policy.p99_factor < 0 or policy.min_samples < 1 or policy.min_read <= 0:
+            raise ValueError(f"Invalid timeout settings {data}: p99_factor must be at least 0, "
+                             "min_samples at least 1 and min_read above 0")
+        return policy
+
+
+@dataclass
+class CapturePolicy:
+    """How much of a response body is kept in memory and logged"""
+    mode: str = "full"  # full, truncate (first max_kb), hash (size and SHA-256 only) or disk (streamed to a file)
+    max_kb: float = 64  # truncate: KB kept; hash/disk: bodies up to this size are still kept (for auth tokens)
+    directory: str = "responses"  # disk: folder the bodies are written to
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CapturePolicy":
+        try:
+            policy = cls(**data)
+        except TypeError as e:
+            raise ValueError(f"Invalid capture settings {data}: {e}")
+        if policy.mode not in CAPTURE_MODES or policy.max_kb < 0:
+            raise ValueError(f"Invalid capture settings {data}: mode must be one of {', '.join(CAPTURE_MODES)} "
+                             "and max_kb at least 0")
+        return policy
+
+
+_body_files = itertools.count(1)  # Keeps the names of bodies written in the same second apart
+_UNSAFE_FILE_CHARS = re.compile(r'[^\w.-]+')
+
+
+class BodyCapture:
+    """Takes a response body chunk by chunk as it is read, keeping only what the capture policy asks for"""
+
+    def __init__(self, policy: CapturePolicy, encoding: Optional[str] = None, name: str = "body"):
+        self.policy = policy
+        self.encoding = encoding
+        self.name = name
+        self.limit = None if policy.mode == "full" else int(policy.max_kb * 1024)
+        self.digest = hashlib.sha256() if policy.mode in ("hash", "disk") else None
+        self.kept, self.kept_size, self.size = [], 0, 0
+        self.path = self._file = None
+
+    def feed(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.digest is not None:
+            self.digest.update(chunk)
+        if self.policy.mode == "disk":
+            if self._file is None:
+                os.makedirs(self.policy.directory, exist_ok=True)
+                safe_name = _UNSAFE_FILE_CHARS.sub('_', self.name)[:60]
+                file_name = f"{datetime.now():%Y%m%d-%H%M%S}-{next(_body_files)}-{safe_name}.body"
+                self.path = os.path.join(self.policy.directory, file_name)
+                self._file = open(self.path, "wb")
+            self._file.write(chunk)
+        if self.limit is None or self.kept_size < self.limit:
+            piece = chunk if self.limit is None else chunk[:self.limit - self.kept_size]
+            self.kept.append(piece)
+            self.kept_size += len(piece)
+
+    def close(self):
+        """Close the body file (disk mode); also done by finish()"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def finish(self) -> LazyBody:
+        self.close()
+        content = b"".join(self.kept)
+        if self.digest is not None and self.size > len(content):
+            content = b""  # hash/disk keep only small bodies, whole
+        return LazyBody(content, self.encoding, self.size, self.policy.mode,
+                        self.digest.hexdigest() if self.digest else None, self.path)
+
+
+def capture_body(chunks: Iterable[bytes], policy: CapturePolicy, encoding: Optional[str] = None,
+                 name: str = "body") -> LazyBody:
+    """Read a response body chunk by chunk, keeping only what the capture policy asks for"""
+    capture = BodyCapture(policy, encoding, name)
+    try:
+        for chunk in chunks:
+            capture.feed(chunk)
+    finally:
+        capture.close()
+    return capture.finish()
+
+
+@dataclass
+class BreakerConfig:
+    """Fail fast once too many of a host's recent calls failed"""
+    error_rate: float = 0.5  # Opens when this share of the last `window` calls failed...
+    window: int = 20
+    min_calls: int = 10  # ...and at least this many calls were made
+    cooldown: float = 30.0  # Seconds to fail fast before letting one trial call through
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "BreakerConfig":
+        try:
+            return cls(**data)
+        except TypeError as e:
+            raise ValueError(f"Invalid circuit breaker settings {data}: {e}")
+
+
+class CircuitBreaker:
+    """Per-host circuit breaker (thread-safe). Failures are timeouts, connection errors and 5xx responses."""
+
+    def __init__(self, config: BreakerConfig):
+        self.config = config
+        self.outcomes = deque(maxlen=config.window)
+        self.opened_at: Optional[float] = None
+        self.trial_running = False
+        self.short_circuited = 0
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if self.trial_running else "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; counts the calls it refuses"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if not self.trial_running and time.monotonic() - self.opened_at >= self.config.cooldown:
+                self.trial_running = True
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record(self, success: bool):
+        with self._lock:
+            if self.opened_at is not None:
+                if not self.trial_running:
+                    return  # A call that was already in flight when the breaker opened
+                # Outcome of the trial call: close again or stay open for another cooldown
+                self.trial_running = False
+                if success:
+                    self.opened_at = None
+                    self.outcomes.clear()
+                else:
+                    self.opened_at = time.monotonic()
+                return
+            self.outcomes.append(success)
+            failures = self.outcomes.count(False)
+            if len(self.outcomes) >= self.config.min_calls and failures >= self.config.error_rate * len(self.outcomes):
+                self.opened_at = time.monotonic()
+                self.times_opened += 1
+
+
+@dataclass
+class RateLimitConfig:
+    """Token bucket settings of one rate_limits entry"""
+    rate: float  # Requests per second
+    burst: float = 1.0  # Requests that may go out back to back after an idle period
+    min_rate: float = 0.1  # Floor for the rate after 429 responses
+    recovery: float = 30.0  # Seconds to climb back from a throttled rate to `rate`
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RateLimitConfig":
+        try:
+            config = cls(**data)
+        except TypeError as e:
+            raise ValueError(f"Invalid rate limit settings {data}: {e}")
+        if config.rate <= 0 or config.burst < 1 or not 0 < config.min_rate <= config.rate:
+            raise ValueError(f"Invalid rate limit settings {data}: rate and min_rate must be above 0 "
+                             "(min_rate at most rate) and burst at least 1")
+        return config
+
+
+class TokenBucket:
+    """Token bucket shared by threads, asyncio tasks and (with a multiprocessing context) processes.
+
+    take() never blocks: it either takes a token or says how long to wait
+    before trying again, so asyncio code can wait with asyncio.sleep and a
+    429 also slows down requests that are already waiting. A 429 cuts the
+    rate by THROTTLE_FACTOR and pauses the bucket for its Retry-After; the
+    rate then climbs back linearly over `recovery` seconds.
+    """
+
+    # Indexes into the shared state
+    TOKENS, UPDATED, THROTTLED_RATE, THROTTLED_AT, THROTTLED = range(5)
+
+    def __init__(self, config: RateLimitConfig, context=None):
+        self.config = config
+        state = [config.burst, time.monotonic(), config.rate, 0.0, 0]
+        if context is None:
+            self._state = state
+            self._lock = threading.Lock()
+        else:
+            # Monotonic time is system wide, so processes can share timestamps
+            self._state = context.RawArray("d", state)
+            self._lock = context.Lock()
+
+    def _rate(self, now: float) -> float:
+        state = self._state
+        if not state[self.THROTTLED_AT] or now <= state[self.THROTTLED_AT]:
+            return state[self.THROTTLED_RATE]
+        recovered = min(1.0, (now - state[self.THROTTLED_AT]) / self.config.recovery) if self.config.recovery else 1.0
+        return state[self.THROTTLED_RATE] + (self.config.rate - state[self.THROTTLED_RATE]) * recovered
+
+    def rate(self) -> float:
+        """Current rate in requests per second"""
+        with self._lock:
+            return self._rate(time.monotonic())
+
+    @property
+    def throttled(self) -> int:
+        """Number of 429 responses that cut the rate"""
+        return int(self._state[self.THROTTLED])
+
+    def take(self) -> float:
+        """Take a token if one is available (returns 0), else the seconds to wait before trying again"""
+        with self._lock:
+            state = self._state
+            now = time.monotonic()
+            rate = self._rate(now)
+            if now < state[self.UPDATED]:
+                # Paused by a Retry-After
+                return state[self.UPDATED] - now + max(0.0, 1 - state[self.TOKENS]) / rate
+            state[self.TOKENS] = min(self.config.burst, state[self.TOKENS] + (now - state[self.UPDATED]) * rate)
+            state[self.UPDATED] = now
+            if state[self.TOKENS] >= 1 - 1e-9:
+                state[self.TOKENS] -= 1
+                return 0.0
+            return (1 - state[self.TOKENS]) / rate
+
+    def refund(self):
+        """Give back a token taken for a request that did not go out"""
+        with self._lock:
+            self._state[self.TOKENS] = min(self.config.burst, self._state[self.TOKENS] + 1)
+
+    def throttle(self, retry_after: float, sent: float) -> Optional[float]:
+        """React to a 429 for a request sent at `sent` (monotonic); returns the new rate, or None if unchanged"""
+        with self._lock:
+            state = self._state
+            now = time.monotonic()
+            state[self.TOKENS] = min(state[self.TOKENS], 0.0)
+            state[self.UPDATED] = max(state[self.UPDATED], now + retry_after)
+            if sent < state[self.THROTTLED_AT]:
+                # Sent before the last cut took effect: that cut already accounts for it
+                return None
+            rate = max(self.config.min_rate, self._rate(now) * THROTTLE_FACTOR)
+            state[self.THROTTLED_RATE] = rate
+            state[self.THROTTLED_AT] = now + retry_after
+            state[self.THROTTLED] += 1
+            return rate
+
+
+class RateLimiter:
+    """Token buckets of a rate_limits settings section, one per entry.
+
+    Entries are keyed like the other sections ("*", a base URL, a category
+    or "Category - Method") but are not merged: a request takes a token from
+    every entry that applies, so a base URL cap and an endpoint cap both hold.
+    Pass a multiprocessing context to share the buckets with worker processes.
+    """
+
+    def __init__(self, section: Dict[str, Dict], context=None):
+        self.section = section
+        self.buckets = {key: TokenBucket(RateLimitConfig.from_dict(entry), context) for key, entry in section.items()}
+
+    def take(self, spec: RequestSpec) -> float:
+        """Take a token from every bucket that applies (returns 0), else the seconds to wait before trying again"""
+        taken = []
+        for key in matching_keys(self.section, spec.endpoint, spec.url):
+            wait = self.buckets[key].take()
+            if wait:
+                for bucket in taken:
+                    bucket.refund()
+                return wait
+            taken.append(self.buckets[key])
+        return 0.0
+
+    def throttle(self, spec: RequestSpec, retry_after: float, sent: float) -> List[Tuple[str, float]]:
+        """Slow down the buckets that applied to a request answered with 429; returns (key, new rate) pairs"""
+        throttled = []
+        for key in matching_keys(self.section, spec.endpoint, spec.url):
+            rate = self.buckets[key].throttle(retry_after, sent)
+            if rate is not None:
+                throttled.append((key, rate))
+        return throttled
+
+
+@dataclass
+class PoolConfig:
+    """Connection pool settings for one base URL"""
+    pool_connections: int = 10  # Hosts whose pools are cached
+    pool_maxsize: int = 10  # Connections kept open per host; raise it to the number of parallel workers
+    pool_block: bool = False  # Wait for a free connection instead of opening extra ones that are then discarded
+    keep_alive: bool = True  # False sends "Connection: close" so every request opens a new connection
+    tcp_keepalive: bool = False  # Enable TCP keepalive probes so idle pooled connections survive NAT/firewalls
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PoolConfig":
+        try:
+            return cls(**data)
+        except TypeError as e:
+            raise ValueError(f"Invalid pool settings {data}: {e}")
+
+
+class ConnectionStats:
+    """Connections opened, reused and discarded by one adapter (thread-safe).
+
+    `opened` counts sockets actually connected, so a pooled connection object that urllib3
+    reopens (e.g. after the server sent `Connection: close`) counts as opened, not reused.
+    """
+
+    def __init__(self):
+        self.opened = 0
+        self.checkouts = 0
+        self.discarded = 0
+        self._lock = threading.Lock()
+
+    def count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    @property
+    def reused(self) -> int:
+        return max(0, self.checkouts - self.opened)
+
+    def __str__(self):
+        reuse = 100.0 * self.reused / self.checkouts if self.checkouts else 0.0
+        return f"{self.opened} opened, {self.reused} reused ({reuse:.0f}%), {self.discarded} discarded (pool full)"
+
+
+class PhaseStats:
+    """Mean request phases of a run (thread-safe)"""
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.totals = dict.fromkeys(PHASES, 0.0)
+        self._lock = threading.Lock()
+
+    def record(self, phases: Phases):
+        with self._lock:
+            self.requests += 1
+            if not phases.reused:
+                self.new_connections += 1
+            for name in PHASES:
+                self.totals[name] += getattr(phases, name)
+
+    def __str__(self):
+        text = (f"ttfb {self.totals['ttfb'] / self.requests * 1000:.1f} ms, "
+                f"download {self.totals['download'] / self.requests * 1000:.1f} ms (mean of {self.requests} requests)")
+        if self.new_connections:
+            # Connection phases only happen on new connections, so average over those
+            text += f"; {self.new_connections} new connection(s): " + ", ".join(
+                f"{name} {self.totals[name] / self.new_connections * 1000:.1f} ms" for name in CONNECTION_PHASES)
+        return text
+
+
+def _timed_connection(connection_class, tls: bool, stats: ConnectionStats):
+    """Subclass of a urllib3 connection class that counts the sockets it opens in `stats` and
+    times DNS, TCP connect and TLS into the current request's Phases"""
+
+    class TimedConnection(connection_class):
+        def _new_conn(self):
+            sock = self._timed_new_conn()
+            stats.count("opened")
+            return sock
+
+        def _timed_new_conn(self):
+            phases = _request_phases.get()
+            if phases is None:
+                return super()._new_conn()
+            started = time.perf_counter()
+            try:
+                addresses = socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)
+            except OSError:
+                return super()._new_conn()  # Resolves again and raises urllib3's usual error
+            resolved = time.perf_counter()
+            # Connect to the resolved addresses in turn, as urllib3 would, so DNS is not timed twice
+            host, error = self._dns_host, None
+            try:
+                for address in dict.fromkeys(info[4][0] for info in addresses):
+                    self._dns_host = address
+                    try:
+                        sock = super()._new_conn()
+                        break
+                    except ConnectTimeoutError as e:
+                        error = e
+                else:
+                    raise error
+            finally:
+                self._dns_host = host
+            phases.dns += resolved - started
+            phases.connect += time.perf_counter() - resolved
+            phases.reused = False
+            return sock
+
+        if tls:
+            def connect(self):
+                phases = _request_phases.get()
+                if phases is None:
+                    return super().connect()
+                started, opening = time.perf_counter(), phases.opening
+                super().connect()
+                # What connect() took beyond DNS and the TCP handshake is the TLS handshake
+                phases.tls += max(0.0, time.perf_counter() - started - (phases.opening - opening))
+
+    return TimedConnection
+
+
+def _counting_pool(pool_class, stats: ConnectionStats, keep_alive: bool, active: "weakref.WeakSet"):
+    """Subclass of a urllib3 pool class that reports to `stats`, times new connections, tracks
+    checked-out connections in `active` and never reuses connections without keep_alive"""
+
+    class CountingPool(pool_class):
+        ConnectionCls = _timed_connection(pool_class.ConnectionCls, tls=pool_class is HTTPSConnectionPool, stats=stats)
+
+        def _get_conn(self, timeout=None):
+            stats.count("checkouts")
+            conn = super()._get_conn(timeout)
+            active.add(conn)
+            return conn
+
+        def _put_conn(self, conn):
+            if conn is not None:  # None after a failed request
+                active.discard(conn)
+            if conn is not None and not keep_alive:
+                conn.close()
+                conn = None
+            elif conn is not None and self.pool is not None and self.pool.full():
+                stats.count("discarded")
+            super()._put_conn(conn)
+
+    return CountingPool
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter configured by a PoolConfig that counts connection reuse"""
+
+    def __init__(self, config: Optional[PoolConfig] = None):
+        self.pool_config = config or PoolConfig()
+        self.stats = ConnectionStats()
+        self.active = weakref.WeakSet()  # Connections checked out by requests in flight
+        super().__init__(pool_connections=self.pool_config.pool_connections, pool_maxsize=self.pool_config.pool_maxsize,
+                         pool_block=self.pool_config.pool_block)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        if self.pool_config.tcp_keepalive:
+            pool_kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool(HTTPConnectionPool, self.stats, self.pool_config.keep_alive, self.active),
+            "https": _counting_pool(HTTPSConnectionPool, self.stats, self.pool_config.keep_alive, self.active),
+        }
+
+    def abort(self) -> int:
+        """Shut down the sockets of requests in flight (from any thread) so they fail at once; returns how many"""
+        aborted = 0
+        for conn in list(self.active):
+            sock = getattr(conn, "sock", None)
+            if sock is None:
+                continue
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+                aborted += 1
+            except OSError:
+                pass  # Already closed
+        return aborted
+
+    def add_headers(self, request, **kwargs):
+        if not self.pool_config.keep_alive:
+            request.headers["Connection"] = "close"
+
+    def send(self, request, stream=False, **kwargs):
+        phases = _request_phases.get()
+        if phases is None:
+            return super().send(request, stream=stream, **kwargs)
+        started, opening = time.perf_counter(), phases.opening
+        response = super().send(request, stream=stream, **kwargs)
+        headers_in = time.perf_counter()
+        phases.ttfb += headers_in - started - (phases.opening - opening)
+        if not stream:
+            response.content  # Read the body here (requests would right after) to time the download
+            phases.download += time.perf_counter() - headers_in
+        return response
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+class PacingPolicy:
+    """How long to wait between consecutive automation steps.
+
+    none   - send the next step as soon as the previous one completes
+    fixed  - constant think time (seconds)
+    random - think time drawn uniformly from [think_time, max_think_time]
+    rate   - space step starts 1/rate seconds apart (target requests/sec)
+    """
+
+    def __init__(self, mode: str = "none", think_time: float = 0.0, max_think_time: Optional[float] = None,
+                 rate: float = 0.0):
+        if mode not in PACING_MODES:
+            raise ValueError(f"Unknown pacing mode: {mode} (expected one of {', '.join(PACING_MODES)})")
+        if mode == "rate" and rate <= 0:
+            raise ValueError("Pacing rate must be above 0 requests/sec")
+        if think_time < 0 or (max_think_time is not None and max_think_time < think_time):
+            raise ValueError("Think time must be >= 0 and max >= min")
+        self.mode = mode
+        self.think_time = think_time
+        self.max_think_time = think_time if max_think_time is None else max_think_time
+        self.rate = rate
+
+    @classmethod
+    def parse(cls, spec: str) -> "PacingPolicy":
+        """Parse "none", "fixed:2", "random:0.5-2" or "rate:10" """
+        mode, _, value = spec.strip().partition(":")
+        mode = mode.strip().lower()
+        value = value.strip()
+        try:
+            if mode == "fixed":
+                return cls(mode, think_time=float(value or 0))
+            if mode == "random":
+                low, _, high = value.partition("-")
+                return cls(mode, think_time=float(low or 0), max_think_time=float(high or low or 0))
+            if mode == "rate":
+                return cls(mode, rate=float(value))
+        except ValueError as e:
+            raise ValueError(f"Invalid pacing '{spec}': {e}")
+        return cls(mode)
+
+    def delay(self, step_started: float) -> float:
+        """Seconds to wait before the next step; step_started is time.monotonic() at the last step's start"""
+        if self.mode == "fixed":
+            return self.think_time
+        if self.mode == "random":
+            return random.uniform(self.think_time, self.max_think_time)
+        if self.mode == "rate":
+            return max(0.0, step_started + 1.0 / self.rate - time.monotonic())
+        return 0.0
+
+    @property
+    def spec(self) -> str:
+        """The policy in the format parse() reads"""
+        if self.mode == "fixed":
+            return f"fixed:{self.think_time!r}"
+        if self.mode == "random":
+            return f"random:{self.think_time!r}-{self.max_think_time!r}"
+        if self.mode == "rate":
+            return f"rate:{self.rate!r}"
+        return "none"
+
+    def __str__(self):
+        if self.mode == "fixed":
+            return f"fixed {self.think_time:g}s"
+        if self.mode == "random":
+            return f"random {self.think_time:g}-{self.max_think_time:g}s"
+        if self.mode == "rate":
+            return f"{self.rate:g} req/s"
+        return "no delay"
+
+
+def dependency_order(steps: List[str], dependencies: Dict[str, Iterable[str]]) -> List[str]:
+    """Order steps so each comes after everything it depends on, keeping the given order otherwise.
+
+    Dependencies on steps that are not in `steps` are ignored; a cycle raises ValueError.
+    """
+    step_set = set(steps)
+    waiting_on = {step: set(dependencies.get(step, ())) & step_set - {step} for step in steps}
+    ordered = []
+    done = set()
+    while len(ordered) < len(steps):
+        ready = [step for step in steps if step not in done and not waiting_on[step] - done]
+        if not ready:
+            cycle = [step for step in steps if step not in done]
+            raise ValueError(f"Circular dependency between: {', '.join(cycle)}")
+        # Take only the first ready step so earlier steps keep precedence
+        ordered.append(ready[0])
+        done.add(ready[0])
+    return ordered
+
+
+def new_session(pool_size: int = 10, pools: Optional[Dict[str, PoolConfig]] = None) -> requests.Session:
+    """Create the shared HTTP session used for every request.
+
+    `pool_size` sizes the default pools; `pools` maps base URLs to their own
+    pool settings (requests picks the adapter with the longest matching prefix).
+    """
+    session = requests.Session()
+    session.verify = False
+    adapter = PooledAdapter(PoolConfig(pool_connections=max(pool_size, 10), pool_maxsize=max(pool_size, 10)))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    configure_pools(session, pools or {})
+    return session
+
+
+def configure_pools(session: requests.Session, pools: Dict[str, PoolConfig]):
+    """Replace the per-base-URL pools of a session (the default pools and cookies are kept)"""
+    for prefix in [prefix for prefix in session.adapters if prefix not in ('http://', 'https://')]:
+        session.adapters.pop(prefix).close()
+    for base_url, config in pools.items():
+        session.mount(base_url, PooledAdapter(config))
+
+
+def abort_requests(session: requests.Session) -> int:
+    """Abort the requests in flight on a session's pooled adapters; returns how many were aborted"""
+    adapters = {id(adapter): adapter for adapter in session.adapters.values() if isinstance(adapter, PooledAdapter)}
+    return sum(adapter.abort() for adapter in adapters.values())
+
+
+def connection_stats(session: requests.Session) -> List[Tuple[str, ConnectionStats]]:
+    """(base URL, stats) of every pooled adapter that has sent requests"""
+    seen = set()
+    stats = []
+    for prefix, adapter in session.adapters.items():
+        if isinstance(adapter, PooledAdapter) and adapter.stats.checkouts and id(adapter) not in seen:
+            seen.add(id(adapter))
+            stats.append((prefix if prefix not in ('http://', 'https://') else "other hosts", adapter.stats))
+    return stats
+
+
+class Runner:
+    """Builds and sends requests, tracks auth tokens and reports to a result sink"""
+
+    def __init__(self, collection: Optional[Collection] = None, sink: Optional[ResultSink] = None,
+                 session: Optional[requests.Session] = None, timeout: float = DEFAULT_TIMEOUT,
+                 max_per_host: Optional[int] = None):
+        self.collection = collection if collection is not None else Collection()
+        self.sink = sink or ResultSink()
+        self.session = session or new_session()
+        self.timeout = timeout
+        self.max_per_host = max_per_host  # Concurrent requests per host (None = unlimited)
+        self.xsrf_token = ""
+        self.auth_token = ""  # For Bearer token authentication
+        self.session_id = ""
+        self._auth_lock = threading.RLock()  # Token reads/updates are atomic across worker threads
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+        self.settings: Dict = {}
+        self.retries = 0
+        self._breakers: Dict[str, Optional[CircuitBreaker]] = {}
+        self.rate_limiter: Optional[RateLimiter] = None
+        self.rate_limited = 0  # Requests that had to wait for a rate limiter...
+        self.rate_limit_wait = 0.0  # ...and their total wait in seconds
+        self.run_deadline: Optional[float] = None  # time.monotonic() by which the current run must end
+        self.deadline_exceeded = 0
+        self._latencies: Dict[str, deque] = {}  # Recent response times per request name
+        self._prepared: Dict[Tuple, PreparedRequest] = {}  # ("imported"/"template", category, method) -> request
+        self.phase_stats = PhaseStats()
+        self.cancelled = threading.Event()  # Set by cancel(), cleared by begin_run()
+        self.store = None  # Optional api_store.ResultStore that records every result...
+        self.run_id: Optional[int] = None  # ...tagged with the run begin_run() started in it
+        self._stats_lock = threading.Lock()
+
+    def apply_settings(self, settings: Dict):
+        """Apply a settings dict (see load_settings); raises ValueError if it is invalid"""
+        check_settings(settings)
+        pools = {base_url: PoolConfig.from_dict(config) for base_url, config in settings.get("pools", {}).items()}
+        configure_pools(self.session, pools)
+        rate_limits = settings.get("rate_limits")
+        with self._stats_lock:
+            self.settings = settings
+            self._breakers = {}
+            self.rate_limiter = RateLimiter(rate_limits) if rate_limits else None
+
+    def transport_report(self) -> List[str]:
+        """Connections opened vs reused per base URL, retries, rate limiting and circuit breaker activity"""
+        lines = [f"🔌 Connections to {name}: {stats}" for name, stats in connection_stats(self.session)]
+        if self.phase_stats.requests:
+            lines.append(f"⏱️ Phases: {self.phase_stats}")
+        if self.retries:
+            lines.append(f"🔁 Retries: {self.retries}")
+        if self.deadline_exceeded:
+            lines.append(f"⏰ Deadlines: {self.deadline_exceeded} request(s) not sent or retried in time")
+        if self.rate_limited:
+            lines.append(f"🚦 Rate limits: {self.rate_limited} request(s) waited {self.rate_limit_wait:.2f}s in total")
+        if self.rate_limiter is not None:
+            for key, bucket in self.rate_limiter.buckets.items():
+                if bucket.throttled:
+                    lines.append(f"🚦 Rate limit {key}: {bucket.throttled} 429 response(s), "
+                                 f"now {bucket.rate():.2f} of {bucket.config.rate:g} req/s")
+        for host, breaker in self._breakers.items():
+            if breaker is not None and (breaker.times_opened or breaker.short_circuited):
+                lines.append(f"⚡ Circuit breaker {host}: {breaker.state}, opened {breaker.times_opened} time(s), "
+                             f"{breaker.short_circuited} call(s) short-circuited")
+        return lines
+
+    def begin_run(self, seconds: Optional[float] = None, label: str = ""):
+        """Start the run deadline: `seconds`, else the "run" timeout of the settings (no deadline if neither is set),
+        and a run of the result store, if any"""
+        if seconds is None:
+            seconds = TimeoutPolicy.from_dict(self.settings.get("timeouts", {}).get("*", {})).run
+        self.run_deadline = time.monotonic() + seconds if seconds else None
+        self.cancelled.clear()
+        if self.store is not None:
+            if self.run_id is not None:
+                self.store.end_run(self.run_id)
+            self.run_id = self.store.begin_run(label)
+
+    def end_run(self):
+        self.run_deadline = None
+        if self.store is not None and self.run_id is not None:
+            self.store.end_run(self.run_id)
+        self.run_id = None
+
+    def cancel(self):
+        """Stop the current run from any thread: requests in flight are aborted and
+        the rest fail as Cancelled without being sent, until the next begin_run()"""
+        self.cancelled.set()
+        aborted = abort_requests(self.session)
+        if aborted:
+            self.log(f"⏹️ Aborted {aborted} request(s) in flight")
+
+    def log(self, message: str):
+        buffer = _log_buffer.get()
+        if buffer is not None:
+            buffer.append((self.sink.log, message))
+        else:
+            self.sink.log(message)
+
+    def emit_result(self, result: RequestResult):
+        if self.store is not None:
+            self.store.record(result, self.run_id)
+        buffer = _log_buffer.get()
+        if buffer is not None:
+            buffer.append((self.sink.result, result))
+        else:
+            self.sink.result(result)
+
+    @contextmanager
+    def capture(self):
+        """Buffer log lines and results of the current thread/task instead of sending them to the sink"""
+        buffered = []
+        token = _log_buffer.set(buffered)
+        try:
+            yield buffered
+        finally:
+            _log_buffer.reset(token)
+
+    def failed(self, name: str, error: BaseException) -> RequestResult:
+        """Report an error raised outside send() (e.g. by a custom execute callable)"""
+        self.log(f"💥 Error: {str(error) or type(error).__name__}")
+        result = RequestResult(name, "", "", False, error=type(error).__name__)
+        self.emit_result(result)
+        return result
+
+    def replay(self, buffered: List[Tuple[Callable, object]]):
+        """Hand log lines and results buffered by a worker thread or task to the sink"""
+        for emit, payload in buffered:
+            emit(payload)
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return slot
+
+    # -- request building ---------------------------------------------------
+
+    def build_request(self, name: str, method: str, url: str, headers: Dict, body=None, params=None,
+                      context: str = "request") -> RequestSpec:
+        """Clean header variables, add auth headers and pick what the method sends"""
+        spec = self.prepare_request(name, method, url, headers, body, params)
+        self.add_auth_headers(spec.headers, context)
+        return spec
+
+    def prepare_request(self, name: str, method: str, url: str, headers: Dict, body=None, params=None) -> RequestSpec:
+        """build_request without the auth headers"""
+        headers = self.collection.clean_headers(headers)
+        json_body, params = body_for_method(method, body, parse_params(params))
+        return RequestSpec(name=name, method=method, url=url, headers=headers, params=params, json_body=json_body)
+
+    def prepared_request(self, key: Tuple, source: Dict, build: Callable[[], RequestSpec], context: str) -> RequestSpec:
+        """A copy of the request compiled from source (built once per source and variables version),
+        with the current auth headers"""
+        version = self.collection.collection_variables.version
+        prepared = self._prepared.get(key)
+        if prepared is None or prepared.source is not source or prepared.variables_version != version:
+            spec = build()
+            if spec.json_body is not None:
+                # Serialized like requests' json= does, once instead of on every send
+                spec.body = json.dumps(spec.json_body, allow_nan=False).encode('utf-8')
+                if not any(name.lower() == 'content-type' for name in spec.headers):
+                    spec.headers['Content-Type'] = 'application/json'
+            prepared = self._prepared[key] = PreparedRequest(spec, source, version)
+        spec = replace(prepared.spec, headers=dict(prepared.spec.headers))
+        self.add_auth_headers(spec.headers, context)
+        return spec
+
+    def forget_prepared(self, endpoint: Optional[str] = None):
+        """Drop the prepared requests and templates of one "Category - Method" (default: all),
+        e.g. after its template was edited"""
+        self.collection.forget_templates(endpoint)
+        for key in list(self._prepared):
+            if endpoint is None or f"{key[1]} - {key[2]}" == endpoint:
+                self._prepared.pop(key, None)
+
+    def timeout_policy(self, spec: RequestSpec) -> TimeoutPolicy:
+        return TimeoutPolicy.from_dict(scoped_settings(self.settings.get("timeouts", {}), spec.endpoint, spec.url))
+
+    def request_deadline(self, policy: TimeoutPolicy) -> Optional[float]:
+        """time.monotonic() by which a request must be done (the run deadline caps every request's)"""
+        deadlines = [deadline for deadline in (self.run_deadline,
+                                               time.monotonic() + policy.deadline if policy.deadline else None)
+                     if deadline is not None]
+        return min(deadlines) if deadlines else None
+
+    def attempt_timeout(self, spec: RequestSpec, policy: TimeoutPolicy,
+                        deadline: Optional[float]) -> Optional[Tuple[float, float]]:
+        """(connect, read) timeouts of the next attempt, or None once the deadline has passed"""
+        connect = policy.connect or self.timeout
+        read = policy.read or self.timeout
+        if policy.p99_factor:
+            latencies = self._latencies.get(spec.name)
+            if latencies is not None and len(latencies) >= policy.min_samples:
+                ordered = sorted(latencies)
+                p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+                read = min(read, max(policy.min_read, p99 * policy.p99_factor))
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            connect, read = min(connect, remaining), min(read, remaining)
+        return connect, read
+
+    def capture_policy(self, spec: RequestSpec) -> CapturePolicy:
+        return CapturePolicy.from_dict(scoped_settings(self.settings.get("capture", {}), spec.endpoint, spec.url))
+
+    def retry_policy(self, spec: RequestSpec) -> RetryPolicy:
+        return RetryPolicy.from_dict(scoped_settings(self.settings.get("retries", {}), spec.endpoint, spec.url))
+
+    def breaker(self, url: str) -> Optional[CircuitBreaker]:
+        """Circuit breaker of the URL's host (None when no circuit_breakers settings apply)"""
+        host = urlsplit(url).netloc
+        with self._stats_lock:
+            if host not in self._breakers:
+                section = self.settings.get("circuit_breakers", {})
+                config = scoped_settings(section, url=url)
+                self._breakers[host] = CircuitBreaker(BreakerConfig.from_dict(config)) if config or "*" in section else None
+            return self._breakers[host]
+
+    def execute(self, category: str, method_name: str) -> RequestResult:
+        """Send an imported method as-is (original collection values)"""
+        if category not in self.collection.imported_apis:
+            self.log(f"❌ API method not found: {category} - {method_name}")
+            result = RequestResult(f"{category} > {method_name}", "", "", False, error="NotFound")
+            self.emit_result(result)
+            return result
+        endpoint = self.collection.imported_apis[category][method_name]
+
+        def build():
+            method = endpoint.method
+            url = join_url(endpoint.base_url, endpoint.path)
+            headers = dict(endpoint.headers)
+            headers["Content-Type"] = "application/json"
+            params = endpoint.params if method == "GET" else {}
+            spec = self.prepare_request(f"{category} > {method_name}", method, url, headers, params=params)
+            spec.endpoint = f"{category} - {method_name}"
+            return spec
+
+        spec = self.prepared_request(("imported", category, method_name), endpoint, build, "test request")
+        return self.send(spec, title=f"Testing: {spec.name}")
+
+    def execute_template(self, category: str, method_name: str, template: Dict) -> RequestResult:
+        """Send a method using an edited request template"""
+        try:
+            spec = self.template_request(category, method_name, template)
+        except ValueError as e:
+            self.log(f"💥 Error: {str(e)}")
+            result = RequestResult(f"{category} > {method_name}", template["method"], "", False, error=type(e).__name__)
+            self.emit_result(result)
+            return result
+        return self.send(spec, title=f"Testing: {spec.name} (Dynamic Template)",
+                         details_label="REQUEST DETAILS (Dynamic Template)")
+
+    def template_request(self, category: str, method_name: str, template: Dict) -> RequestSpec:
+        """Build the request for a template; raises ValueError for an invalid JSON body"""
+        return self.prepared_request(("template", category, method_name), template,
+                                     lambda: self._template_request(category, method_name, template),
+                                     "automation request")
+
+    def _template_request(self, category: str, method_name: str, template: Dict) -> RequestSpec:
+        method = template["method"]
+        url = join_url(template.get('base_url', DEFAULT_BASE_URL), template.get('path', '/'))
+
+        # Parse headers
+        headers = template.get("headers") or {}
+        if isinstance(headers, str):
+            try:
+                headers = json.loads(headers)
+            except ValueError:
+                headers = {"Content-Type": "application/json"}
+
+        body = parse_body(template.get("body"))
+        spec = self.prepare_request(f"{category} > {method_name}", method, url, headers, body=body,
+                                    params=template.get("params"))
+        spec.endpoint = f"{category} - {method_name}"
+        return spec
+
+    # -- sending ------------------------------------------------------------
+
+    def send(self, spec: RequestSpec, title: str = "Custom Request", details_label: str = "REQUEST DETAILS") -> RequestResult:
+        """Send a built request, log the outcome and capture auth tokens"""
+        result = self.begin_request(spec, title)
+        if result is not None:
+            return result
+
+        retry = self.retry_policy(spec)
+        breaker = self.breaker(spec.url)
+        policy = self.timeout_policy(spec)
+        deadline = self.request_deadline(policy)
+        attempt = 0
+        waited = 0.0
+        while True:
+            attempt += 1
+            if breaker is not None and not breaker.allow():
+                result = self.short_circuit_result(spec)
+                break
+            delay = self.rate_limit_delay(spec)
+            if delay:
+                started = time.monotonic()
+                while delay and not self.cancelled.wait(delay):
+                    delay = self.rate_limit_delay(spec)
+                waited += time.monotonic() - started
+            if self.cancelled.is_set():
+                result = self.cancelled_result(spec)
+                break
+            timeout = self.attempt_timeout(spec, policy, deadline)
+            if timeout is None:
+                result = self.deadline_result(spec)
+                break
+            sent = time.monotonic()
+            try:
+                if self.max_per_host:
+                    with self._host_slot(spec.url):
+                        response = self._request(spec, timeout)
+                else:
+                    response = self._request(spec, timeout)
+                result = self.handle_response(spec, response, details_label)
+                self.check_throttled(spec, response, sent)
+                failure, transient = response.status_code >= 500, response.status_code in retry.retry_on
+            except Exception as e:
+                if self.cancelled.is_set():
+                    # Aborted by cancel(): not the server's fault, so neither retried nor held against the breaker
+                    result = self.cancelled_result(spec)
+                    break
+                if isinstance(e, requests.exceptions.Timeout):
+                    result = self.timeout_result(spec, timeout)
+                    failure = transient = True
+                else:
+                    result = self.error_result(spec, e)
+                    failure = transient = isinstance(e, requests.exceptions.ConnectionError)
+            delay = self.finish_attempt(spec, result, attempt, retry, breaker, failure, transient, deadline)
+            if delay is None:
+                break
+            self.cancelled.wait(delay)
+
+        result.endpoint = spec.endpoint
+        self.finish_request(result, attempt, waited)
+        return result
+
+    def finish_request(self, result: RequestResult, attempts: int, waited: float):
+        """Count rate limiter waits, remember the response time and report the final result"""
+        result.attempts = attempts
+        result.wait = waited
+        if result.status_code is not None:
+            latencies = self._latencies.get(result.name)
+            if latencies is None:
+                latencies = self._latencies.setdefault(result.name, deque(maxlen=LATENCY_HISTORY))
+            latencies.append(result.elapsed)
+        if result.phases is not None:
+            self.phase_stats.record(result.phases)
+        if waited:
+            with self._stats_lock:
+                self.rate_limited += 1
+                self.rate_limit_wait += waited
+        self.emit_result(result)
+
+    def rate_limit_delay(self, spec: RequestSpec) -> float:
+        """0 once the rate limiters let the request go out, else the seconds to wait before asking again"""
+        if self.rate_limiter is None:
+            return 0.0
+        return self.rate_limiter.take(spec)
+
+    def check_throttled(self, spec: RequestSpec, response, sent: float):
+        """Slow the rate limiters down when the server answered 429 Too Many Requests"""
+        if response.status_code != 429 or self.rate_limiter is None:
+            return
+        retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+        for key, rate in self.rate_limiter.throttle(spec, retry_after, sent):
+            self.log(f"🚦 429 from {urlsplit(spec.url).netloc}: rate limit {key} lowered to {rate:.2f} req/s"
+                     + (f", paused for {retry_after:.1f}s" if retry_after else ""))
+
+    def finish_attempt(self, spec: RequestSpec, result: RequestResult, attempt: int, retry: RetryPolicy,
+                       breaker: Optional[CircuitBreaker], failure: bool, transient: bool,
+                       deadline: Optional[float] = None) -> Optional[float]:
+        """Report an attempt to the breaker; returns the delay before retrying, or None if the result is final"""
+        if breaker is not None:
+            breaker.record(not failure)
+        if result.success or not transient or attempt >= retry.attempts or spec.method not in retry.methods:
+            return None
+        delay = retry.delay(attempt - 1)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            self.log(f"⏰ No time left to retry {spec.name} before its deadline")
+            with self._stats_lock:
+                self.deadline_exceeded += 1
+            return None
+        with self._stats_lock:
+            self.retries += 1
+        self.log(f"🔁 Retry {attempt}/{retry.attempts - 1} of {spec.name} in {delay:.2f}s "
+                 f"({result.status_code or result.error})")
+        return delay
+
+    def short_circuit_result(self, spec: RequestSpec) -> RequestResult:
+        self.log(f"⚡ Circuit open for {urlsplit(spec.url).netloc}: failing fast")
+        return RequestResult(spec.name, spec.method, spec.url, False, error="CircuitOpen")
+
+    def begin_request(self, spec: RequestSpec, title: str) -> Optional[RequestResult]:
+        """Log the request banner; returns a failed result if the request cannot be sent"""
+        if self.sink.verbose:
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self.log(f"\n{'═'*100}")
+            self.log(f"🕐 {timestamp} | {title}")
+            self.log(f"📡 Method: {spec.method}")
+            self.log(f"🔗 URL: {spec.url}")
+            self.log(f"{'═'*100}")
+
+        if spec.method not in SUPPORTED_METHODS:
+            self.log(f"❌ Unsupported method: {spec.method}")
+            result = RequestResult(spec.name, spec.method, spec.url, False, error="UnsupportedMethod")
+            self.emit_result(result)
+            return result
+        return None
+
+    def timeout_result(self, spec: RequestSpec, timeout: Tuple[float, float]) -> RequestResult:
+        self.log(f"⏰ Timeout error ({timeout[0]:g}s connect, {timeout[1]:g}s read)")
+        return RequestResult(spec.name, spec.method, spec.url, False, error="Timeout")
+
+    def deadline_result(self, spec: RequestSpec) -> RequestResult:
+        self.log(f"⏰ Deadline passed: {spec.name} not sent")
+        with self._stats_lock:
+            self.deadline_exceeded += 1
+        return RequestResult(spec.name, spec.method, spec.url, False, error="DeadlineExceeded")
+
+    def cancelled_result(self, spec: RequestSpec) -> RequestResult:
+        self.log(f"⏹️ Cancelled: {spec.name}")
+        return RequestResult(spec.name, spec.method, spec.url, False, error="Cancelled")
+
+    def error_result(self, spec: RequestSpec, error: Exception) -> RequestResult:
+        self.log(f"💥 Error: {str(error)}")
+        if self.sink.verbose:
+            self.log(f"📋 Traceback: {traceback.format_exc()}")
+        return RequestResult(spec.name, spec.method, spec.url, False, error=type(error).__name__)
+
+    def _request(self, spec: RequestSpec, timeout: Tuple[float, float]):
+        phases = Phases()
+        token = _request_phases.set(phases)
+        try:
+            if spec.body is not None:
+                response = self.session.request(spec.method, spec.url, headers=spec.headers, params=spec.params or None,
+                                                data=spec.body, verify=False, timeout=timeout, stream=True)
+            else:
+                response = self.session.request(spec.method, spec.url, headers=spec.headers, params=spec.params or None,
+                                                json=spec.json_body, verify=False, timeout=timeout, stream=True)
+        finally:
+            _request_phases.reset(token)
+        # Read the body in chunks under the capture policy, so a capped one never holds a large body whole
+        started = time.perf_counter()
+        try:
+            response.body = capture_body(response.iter_content(BODY_CHUNK_SIZE), self.capture_policy(spec),
+                                         response.encoding, spec.name)
+        finally:
+            response.close()
+        phases.download += time.perf_counter() - started
+        response._content = response.body.content  # What response.content/.text/.json() still see
+        # Sessions without a PooledAdapter measure nothing
+        response.phases = phases if phases.ttfb else None
+        response.bytes_out = len(response.request.body or b"")
+        return response
+
+    def handle_response(self, spec: RequestSpec, response, details_label: str = "REQUEST DETAILS") -> RequestResult:
+        """Log a response in detail and extract auth tokens from it"""
+        success = response.status_code < 400
+        elapsed = response.elapsed.total_seconds()
+        body = response_body(response)
+
+        if self.sink.verbose:
+            status_icon = "✅" if success else "❌"
+            self.log(f"\n{status_icon} STATUS CODE: {response.status_code}")
+            self.log(f"📊 RESPONSE TIME: {elapsed:.3f}s")
+            if getattr(response, "phases", None) is not None:
+                self.log(f"⏱️ PHASES: {response.phases}")
+
+        if self.sink.level == "full":
+            # Show headers
+            self.log(f"\n📋 RESPONSE HEADERS:")
+            for key, value in response.headers.items():
+                self.log(f"   {key}: {value}")
+
+        # Extract authentication tokens from response
+        self.extract_auth_tokens(response)
+
+        if self.sink.verbose:
+            # Show response body in detail
+            if body.size:
+                self.log(f"\n📄 RESPONSE BODY:")
+                self.log(body)
+            else:
+                self.log("📄 RESPONSE BODY: (Empty)")
+
+        if self.sink.level == "full":
+            # Show request details
+            self.log(f"\n📤 {details_label}:")
+            self.log(f"   Headers: {json.dumps(spec.headers, indent=2)}")
+            if spec.json_body:
+                self.log(f"   Body: {json.dumps(spec.json_body, indent=2)}")
+            if spec.params:
+                self.log(f"   Query Params: {json.dumps(spec.params, indent=2)}")
+
+        if self.sink.verbose:
+            self.log(f"\n{'─'*100}")
+
+        return RequestResult(spec.name, spec.method, spec.url, success, response.status_code, elapsed,
+                             phases=getattr(response, "phases", None), bytes_in=body.size,
+                             bytes_out=getattr(response, "bytes_out", 0))
+
+    # -- authentication -----------------------------------------------------
+
+    def add_auth_headers(self, headers, context=""):
+        """Add authentication headers (Bearer token, XSRF token) to request headers"""
+        with self._auth_lock:
+            self._add_auth_headers(headers, context)
+
+    def _add_auth_headers(self, headers, context):
+        # Add Bearer token if available and not already present
+        if self.auth_token and not headers.get("Authorization"):
+            headers["Authorization"] = f"Bearer {self.auth_token}"
+            self.log(f"🔐 Added Bearer Token to {context}: {self.auth_token[:20]}...")
+
+        # Add XSRF token if available and not already present
+        if self.xsrf_token and headers.get("X-XSRF-TOKEN") in (None, "", "{{xsrf_token}}"):
+            headers["X-XSRF-TOKEN"] = self.xsrf_token
+            self.log(f"🔐 Added XSRF Token to {context}: {self.xsrf_token[:20]}...")
+
+        # Log if no tokens available
+        if not self.auth_token and not self.xsrf_token:
+            self.log(f"⚠️ No authentication tokens available for {context}")
+
+    def extract_auth_tokens(self, response):
+        """Extract authentication tokens from response (XSRF, Bearer, session id)"""
+        with self._auth_lock:
+            self._extract_auth_tokens(response)
+
+    def _extract_auth_tokens(self, response):
+        # Extract Bearer token / session id from response body (for login responses).
+        # Cheap byte check first so ordinary responses are not JSON-decoded here.
+        body = response_body(response)
+        if b'"token"' in body.content or b'"sessionId"' in body.content:
+            try:
+                response_json = body.json()
+            except ValueError:
+                response_json = None
+            if isinstance(response_json, dict):
+                new_auth_token = response_json.get('token')
+                if new_auth_token and new_auth_token != self.auth_token:
+                    self.auth_token = new_auth_token
+                    self.log(f"🔐 Auth Token extracted from response: {self.auth_token[:20]}...")
+                new_session_id = response_json.get('sessionId')
+                if new_session_id and new_session_id != self.session_id:
+                    self.session_id = new_session_id
+                    self.log(f"🔑 Session ID stored: {self.session_id[:20]}...")
+
+        # Extract XSRF token from headers
+        if 'XSRF-TOKEN' in response.headers:
+            new_xsrf_token = response.headers['XSRF-TOKEN']
+            if new_xsrf_token and new_xsrf_token != self.xsrf_token:
+                self.xsrf_token = new_xsrf_token
+                self.log(f"🔐 XSRF Token updated from header: {self.xsrf_token[:20]}...")
+
+        # Extract XSRF token from cookies
+        if hasattr(response, 'cookies') and 'XSRF-TOKEN' in response.cookies:
+            new_xsrf_cookie = response.cookies.get('XSRF-TOKEN')
+            if new_xsrf_cookie and new_xsrf_cookie != self.xsrf_token:
+                self.xsrf_token = new_xsrf_cookie
+                self.log(f"🔐 XSRF Token updated from cookie: {self.xsrf_token[:20]}...")
+
+        # Extract XSRF token from Set-Cookie header
+        set_cookie = response.headers.get('Set-Cookie', '')
+        if 'XSRF-TOKEN=' in set_cookie:
+            match = XSRF_SET_COOKIE_PATTERN.search(set_cookie)
+            if match:
+                new_xsrf_token = match.group(1)
+                if new_xsrf_token and new_xsrf_token != self.xsrf_token:
+                    self.xsrf_token = new_xsrf_token
+                    self.log(f"🔐 XSRF Token extracted from Set-Cookie: {self.xsrf_token[:20]}...")
+
+        # Debug: Show current token status
+        if self.sink.verbose:
+            if self.auth_token:
+                self.log(f"🔐 Current Auth Token: {self.auth_token[:20]}...")
+            if self.xsrf_token:
+                self.log(f"🔐 Current XSRF Token: {self.xsrf_token[:20]}...")
+            if not self.auth_token and not self.xsrf_token:
+                self.log("⚠️ No authentication tokens available")
+
+    def run_collection(self, methods: Optional[List[Tuple[str, str]]] = None,
+                       pacing: Optional[PacingPolicy] = None) -> List[RequestResult]:
+        """Run every imported method (or the given (category, method) pairs) in order"""
+        if methods is None:
+            methods = [(category, method_name) for category, method_name, _ in self.collection.iter_methods()]
+        results = []
+        for index, (category, method_name) in enumerate(methods):
+            step_started = time.monotonic()
+            results.append(self._execute_collection_template(category, method_name))
+            if pacing is not None and index < len(methods) - 1:
+                delay = pacing.delay(step_started)
+                if delay > 0:
+                    self.cancelled.wait(delay)
+        return results
+
+    def _execute_collection_template(self, category: str, method_name: str) -> RequestResult:
+        return self.execute_template(category, method_name, self.collection.template_for(category, method_name))
+
+    def iter_parallel(self, methods: List[Tuple[str, str]], workers: int = DEFAULT_WORKERS,
+                      execute: Optional[Callable[[str, str], RequestResult]] = None
+                      ) -> Iterator[Tuple[str, str, RequestResult, List]]:
+        """Run methods on a bounded thread pool sharing this runner's session.
+
+        Yields (category, method, result, buffered log) in input order, whatever
+        order the requests finish in. The caller passes the buffered log to
+        replay() from its own thread, so sinks are never called concurrently.
+        """
+        execute = execute or self._execute_collection_template
+
+        def task(category, method_name):
+            with self.capture() as buffered:
+                try:
+                    result = execute(category, method_name)
+                except Exception as e:
+                    result = self.failed(f"{category} > {method_name}", e)
+            return result, buffered
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = [(category, method_name, executor.submit(task, category, method_name))
+                       for category, method_name in methods]
+            for category, method_name, future in futures:
+                result, buffered = future.result()
+                yield category, method_name, result, buffered
+
+    def run_parallel(self, methods: Optional[List[Tuple[str, str]]] = None, workers: int = DEFAULT_WORKERS,
+                     execute: Optional[Callable[[str, str], RequestResult]] = None) -> List[RequestResult]:
+        """Parallel run_collection: same results, in the same order"""
+        if methods is None:
+            methods = [(category, method_name) for category, method_name, _ in self.collection.iter_methods()]
+        results = []
+        for _, _, result, buffered in self.iter_parallel(methods, workers, execute):
+            self.replay(buffered)
+            results.append(result)
+        return results
+
+    def iter_dag(self, steps: List[str], dependencies: Dict[str, Iterable[str]],
+                 execute: Callable[[str], RequestResult], workers: int = DEFAULT_WORKERS,
+                 should_stop: Optional[Callable[[], bool]] = None
+                 ) -> Iterator[Tuple[str, RequestResult, List]]:
+        """Run steps on a thread pool, each as soon as all steps it depends on have succeeded.
+
+        Independent branches run in parallel. Yields (step, result, buffered log)
+        in completion order; steps downstream of a failed step are reported as
+        skipped instead of being sent. Once should_stop() returns True no new
+        steps are started.
+        """
+        order = dependency_order(steps, dependencies)
+        step_set = set(steps)
+        waiting_on = {step: set(dependencies.get(step, ())) & step_set - {step} for step in steps}
+        dependents: Dict[str, List[str]] = {step: [] for step in steps}
+        for step in order:
+            for dependency in waiting_on[step]:
+                dependents[dependency].append(step)
+
+        def task(step):
+            with self.capture() as buffered:
+                try:
+                    result = execute(step)
+                except Exception as e:
+                    result = self.failed(step, e)
+            return result, buffered
+
+        started: Set[str] = set()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            running = {}
+
+            def submit_ready():
+                if should_stop and should_stop():
+                    return
+                for step in order:
+                    if step not in started and not waiting_on[step]:
+                        started.add(step)
+                        running[executor.submit(task, step)] = step
+
+            submit_ready()
+            while running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    step = running.pop(future)
+                    result, buffered = future.result()
+                    yield step, result, buffered
+
+                    if result.success:
+                        for dependent in dependents[step]:
+                            waiting_on[dependent].discard(step)
+                        continue
+
+                    # Everything downstream of a failed step is skipped
+                    blocked = list(dependents[step])
+                    while blocked:
+                        dependent = blocked.pop(0)
+                        if dependent in started:
+                            continue
+                        started.add(dependent)
+                        blocked.extend(dependents[dependent])
+                        with self.capture() as skipped_log:
+                            self.log(f"⏭️ Skipped {dependent}: depends on failed {step}")
+                            skipped = RequestResult(dependent, "", "", False, error="DependencyFailed")
+                            self.emit_result(skipped)
+                        yield dependent, skipped, skipped_log
+                submit_ready()
@@ -0,0 +1,572 @@
+"""
+Load generation on top of the run engine.
+
+Drives imported endpoints through the asyncio transport and records
+latencies in log-bucketed histograms. Open-loop runs send on a fixed
+schedule whether or not earlier responses came back, and latency is
+measured from the scheduled send time, so a stalled server shows up in the
+percentiles instead of silently lowering the request rate (coordinated
+omission). Closed-loop runs simulate virtual users that each loop through
+a list of steps with their own cookies and auth token, with the number of
+users following ramp stages. A run can be split across worker processes,
+each with its own connections and event loop, and their histograms merged
+into one report. Rate limits from the settings are shared by all virtual
+users and worker processes of a run; time spent waiting on them is
+reported separately and left out of the latencies.
+"""
+
+import asyncio
+import math
+import multiprocessing
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Union
+
+from api_async import DEFAULT_LIMIT_PER_HOST, AsyncRunner, AsyncTransport
+from api_engine import (CONNECTION_PHASES, DEFAULT_TIMEOUT, PHASES, Collection, Endpoint, PacingPolicy,
+                        RateLimiter, RequestResult, ResultSink, Runner)
+
+HISTOGRAM_GROWTH = 1.01  # Bucket width: values within a bucket differ by at most 1%
+HISTOGRAM_FLOOR = 1e-6  # Smallest latency told apart (1 µs)
+REPORT_PERCENTILES = (50, 90, 99, 99.9)
+RAMP_TICK = 0.1  # Seconds between virtual user count adjustments
+REPORT_INTERVAL = 1.0  # Seconds covered by each on_interval report
+
+_process_stop = None  # multiprocessing.Event of the pool a worker process belongs to
+_process_rate_limiter = None  # RateLimiter shared by the pool's worker processes
+
+
+class LatencyHistogram:
+    """Latency histogram with ~1% precision; cheap to record, merge and serialise"""
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        bucket = int(math.log(max(seconds, HISTOGRAM_FLOOR) / HISTOGRAM_FLOOR, HISTOGRAM_GROWTH))
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: "LatencyHistogram"):
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent: float) -> float:
+        """Upper bound of the bucket holding the given percentile (0 when empty)"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(HISTOGRAM_FLOOR * HISTOGRAM_GROWTH ** (bucket + 1), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> Dict:
+        return {"counts": {str(bucket): count for bucket, count in self.counts.items()}, "count": self.count,
+                "total": self.total, "min": self.min if self.count else None, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LatencyHistogram":
+        histogram = cls()
+        histogram.counts = {int(bucket): count for bucket, count in data["counts"].items()}
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = math.inf if data["min"] is None else data["min"]
+        histogram.max = data["max"]
+        return histogram
+
+
+class EndpointStats:
+    """Counters and latencies of one endpoint"""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()  # From the scheduled send time
+        self.service = LatencyHistogram()  # From when the generator got to send it
+        self.wait = LatencyHistogram()  # Time spent waiting on rate limiters
+        self.phases = {name: LatencyHistogram() for name in PHASES}  # Connection phases only on new connections
+        self.errors = 0
+        self.status_codes: Dict[str, int] = {}
+
+    def record(self, result: RequestResult, latency: float, service: float):
+        """Record a result; rate limiter waits are taken out of `latency` and `service`"""
+        self.latency.record(latency - result.wait)
+        self.service.record(service - result.wait)
+        self.wait.record(result.wait)
+        if result.phases is not None:
+            for name in PHASES:
+                if not result.phases.reused or name not in CONNECTION_PHASES:
+                    self.phases[name].record(getattr(result.phases, name))
+        if not result.success:
+            self.errors += 1
+        status = str(result.status_code) if result.status_code is not None else result.error
+        self.status_codes[status] = self.status_codes.get(status, 0) + 1
+
+    def merge(self, other: "EndpointStats"):
+        self.latency.merge(other.latency)
+        self.service.merge(other.service)
+        self.wait.merge(other.wait)
+        for name in PHASES:
+            self.phases[name].merge(other.phases[name])
+        self.errors += other.errors
+        for status, count in other.status_codes.items():
+            self.status_codes[status] = self.status_codes.get(status, 0) + count
+
+    @property
+    def requests(self) -> int:
+        return self.latency.count
+
+    def to_dict(self) -> Dict:
+        return {"latency": self.latency.to_dict(), "service": self.service.to_dict(), "wait": self.wait.to_dict(),
+                "phases": {name: histogram.to_dict() for name, histogram in self.phases.items()},
+                "errors": self.errors, "status_codes": dict(self.status_codes)}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "EndpointStats":
+        stats = cls()
+        stats.latency = LatencyHistogram.from_dict(data["latency"])
+        stats.service = LatencyHistogram.from_dict(data["service"])
+        stats.wait = LatencyHistogram.from_dict(data["wait"])
+        stats.phases = {name: LatencyHistogram.from_dict(histogram) for name, histogram in data["phases"].items()}
+        stats.errors = data["errors"]
+        stats.status_codes = dict(data["status_codes"])
+        return stats
+
+
+class LoadReport:
+    """Per-endpoint results of a load run"""
+
+    def __init__(self, duration: float = 0.0):
+        self.duration = duration
+        self.endpoints: Dict[str, EndpointStats] = {}
+
+    def record(self, result: RequestResult, latency: float, service: float):
+        stats = self.endpoints.get(result.name)
+        if stats is None:
+            stats = self.endpoints[result.name] = EndpointStats()
+        stats.record(result, latency, service)
+
+    def merge(self, other: "LoadReport"):
+        """Add another report covering the same period (e.g. from another process)"""
+        self.duration = max(self.duration, other.duration)
+        for name, other_stats in other.endpoints.items():
+            stats = self.endpoints.get(name)
+            if stats is None:
+                stats = self.endpoints[name] = EndpointStats()
+            stats.merge(other_stats)
+
+    def total(self) -> EndpointStats:
+        total = EndpointStats()
+        for stats in self.endpoints.values():
+            total.merge(stats)
+        return total
+
+    def to_dict(self) -> Dict:
+        return {"duration": self.duration, "endpoints": {name: stats.to_dict() for name, stats in self.endpoints.items()}}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LoadReport":
+        report = cls(data["duration"])
+        report.endpoints = {name: EndpointStats.from_dict(stats) for name, stats in data["endpoints"].items()}
+        return report
+
+    def lines(self) -> List[str]:
+        """Human readable summary; latencies in milliseconds"""
+        duration = self.duration or 1e-9
+        total = self.total()
+        error_rate = 100.0 * total.errors / total.requests if total.requests else 0.0
+        percentile_columns = "".join(f"{'p' + format(p, 'g'):>9}" for p in REPORT_PERCENTILES)
+        lines = [
+            f"📊 Load report: {total.requests} requests in {self.duration:.1f}s "
+            f"({total.requests / duration:.1f} req/s), {total.errors} errors ({error_rate:.2f}%)",
+            f"   {'Endpoint':<40}{'Count':>8}{'req/s':>9}{'Err%':>8}{percentile_columns}{'max':>9}  (ms)",
+        ]
+        for name, stats in list(sorted(self.endpoints.items())) + [("TOTAL", total)]:
+            errors = 100.0 * stats.errors / stats.requests if stats.requests else 0.0
+            percentiles = "".join(f"{stats.latency.percentile(p) * 1000:9.1f}" for p in REPORT_PERCENTILES)
+            lines.append(f"   {name[:39]:<40}{stats.requests:>8}{stats.requests / duration:>9.1f}{errors:>8.2f}"
+                         f"{percentiles}{stats.latency.max * 1000:9.1f}")
+        if total.errors:
+            statuses = ", ".join(f"{status} x{count}" for status, count in sorted(total.status_codes.items()))
+            lines.append(f"   Status codes: {statuses}")
+        if total.phases["ttfb"].count:
+            phases = ", ".join(f"{name} {total.phases[name].percentile(50) * 1000:.1f}/"
+                               f"{total.phases[name].percentile(99) * 1000:.1f}" for name in PHASES)
+            lines.append(f"   ⏱️ Phases p50/p99 (ms): {phases}; {total.phases['connect'].count} new connection(s)")
+        if total.wait.total:
+            lines.append(f"   🚦 Rate limit wait (not in latencies): {total.wait.total:.1f}s in total, "
+                         f"p50 {total.wait.percentile(50) * 1000:.1f} ms, p99 {total.wait.percentile(99) * 1000:.1f} ms")
+        if total.requests and total.service.percentile(99) < total.latency.percentile(99) * 0.5:
+            lines.append(f"   ⚠️ p99 service time is {total.service.percentile(99) * 1000:.1f} ms: "
+                         "most latency was spent before the request could be sent (load generator saturated)")
+        return lines
+
+
+@dataclass
+class OpenLoopPlan:
+    """Send `rate` requests/sec for `duration` seconds, cycling through `endpoints`"""
+    rate: float
+    duration: float
+    endpoints: List[str]  # "Category - Method", as in the automation list
+
+    def split(self, parts: int) -> List["OpenLoopPlan"]:
+        """The same load as `parts` plans that together send at this plan's rate"""
+        return [OpenLoopPlan(self.rate / parts, self.duration, self.endpoints) for _ in range(parts)]
+
+
+@dataclass
+class Stage:
+    """Move linearly from the previous stage's user count to `users` over `duration` seconds"""
+    duration: float
+    users: int
+
+
+@dataclass
+class ClosedLoopPlan:
+    """Virtual users each loop through `steps`; their number follows `stages`"""
+    stages: List[Stage]
+    steps: List[str]  # "Category - Method", in automation order
+    pacing: PacingPolicy = field(default_factory=PacingPolicy)  # Think time between a user's steps
+
+    @property
+    def duration(self) -> float:
+        return sum(stage.duration for stage in self.stages)
+
+    def users_at(self, elapsed: float) -> int:
+        """Target number of virtual users `elapsed` seconds into the run"""
+        previous = 0
+        for stage in self.stages:
+            if elapsed < stage.duration:
+                return round(previous + (stage.users - previous) * elapsed / stage.duration)
+            elapsed -= stage.duration
+            previous = stage.users
+        return previous
+
+    def split(self, parts: int) -> List["ClosedLoopPlan"]:
+        """The same load as `parts` plans whose user counts add up to this plan's"""
+        return [ClosedLoopPlan([Stage(stage.duration, _share(stage.users, parts, index)) for stage in self.stages],
+                               self.steps, self.pacing)
+                for index in range(parts)]
+
+
+def _share(total: int, parts: int, index: int) -> int:
+    """Part `index` of `total` split as evenly as possible into `parts`"""
+    return total * (index + 1) // parts - total * index // parts
+
+
+def parse_stages(spec: str) -> List[Stage]:
+    """Parse "SECONDS:USERS,..." e.g. "30:10,120:10,30:0" (ramp up, steady, ramp down)"""
+    stages = []
+    for part in spec.split(","):
+        duration, _, users = part.strip().partition(":")
+        try:
+            stage = Stage(float(duration), int(users))
+        except ValueError:
+            raise ValueError(f"Invalid stage '{part.strip()}' (expected SECONDS:USERS)")
+        if stage.duration <= 0 or stage.users < 0:
+            raise ValueError(f"Invalid stage '{part.strip()}' (duration must be above 0, users at least 0)")
+        stages.append(stage)
+    return stages
+
+
+LoadPlan = Union[OpenLoopPlan, ClosedLoopPlan]
+
+
+def plan_to_dict(plan: LoadPlan) -> Dict:
+    """JSON-friendly form of a plan, e.g. to send it to a load agent"""
+    if isinstance(plan, ClosedLoopPlan):
+        return {"mode": "closed", "stages": [[stage.duration, stage.users] for stage in plan.stages],
+                "steps": plan.steps, "pacing": plan.pacing.spec}
+    return {"mode": "open", "rate": plan.rate, "duration": plan.duration, "endpoints": plan.endpoints}
+
+
+def plan_from_dict(data: Dict) -> LoadPlan:
+    if data["mode"] == "closed":
+        return ClosedLoopPlan([Stage(duration, users) for duration, users in data["stages"]], data["steps"],
+                              PacingPolicy.parse(data["pacing"]))
+    return OpenLoopPlan(data["rate"], data["duration"], data["endpoints"])
+
+
+class LoadGenerator:
+    """Runs load plans against a collection on one asyncio event loop.
+
+    The generator sends with its own quiet Runner. Pass `auth` (any Runner)
+    to start from its tokens, e.g. after a Login request. `templates` maps
+    "Category - Method" to an edited request template; methods without one
+    use the collection's values. `rate_limits` is a rate_limits settings
+    section; its buckets are shared by every virtual user (and worker
+    process) of a run. Call stop() from any thread to end a run early.
+    Set on_interval to receive a report of every second's results while a
+    single-process run is going.
+    """
+
+    def __init__(self, collection: Collection, templates: Optional[Dict[str, Dict]] = None,
+                 timeout: float = DEFAULT_TIMEOUT, limit_per_host: int = DEFAULT_LIMIT_PER_HOST,
+                 auth: Optional[Runner] = None, rate_limits: Optional[Dict[str, Dict]] = None):
+        self.collection = collection
+        self.templates = dict(templates or {})
+        self.timeout = timeout
+        self.limit_per_host = limit_per_host
+        self.auth = auth
+        self.rate_limits = dict(rate_limits or {})
+        self.rate_limiter = RateLimiter(self.rate_limits) if self.rate_limits else None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._process_stop = None  # Set while run() fans out to worker processes
+        self._stop_requested = False
+        self.on_interval: Optional[Callable[[LoadReport], None]] = None
+        self._interval: Optional[LoadReport] = None
+        self._interval_started = 0.0
+
+    def to_state(self) -> Dict:
+        """Everything a generator in another process needs: collection, templates, settings and tokens"""
+        auth = self.auth
+        return {
+            "imported_apis": {category: {name: endpoint.to_dict() for name, endpoint in methods.items()}
+                              for category, methods in self.collection.imported_apis.items()},
+            "collection_variables": self.collection.collection_variables,
+            "templates": self.templates,
+            "timeout": self.timeout,
+            "limit_per_host": self.limit_per_host,
+            "rate_limits": self.rate_limits,
+            "tokens": {"xsrf_token": auth.xsrf_token, "auth_token": auth.auth_token,
+                       "session_id": auth.session_id} if auth is not None else {},
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "LoadGenerator":
+        collection = Collection()
+        collection.imported_apis = {category: {name: Endpoint.from_dict(data) for name, data in methods.items()}
+                                    for category, methods in state["imported_apis"].items()}
+        collection.collection_variables = state["collection_variables"]
+        auth = None
+        if state["tokens"]:
+            auth = Runner(collection)
+            for name, value in state["tokens"].items():
+                setattr(auth, name, value)
+        return cls(collection, state["templates"], state["timeout"], state["limit_per_host"], auth, state["rate_limits"])
+
+    def template(self, endpoint: str) -> Dict:
+        template = self.templates.get(endpoint)
+        if template is None:
+            category, _, method_name = endpoint.partition(" - ")
+            template = self.templates[endpoint] = self.collection.template_for(category, method_name)
+        return template
+
+    def new_runner(self) -> AsyncRunner:
+        """A silent runner with its own tokens, cookie jar and connections"""
+        runner = Runner(self.collection, sink=ResultSink(), timeout=self.timeout)
+        if self.auth is not None:
+            runner.xsrf_token = self.auth.xsrf_token
+            runner.auth_token = self.auth.auth_token
+            runner.session_id = self.auth.session_id
+        runner.rate_limiter = self.rate_limiter
+        return AsyncRunner(runner, AsyncTransport(self.limit_per_host, timeout=self.timeout))
+
+    async def send(self, async_runner: AsyncRunner, endpoint: str) -> RequestResult:
+        category, _, method_name = endpoint.partition(" - ")
+        return await async_runner.execute_template(category, method_name, self.template(endpoint))
+
+    def _record(self, report: LoadReport, result: RequestResult, latency: float, service: float):
+        report.record(result, latency, service)
+        if self._interval is not None:
+            self._interval.record(result, latency, service)
+
+    def _flush_interval(self):
+        now = time.monotonic()
+        delta = self._interval
+        delta.duration = now - self._interval_started
+        self._interval = LoadReport()
+        self._interval_started = now
+        self.on_interval(delta)
+
+    async def _report_intervals(self):
+        while True:
+            await asyncio.sleep(REPORT_INTERVAL)
+            self._flush_interval()
+
+    async def run_async(self, plan: LoadPlan) -> LoadReport:
+        """Run the plan on the current event loop"""
+        ticker = None
+        if self.on_interval is not None:
+            self._interval = LoadReport()
+            self._interval_started = time.monotonic()
+            ticker = asyncio.ensure_future(self._report_intervals())
+        try:
+            if isinstance(plan, ClosedLoopPlan):
+                return await self.closed_loop(plan)
+            return await self.open_loop(plan)
+        finally:
+            if ticker is not None:
+                ticker.cancel()
+                self._flush_interval()
+                self._interval = None
+
+    async def open_loop(self, plan: OpenLoopPlan) -> LoadReport:
+        """Send on a fixed schedule; latency counts from when each request was due"""
+        for endpoint in plan.endpoints:
+            self.template(endpoint)  # Fail on unknown endpoints before the clock starts
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        if self._stop_requested:
+            self._stopped.set()
+        report = LoadReport()
+        async_runner = self.new_runner()
+        in_flight = set()
+
+        async def fire(endpoint, scheduled):
+            sent = self._loop.time()
+            result = await self.send(async_runner, endpoint)
+            done = self._loop.time()
+            self._record(report, result, done - scheduled, done - sent)
+
+        started = self._loop.time()
+        total = int(plan.rate * plan.duration)
+        try:
+            for index in range(total):
+                scheduled = started + index / plan.rate
+                delay = scheduled - self._loop.time()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self._stopped.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                if self._stopped.is_set():
+                    break
+                task = asyncio.ensure_future(fire(plan.endpoints[index % len(plan.endpoints)], scheduled))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            if in_flight:
+                await asyncio.gather(*in_flight)
+        finally:
+            await async_runner.transport.close()
+        report.duration = self._loop.time() - started
+        return report
+
+    async def closed_loop(self, plan: ClosedLoopPlan) -> LoadReport:
+        """Ramp virtual users up and down; each loops through the steps until it is no longer needed"""
+        for endpoint in plan.steps:
+            self.template(endpoint)
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        if self._stop_requested:
+            self._stopped.set()
+        report = LoadReport()
+        users: Dict[int, asyncio.Task] = {}
+        target = 0
+
+        async def pause(seconds):
+            """Sleep, waking early when the run is stopped"""
+            try:
+                await asyncio.wait_for(self._stopped.wait(), seconds)
+            except asyncio.TimeoutError:
+                pass
+
+        async def virtual_user(index):
+            async_runner = self.new_runner()
+            try:
+                while True:
+                    for endpoint in plan.steps:
+                        if index >= target or self._stopped.is_set():
+                            return
+                        step_started = time.monotonic()
+                        result = await self.send(async_runner, endpoint)
+                        elapsed = time.monotonic() - step_started
+                        self._record(report, result, elapsed, elapsed)
+                        delay = plan.pacing.delay(step_started)
+                        if delay > 0:
+                            await pause(delay)
+            finally:
+                await async_runner.transport.close()
+
+        started = self._loop.time()
+        try:
+            while not self._stopped.is_set():
+                elapsed = self._loop.time() - started
+                if elapsed >= plan.duration:
+                    break
+                target = plan.users_at(elapsed)
+                for index in range(target):
+                    if index not in users:
+                        users[index] = asyncio.ensure_future(virtual_user(index))
+                        users[index].add_done_callback(lambda _, index=index: users.pop(index, None))
+                await pause(RAMP_TICK)
+        finally:
+            # Users finish the step they are on, then exit
+            target = 0
+            if users:
+                await asyncio.gather(*users.values())
+        report.duration = self._loop.time() - started
+        return report
+
+    def stop(self):
+        """End the current run early; safe to call from another thread"""
+        self._stop_requested = True
+        if self._process_stop is not None:
+            self._process_stop.set()
+        if self._loop is not None and not self._loop.is_closed() and self._stopped is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+
+    def run(self, plan: LoadPlan, processes: int = 1) -> LoadReport:
+        """Blocking entry point: run the plan on a fresh event loop, or split across worker processes"""
+        if processes > 1:
+            return self._run_processes(plan, processes)
+        return asyncio.run(self.run_async(plan))
+
+    def _run_processes(self, plan: LoadPlan, processes: int) -> LoadReport:
+        # spawn, not fork: the caller may be a GUI or have threads running
+        context = multiprocessing.get_context("spawn")
+        self._process_stop = context.Event()
+        # Buckets in shared memory, so the processes together stay within the limits
+        rate_limiter = RateLimiter(self.rate_limits, context) if self.rate_limits else None
+        state = self.to_state()
+        try:
+            with ProcessPoolExecutor(processes, mp_context=context, initializer=_init_process,
+                                     initargs=(self._process_stop, rate_limiter)) as pool:
+                futures = [pool.submit(_run_in_process, state, part) for part in plan.split(processes)]
+                report = LoadReport()
+                for future in futures:
+                    report.merge(LoadReport.from_dict(future.result()))
+        finally:
+            self._process_stop = None
+        return report
+
+
+def _init_process(stop_event, rate_limiter):
+    global _process_stop, _process_rate_limiter
+    _process_stop = stop_event
+    _process_rate_limiter = rate_limiter
+    # Ctrl+C reaches the whole process group; the parent stops workers through stop_event instead
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _run_in_process(state: Dict, plan: LoadPlan) -> Dict:
+    """Worker process entry point: run one share of the plan and return its report as a dict"""
+    generator = LoadGenerator.from_state(state)
+    generator.rate_limiter = _process_rate_limiter
+
+    def watch_stop():
+        _process_stop.wait()
+        generator.stop()
+
+    threading.Thread(target=watch_stop, daemon=True).start()
+    return generator.run(plan).to_dict()
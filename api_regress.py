@@ -0,0 +1,147 @@
+"""
+Latency regression check of a stored run against the runs before it.
+
+Per endpoint, the run's p50/p95/p99 response times are compared with those of
+a rolling baseline: the previous runs with the same label, pooled. A
+percentile has regressed when it grew by more than `threshold` (and
+`min_delta`) and the bootstrap confidence interval of the growth lies above
+zero, so a noisy endpoint does not fail the check by chance.
+
+NumPy, when installed, vectorizes the bootstrap; without it a pure Python
+bootstrap with fewer resamples is used.
+
+    python api_cli.py regress api_results.db --baseline-runs 10
+"""
+
+import math
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Optional: the pure Python bootstrap is used instead
+    np = None
+
+from api_store import ResultStore
+
+PERCENTILES = (50, 95, 99)
+DEFAULT_BASELINE_RUNS = 5
+DEFAULT_THRESHOLD = 0.10  # A percentile must grow by more than this share...
+DEFAULT_MIN_DELTA = 0.001  # ...and this many seconds to count
+DEFAULT_CONFIDENCE = 0.95
+RESAMPLES = 2000  # Bootstrap resamples with NumPy...
+PURE_PYTHON_RESAMPLES = 200  # ...and without it
+MIN_SAMPLES = 20  # Endpoints with fewer responses in the run or the baseline are not judged
+BOOTSTRAP_BLOCK = 2_000_000  # Resampled values held in memory at once (NumPy)
+
+
+@dataclass
+class PercentileChange:
+    """One percentile of one endpoint, baseline vs run (seconds)"""
+    endpoint: str
+    percentile: int
+    baseline: float
+    current: float
+    low: float  # Confidence interval of current - baseline
+    high: float
+    regressed: bool
+
+    @property
+    def change(self) -> float:
+        """Relative change, e.g. 0.25 for 25% slower"""
+        return self.current / self.baseline - 1 if self.baseline else math.inf
+
+    def __str__(self):
+        icon = "❌" if self.regressed else "✅"
+        return (f"{icon} {self.endpoint} p{self.percentile}: {self.baseline * 1000:.1f} ms → "
+                f"{self.current * 1000:.1f} ms ({self.change:+.1%}, change {self.low * 1000:+.1f}.."
+                f"{self.high * 1000:+.1f} ms)")
+
+
+def percentiles(values: Sequence[float], qs: Sequence[int]) -> List[float]:
+    """Percentiles with linear interpolation between ranks (like NumPy's default)"""
+    ordered = sorted(values)
+    result = []
+    for q in qs:
+        position = (len(ordered) - 1) * q / 100
+        below = int(position)
+        above = min(below + 1, len(ordered) - 1)
+        result.append(ordered[below] + (ordered[above] - ordered[below]) * (position - below))
+    return result
+
+
+def _bootstrap_numpy(values: Sequence[float], qs: Sequence[int], resamples: int, rng) -> "np.ndarray":
+    """Percentiles of `resamples` resamples of values: array of shape (len(qs), resamples)"""
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    block = max(1, BOOTSTRAP_BLOCK // n)
+    estimates = np.empty((len(qs), resamples))
+    for start in range(0, resamples, block):
+        count = min(block, resamples - start)
+        samples = values[rng.integers(0, n, size=(count, n))]
+        estimates[:, start:start + count] = np.percentile(samples, qs, axis=1)
+    return estimates
+
+
+def _bootstrap_python(values: Sequence[float], qs: Sequence[int], resamples: int, rng) -> List[List[float]]:
+    """Pure Python _bootstrap_numpy: one list of resampled estimates per percentile"""
+    estimates = [[] for _ in qs]
+    for _ in range(resamples):
+        for estimate, value in zip(estimates, percentiles(rng.choices(values, k=len(values)), qs)):
+            estimate.append(value)
+    return estimates
+
+
+def bootstrap_changes(current: Sequence[float], baseline: Sequence[float], qs: Sequence[int],
+                      confidence: float = DEFAULT_CONFIDENCE, resamples: Optional[int] = None,
+                      seed: Optional[int] = None) -> List[Tuple[float, float]]:
+    """Per percentile, the one-sided `confidence` bounds (low, high) of current - baseline"""
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        resamples = resamples or RESAMPLES
+        differences = _bootstrap_numpy(current, qs, resamples, rng) - _bootstrap_numpy(baseline, qs, resamples, rng)
+        bounds = np.quantile(differences, [1 - confidence, confidence], axis=1)
+        return [(float(low), float(high)) for low, high in zip(bounds[0], bounds[1])]
+
+    rng = random.Random(seed)
+    resamples = resamples or PURE_PYTHON_RESAMPLES
+    changes = []
+    for run_estimates, baseline_estimates in zip(_bootstrap_python(current, qs, resamples, rng),
+                                                 _bootstrap_python(baseline, qs, resamples, rng)):
+        differences = sorted(a - b for a, b in zip(run_estimates, baseline_estimates))
+        low, high = percentiles(differences, (100 * (1 - confidence), 100 * confidence))
+        changes.append((low, high))
+    return changes
+
+
+def compare(current: Dict[str, List[float]], baseline: Dict[str, List[float]], qs: Sequence[int] = PERCENTILES,
+            threshold: float = DEFAULT_THRESHOLD, min_delta: float = DEFAULT_MIN_DELTA,
+            confidence: float = DEFAULT_CONFIDENCE, resamples: Optional[int] = None,
+            seed: Optional[int] = None) -> List[PercentileChange]:
+    """Compare response times per endpoint; endpoints with under MIN_SAMPLES on either side are skipped"""
+    changes = []
+    for endpoint in sorted(current):
+        run_times, baseline_times = current[endpoint], baseline.get(endpoint, [])
+        if len(run_times) < MIN_SAMPLES or len(baseline_times) < MIN_SAMPLES:
+            continue
+        bounds = bootstrap_changes(run_times, baseline_times, qs, confidence, resamples, seed)
+        for q, run_value, baseline_value, (low, high) in zip(qs, percentiles(run_times, qs),
+                                                             percentiles(baseline_times, qs), bounds):
+            delta = run_value - baseline_value
+            regressed = low > 0 and delta > threshold * baseline_value and delta >= min_delta
+            changes.append(PercentileChange(endpoint, q, baseline_value, run_value, low, high, regressed))
+    return changes
+
+
+def check_run(store: ResultStore, run_id: Optional[int] = None, baseline_runs: int = DEFAULT_BASELINE_RUNS,
+              label: Optional[str] = None, **options):
+    """Compare a run (default: the latest, with `label` if given) with up to `baseline_runs` earlier runs
+    of the same label. Returns (run, baseline run ids, changes); raises ValueError if there is no such run."""
+    runs = store.runs(label=label, limit=1, run_id=run_id)
+    if not runs:
+        raise ValueError(f"No run {run_id}" if run_id is not None else "No runs in the store")
+    run = runs[0]
+    baseline_ids = [row["id"] for row in store.runs(label=run["label"], limit=baseline_runs, before=run["id"])]
+    current = store.latencies([run["id"]])
+    return run, baseline_ids, compare(current, store.latencies(baseline_ids), **options)
@@ -0,0 +1,195 @@
+"""
+Virtualized results log for the Tkinter UI.
+
+The log lives in a bounded buffer of lines and only the lines that fit in
+the window are drawn, so a run of thousands of requests neither grows the
+Text widget nor slows scrolling down. Response bodies (LazyBody) take one
+line until clicked, and are only pretty-printed then.
+"""
+
+import bisect
+import tkinter as tk
+import tkinter.font as tkfont
+from tkinter import ttk
+from typing import Iterable, List
+
+from api_engine import LazyBody, RequestResult, result_line
+
+MAX_LOG_LINES = 200_000  # Oldest lines are dropped beyond this...
+TRIM_LINES = 20_000  # ...this many at a time
+SCROLL_LINES = 3  # Lines per mouse wheel notch
+
+
+class _Body:
+    """A collapsed or expanded response body line of the log"""
+
+    def __init__(self, body: LazyBody):
+        self.body = body
+        self.expanded = 0  # Number of formatted lines inserted after it
+
+    def __str__(self):
+        if self.expanded:
+            return "   ▼ (click to collapse)"
+        return f"   ▶ {self.body.describe()} (click to expand)"
+
+
+class ResultView(ttk.Frame):
+    """Scrollable log that renders only its visible lines, indexed by request"""
+
+    def __init__(self, parent, font=('Consolas', 9), **kwargs):
+        super().__init__(parent, **kwargs)
+        self.lines: List[object] = []  # str or _Body
+        self.dropped = 0  # Lines trimmed from the front; absolute index of lines[0]
+        self.request_starts: List[int] = []  # Absolute index of the first line of each kept request
+        self.requests_dropped = 0
+        self.next_request_start = 0  # A request's log starts after the previous request's result line
+        self.top = 0  # Index into lines of the first visible line
+        self.follow = True  # Keep the newest lines in view
+
+        self.font = tkfont.Font(font=font)
+        self.text = tk.Text(self, wrap=tk.NONE, font=self.font, width=90, height=50, cursor="arrow")
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        xscrollbar = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.text.xview)
+        self.text.configure(xscrollcommand=xscrollbar.set, state=tk.DISABLED)
+        self.text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        xscrollbar.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self.text.tag_configure("body", foreground="#4a9eff")
+        self.text.tag_bind("body", "<Button-1>", self._on_body_click)
+        self.text.bind("<Configure>", lambda event: self.render())
+        self.text.bind("<MouseWheel>", lambda event: self.scroll(-event.delta // 120 * SCROLL_LINES))
+        self.text.bind("<Button-4>", lambda event: self.scroll(-SCROLL_LINES))
+        self.text.bind("<Button-5>", lambda event: self.scroll(SCROLL_LINES))
+        # Page keys would only move within the drawn window
+        for key in ("<Prior>", "<Next>", "<Up>", "<Down>"):
+            self.text.bind(key, self._on_key)
+
+    @property
+    def request_count(self) -> int:
+        return self.requests_dropped + len(self.request_starts)
+
+    def visible_lines(self) -> int:
+        return max(1, self.text.winfo_height() // self.font.metrics("linespace"))
+
+    # -- content ----------------------------------------------------------
+
+    def append(self, items: Iterable[object]):
+        """Add QueueSink items: str lines, LazyBody response bodies and RequestResults"""
+        for item in items:
+            if isinstance(item, RequestResult):
+                self.lines.append(result_line(item))
+                self.request_starts.append(self.next_request_start)
+                self.next_request_start = self.dropped + len(self.lines)
+            elif isinstance(item, LazyBody):
+                self.lines.append(_Body(item))
+            else:
+                self.lines.extend(str(item).split("\n"))
+        if len(self.lines) > MAX_LOG_LINES + TRIM_LINES:
+            self._trim(len(self.lines) - MAX_LOG_LINES)
+        if self.follow:
+            self.top = len(self.lines)
+        self.render()
+
+    def _trim(self, count: int):
+        del self.lines[:count]
+        self.dropped += count
+        self.top = max(0, self.top - count)
+        kept = bisect.bisect_left(self.request_starts, self.dropped)
+        del self.request_starts[:kept]
+        self.requests_dropped += kept
+
+    def clear(self):
+        self.lines.clear()
+        self.dropped = self.requests_dropped = self.next_request_start = self.top = 0
+        self.request_starts.clear()
+        self.follow = True
+        self.render()
+
+    def get_text(self) -> str:
+        """The whole kept log, with every body formatted (for export and copy)"""
+        lines = []
+        for entry in self.lines:
+            if isinstance(entry, _Body):
+                if not entry.expanded:
+                    lines.append(str(entry.body))
+            else:
+                lines.append(entry)
+        return "\n".join(lines) + "\n"
+
+    def toggle_body(self, index: int):
+        """Expand (pretty-printing it) or collapse the body at lines[index]"""
+        entry = self.lines[index]
+        if entry.expanded:
+            shift = -entry.expanded
+            del self.lines[index + 1:index + 1 + entry.expanded]
+            entry.expanded = 0
+        else:
+            formatted = str(entry.body).split("\n")
+            self.lines[index + 1:index + 1] = formatted
+            entry.expanded = shift = len(formatted)
+        # Requests logged after the body move along with the lines
+        position = self.dropped + index
+        for k in range(bisect.bisect_right(self.request_starts, position), len(self.request_starts)):
+            self.request_starts[k] += shift
+        self.next_request_start += shift
+        self.render()
+
+    # -- navigation -------------------------------------------------------
+
+    def jump_to_request(self, number: int) -> bool:
+        """Show request `number` (1-based, counted since the last clear) at the top; False if not kept"""
+        k = number - 1 - self.requests_dropped
+        if not 0 <= k < len(self.request_starts):
+            return False
+        self.top = self.request_starts[k] - self.dropped
+        self.follow = False
+        self.render()
+        return True
+
+    def scroll(self, lines: int):
+        self.top += lines
+        self.follow = self.top + self.visible_lines() >= len(self.lines)
+        self.render()
+        return "break"
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.lines))
+            self.follow = self.top + self.visible_lines() >= len(self.lines)
+            self.render()
+        elif args[0] == "scroll":
+            step = int(args[1])
+            self.scroll(step * self.visible_lines() if args[2] == "pages" else step)
+
+    def _on_key(self, event):
+        step = {"Prior": -self.visible_lines(), "Next": self.visible_lines(), "Up": -1, "Down": 1}[event.keysym]
+        return self.scroll(step)
+
+    def _on_body_click(self, event):
+        line = int(self.text.index(f"@{event.x},{event.y}").split(".")[0])
+        index = self.top + line - 1
+        if index < len(self.lines) and isinstance(self.lines[index], _Body):
+            self.toggle_body(index)
+
+    # -- drawing ----------------------------------------------------------
+
+    def render(self):
+        """Redraw only the lines from `top` that fit in the window"""
+        height = self.visible_lines()
+        total = len(self.lines)
+        self.top = max(0, min(self.top, total - height))
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        for entry in self.lines[self.top:self.top + height]:
+            if isinstance(entry, _Body):
+                self.text.insert(tk.END, f"{entry}\n", "body")
+            else:
+                self.text.insert(tk.END, f"{entry}\n")
+        self.text.configure(state=tk.DISABLED)
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + height) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
@@ -0,0 +1,213 @@
+"""
+Append-only store of request results (SQLite, standard library only).
+
+Every result of a Runner with a store attached becomes one row: method, URL,
+status, error class, response time and phases, rate limit wait and body
+bytes in/out, tagged with the run it belongs to. Rows are indexed by run,
+endpoint and time, so run history can be queried without parsing logs.
+
+    store = ResultStore("api_results.db")
+    runner.store = store
+    runner.begin_run(label="nightly")
+    ...
+    runner.end_run()
+    store.requests(endpoint="Users - Get User", since=time.time() - 86400)
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from api_engine import PHASES, RequestResult
+
+DEFAULT_STORE = "api_results.db"
+FLUSH_ROWS = 200  # Rows are written in batches of this many...
+FLUSH_SECONDS = 1.0  # ...or once the oldest buffered row is this old
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    label TEXT NOT NULL DEFAULT '',
+    started REAL NOT NULL,
+    finished REAL
+);
+CREATE TABLE IF NOT EXISTS requests (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER REFERENCES runs (id),
+    time REAL NOT NULL,
+    endpoint TEXT NOT NULL,
+    method TEXT NOT NULL,
+    url TEXT NOT NULL,
+    status INTEGER,
+    success INTEGER NOT NULL,
+    error TEXT NOT NULL,
+    elapsed REAL NOT NULL,
+    attempts INTEGER NOT NULL,
+    wait REAL NOT NULL,
+    dns REAL,
+    connect REAL,
+    tls REAL,
+    ttfb REAL,
+    download REAL,
+    reused INTEGER,
+    bytes_in INTEGER NOT NULL,
+    bytes_out INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS requests_run ON requests (run_id);
+CREATE INDEX IF NOT EXISTS requests_endpoint_time ON requests (endpoint, time);
+CREATE INDEX IF NOT EXISTS requests_time ON requests (time);
+"""
+COLUMNS = ("run_id", "time", "endpoint", "method", "url", "status", "success", "error", "elapsed", "attempts",
+           "wait") + PHASES + ("reused", "bytes_in", "bytes_out")
+INSERT = f"INSERT INTO requests ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+
+class ResultStore:
+    """Request results in a SQLite file, shared by the threads of a run.
+
+    A lazy store opens (and creates) the file on first use, so nothing is written until there is
+    a result to record. If it cannot be opened then, on_error(error) is called and the store
+    records nothing; without on_error the error is raised.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE, lazy: bool = False,
+                 on_error: Optional[Callable[[sqlite3.Error], None]] = None):
+        self.path = path
+        self.on_error = on_error
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._pending = []
+        self._oldest = 0.0
+        self._closed = False
+        if not lazy:
+            self._open()
+
+    def _open(self):
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        db.row_factory = sqlite3.Row
+        # WAL lets a report read the file while a run is writing to it
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript(SCHEMA)
+        self._db = db
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """The database, opened on first use by a lazy store; None if it could not be opened (lock held)"""
+        if self._db is None and not self._closed:
+            try:
+                self._open()
+            except sqlite3.Error as e:
+                if self.on_error is None:
+                    raise
+                self._closed = True
+                self._pending = []
+                self.on_error(e)
+        return self._db
+
+    # -- writing ----------------------------------------------------------
+
+    def begin_run(self, label: str = "") -> int:
+        """Start a run; returns its id"""
+        with self._lock:
+            db = self._connection()
+            if db is None:
+                return None
+            cursor = db.execute("INSERT INTO runs (label, started) VALUES (?, ?)", (label, time.time()))
+            db.commit()
+            return cursor.lastrowid
+
+    def end_run(self, run_id: int):
+        with self._lock:
+            self._flush()
+            if self._db is not None:
+                self._db.execute("UPDATE runs SET finished = ? WHERE id = ?", (time.time(), run_id))
+                self._db.commit()
+
+    def record(self, result: RequestResult, run_id: Optional[int] = None):
+        """Add one result (buffered; results outside a run are written at once)"""
+        phases = result.phases
+        now = time.time()
+        row = (run_id, now, result.endpoint or result.name, result.method, result.url, result.status_code,
+               int(result.success), result.error, result.elapsed, result.attempts, result.wait,
+               *(getattr(phases, name) if phases is not None else None for name in PHASES),
+               int(phases.reused) if phases is not None else None, result.bytes_in, result.bytes_out)
+        with self._lock:
+            if self._closed:
+                return  # A worker finishing after the store was closed on exit
+            if not self._pending:
+                self._oldest = now
+            self._pending.append(row)
+            if run_id is None or len(self._pending) >= FLUSH_ROWS or now - self._oldest >= FLUSH_SECONDS:
+                self._flush()
+
+    def _flush(self):
+        if self._pending and self._connection() is not None:
+            self._db.executemany(INSERT, self._pending)
+            self._db.commit()
+            self._pending = []
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            if not self._closed:
+                self._flush()
+                if self._db is not None:
+                    self._db.close()
+                    self._db = None
+                self._closed = True
+
+    # -- queries ----------------------------------------------------------
+
+    def _query(self, sql: str, parameters: Iterable = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            self._flush()
+            db = self._connection()
+            return db.execute(sql, tuple(parameters)).fetchall() if db is not None else []
+
+    def runs(self, label: Optional[str] = None, limit: int = 20, before: Optional[int] = None,
+             run_id: Optional[int] = None) -> List[sqlite3.Row]:
+        """Most recent runs first (only those with `label`, started before run `before`, or run `run_id`),
+        with their request and failure counts"""
+        conditions, parameters = [], []
+        for condition, value in (("runs.label = ?", label), ("runs.id < ?", before), ("runs.id = ?", run_id)):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self._query(f"""
+            SELECT runs.id, runs.label, runs.started, runs.finished,
+                   COUNT(requests.id) AS requests, COALESCE(SUM(1 - requests.success), 0) AS failures
+            FROM runs LEFT JOIN requests ON requests.run_id = runs.id
+            {where}
+            GROUP BY runs.id ORDER BY runs.id DESC LIMIT ?""", parameters + [limit])
+
+    def requests(self, run_id: Optional[int] = None, endpoint: Optional[str] = None, since: Optional[float] = None,
+                 until: Optional[float] = None, limit: Optional[int] = None) -> List[sqlite3.Row]:
+        """Requests in time order, filtered by run, endpoint and time range (epoch seconds); the latest `limit`"""
+        conditions, parameters = [], []
+        for condition, value in (("run_id = ?", run_id), ("endpoint = ?", endpoint), ("time >= ?", since),
+                                 ("time < ?", until)):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        if limit is None:
+            return self._query(f"SELECT * FROM requests {where} ORDER BY time, id", parameters)
+        rows = self._query(f"SELECT * FROM requests {where} ORDER BY time DESC, id DESC LIMIT ?", parameters + [limit])
+        rows.reverse()
+        return rows
+
+    def latencies(self, run_ids: Iterable[int]) -> Dict[str, List[float]]:
+        """Response times of the successful requests of some runs, per endpoint"""
+        run_ids = list(run_ids)
+        if not run_ids:
+            return {}
+        latencies: Dict[str, List[float]] = {}
+        for row in self._query(f"SELECT endpoint, elapsed FROM requests WHERE success = 1 AND run_id IN "
+                               f"({', '.join('?' * len(run_ids))})", run_ids):
+            latencies.setdefault(row["endpoint"], []).append(row["elapsed"])
+        return latencies
@@ -0,0 +1,54 @@
+import asyncio
+import socket
+
+import pytest
+
+from api_async import AsyncTransport
+from api_engine import RequestSpec
+
+
+def get(url: str) -> RequestSpec:
+    return RequestSpec(url, "GET", url, {})
+
+
+def closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_keep_alive_reuses_one_connection(server):
+    async def run():
+        transport = AsyncTransport()
+        responses = [await transport.send(get(f"{server}/")) for _ in range(5)]
+        await transport.close()
+        return transport, responses
+
+    transport, responses = asyncio.run(run())
+    assert [response.status_code for response in responses] == [200] * 5
+    assert responses[0].content == b"ok"
+    assert (transport.opened, transport.reused) == (1, 4)
+    assert not responses[0].phases.reused and responses[1].phases.reused
+    # Response time counts the connect, like requests' elapsed
+    assert responses[0].elapsed.total_seconds() >= responses[0].phases.connect + responses[0].phases.ttfb
+
+
+def test_server_closing_every_connection(server):
+    async def run():
+        transport = AsyncTransport()
+        for _ in range(3):
+            await transport.send(get(f"{server}/close"))
+        return transport
+
+    transport = asyncio.run(run())
+    assert (transport.opened, transport.reused) == (3, 0)
+
+
+def test_refused_connects_are_not_counted():
+    async def run():
+        transport = AsyncTransport()
+        with pytest.raises(OSError):
+            await transport.send(get(f"http://127.0.0.1:{closed_port()}/"), timeout=(2, 2))
+        return transport
+
+    assert asyncio.run(run()).opened == 0
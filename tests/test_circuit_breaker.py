@@ -0,0 +1,86 @@
+from api_engine import BreakerConfig, CircuitBreaker
+
+
+def breaker(**settings) -> CircuitBreaker:
+    return CircuitBreaker(BreakerConfig(**{"error_rate": 0.5, "window": 4, "min_calls": 4, "cooldown": 10,
+                                           **settings}))
+
+
+def test_opens_at_the_error_rate(clock):
+    cb = breaker()
+    for success in (True, False, True):
+        cb.record(success)
+    assert cb.state == "closed"
+    cb.record(False)
+    assert cb.state == "open"
+    assert cb.times_opened == 1
+    assert not cb.allow()
+    assert cb.short_circuited == 1
+
+
+def test_waits_for_min_calls(clock):
+    cb = breaker()
+    for _ in range(3):
+        cb.record(False)
+    assert cb.state == "closed"
+    assert cb.allow()
+
+
+def test_only_the_window_counts(clock):
+    cb = breaker()
+    for _ in range(10):
+        cb.record(True)
+    cb.record(False)
+    assert cb.state == "closed"
+    # 2 of the last 4 calls failed, though only 2 of 12 overall
+    cb.record(False)
+    assert cb.state == "open"
+
+
+def test_one_trial_call_after_the_cooldown(clock):
+    cb = breaker()
+    for _ in range(4):
+        cb.record(False)
+    clock.advance(9.9)
+    assert not cb.allow()
+    clock.advance(0.1)
+    assert cb.allow()
+    assert cb.state == "half-open"
+    assert not cb.allow()  # Only one trial at a time
+
+
+def test_successful_trial_closes(clock):
+    cb = breaker()
+    for _ in range(4):
+        cb.record(False)
+    clock.advance(10)
+    assert cb.allow()
+    cb.record(True)
+    assert cb.state == "closed"
+    # The window starts over, so a single failure does not reopen it
+    cb.record(False)
+    assert cb.state == "closed"
+
+
+def test_failed_trial_restarts_the_cooldown(clock):
+    cb = breaker()
+    for _ in range(4):
+        cb.record(False)
+    clock.advance(10)
+    assert cb.allow()
+    cb.record(False)
+    assert cb.state == "open"
+    assert cb.times_opened == 1
+    clock.advance(5)
+    assert not cb.allow()
+    clock.advance(5)
+    assert cb.allow()
+
+
+def test_late_results_do_not_end_the_cooldown(clock):
+    cb = breaker()
+    for _ in range(4):
+        cb.record(False)
+    cb.record(True)  # A call that was in flight when the breaker opened
+    assert cb.state == "open"
+    assert not cb.allow()
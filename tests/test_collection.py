@@ -0,0 +1,124 @@
+import io
+import json
+
+import pytest
+
+from api_engine import Collection, _JsonReader
+
+
+class ShortReads(io.BufferedReader):
+    """Binary file that returns at most `limit` bytes per read, like a slow pipe"""
+
+    def __init__(self, path, limit: int):
+        super().__init__(io.FileIO(str(path)))
+        self.limit = limit
+
+    def read(self, size=-1):
+        return super().read(self.limit if size is None or size < 0 else min(size, self.limit))
+
+
+def walk(reader: _JsonReader):
+    """Rebuild a document through items()/members() down to the leaves"""
+    character = reader.peek()
+    if character == "{":
+        return {key: walk(reader) for key in reader.members()}
+    if character == "[":
+        return [walk(reader) for _ in reader.items()]
+    return reader.value()
+
+
+DOCUMENTS = [
+    {"item": [], "variable": [{"key": "a", "value": "b"}]},
+    {"numbers": [0, -1, 12345678901234567890, 1.5e-10, 3.25], "flags": [True, False, None], "empty": {}},
+    {"text": "naïve 🚀 \"quoted\" \\ \n", "nested": [[[{"deep": [1, [2, [3]]]}]]], "": ""},
+    [{"a": 1}, [], "x" * 5000],
+    12345,
+]
+
+
+@pytest.mark.parametrize("limit", [1, 3, 64, 1 << 20])
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_reader_matches_json_loads(tmp_path, document, limit):
+    path = tmp_path / "doc.json"
+    path.write_text(json.dumps(document, ensure_ascii=False, indent=1), encoding="utf-8")
+    with ShortReads(path, limit) as f:
+        reader = _JsonReader(f)
+        assert walk(reader) == document
+        assert reader.peek() == ""
+
+
+def test_reader_reports_progress(tmp_path):
+    path = tmp_path / "doc.json"
+    path.write_text(json.dumps(DOCUMENTS[1]))
+    calls = []
+    with ShortReads(path, 16) as f:
+        walk(_JsonReader(f, progress=lambda read, size: calls.append((read, size))))
+    size = path.stat().st_size
+    assert len(calls) > 1
+    assert calls[-1] == (size, size)
+    assert [read for read, _ in calls] == sorted(read for read, _ in calls)
+
+
+@pytest.mark.parametrize("text", ['{"a": [1, 2', '{"a" 1}', '{"a": tru}', '[1 2]', '{1: 2}', ''])
+def test_reader_rejects_invalid_json(tmp_path, text):
+    path = tmp_path / "bad.json"
+    path.write_text(text)
+    with ShortReads(path, 2) as f, pytest.raises(ValueError):
+        walk(_JsonReader(f))
+
+
+def request(name, path, method="GET"):
+    return {"name": name, "request": {"method": method, "url": {"raw": "{{baseUrl}}" + path}}}
+
+
+COLLECTION = {
+    "info": {"name": "Shop", "schema": "v2.1"},
+    "item": [
+        {"name": "Users", "item": [
+            request("List", "/users"),
+            {"name": "Admin", "item": [request("Roles", "/admin/roles"), {"name": "Empty", "item": []}]},
+            request("Login", "/auth/login", "POST"),
+        ]},
+        # Items before the name: decoded whole rather than streamed
+        {"item": [request("Create", "/orders", "POST")], "name": "Orders"},
+        {"name": "Empty", "item": []},
+        request("Health", "/health"),
+    ],
+    "variable": [{"key": "baseUrl", "value": "https://shop.example.com"}],
+}
+
+
+@pytest.fixture
+def collection_file(tmp_path):
+    path = tmp_path / "collection.json"
+    path.write_text(json.dumps(COLLECTION, indent=2))
+    return str(path)
+
+
+def test_scan_finds_the_categories_read_finds(collection_file):
+    assert Collection().scan_categories(collection_file) == Collection().read(collection_file).categories == [
+        "Users", "Orders"]
+
+
+def test_read_everything(collection_file):
+    found = Collection().read(collection_file)
+    assert {category: [name for name, _ in requests] for category, requests in found.requests.items()} == {
+        "Users": ["List", "Login"], "Users|Admin": ["Roles"], "Orders": ["Create"], "Imported APIs": ["Health"]}
+    assert found.request_count == 5
+    assert found.variables == {"baseUrl": "https://shop.example.com"}
+    assert list(found.login_methods) == ["Users/Login"]
+
+
+def test_read_keeps_only_the_selected_categories(collection_file):
+    found = Collection().read(collection_file, selected_categories=["Orders"])
+    assert list(found.requests) == ["Orders"]
+    assert found.categories == ["Users", "Orders"]
+    # Login candidates are found in every category
+    assert list(found.login_methods) == ["Users/Login"]
+
+
+def test_load(collection_file):
+    collection = Collection.load(collection_file, selected_categories=["Users"])
+    assert list(collection.imported_apis) == ["Users", "Users|Admin"]
+    roles = collection.imported_apis["Users|Admin"]["Roles"]
+    assert (roles.base_url, roles.path) == ("https://shop.example.com", "/admin/roles")
@@ -0,0 +1,38 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from api_engine import PoolConfig, connection_stats, new_session
+
+
+def get(session, url, times=5):
+    for _ in range(times):
+        assert session.get(url, timeout=5).status_code == 200
+    [(_, stats)] = connection_stats(session)
+    return stats
+
+
+def test_keep_alive_reuses_one_connection(server):
+    stats = get(new_session(), f"{server}/")
+    assert (stats.checkouts, stats.opened, stats.reused) == (5, 1, 4)
+
+
+def test_server_closing_every_connection_counts_as_opened(server):
+    # urllib3 reconnects the same pooled connection object, which must not count as reuse
+    stats = get(new_session(), f"{server}/close")
+    assert (stats.checkouts, stats.opened, stats.reused) == (5, 5, 0)
+    assert str(stats).startswith("5 opened, 0 reused (0%)")
+
+
+def test_keep_alive_off_opens_a_connection_per_request(server):
+    session = new_session(pools={server: PoolConfig(keep_alive=False)})
+    stats = get(session, f"{server}/")
+    assert (stats.checkouts, stats.opened, stats.reused) == (5, 5, 0)
+
+
+def test_connections_over_pool_maxsize_are_discarded(server):
+    session = new_session(pools={server: PoolConfig(pool_maxsize=1)})
+    with ThreadPoolExecutor(4) as executor:
+        # Slow responses, so all four requests hold a connection at the same time
+        assert list(executor.map(lambda _: session.get(f"{server}/slow", timeout=5).status_code, range(4))) == [
+            200] * 4
+    [(_, stats)] = connection_stats(session)
+    assert (stats.checkouts, stats.opened, stats.discarded) == (4, 4, 3)
@@ -0,0 +1,77 @@
+import threading
+
+import pytest
+
+from api_engine import RequestResult, Runner, dependency_order
+
+
+def test_keeps_the_given_order_without_dependencies():
+    assert dependency_order(["c", "a", "b"], {}) == ["c", "a", "b"]
+
+
+def test_dependencies_come_first():
+    assert dependency_order(["order", "login", "cart"], {"order": ["cart"], "cart": ["login"]}) == [
+        "login", "cart", "order"]
+
+
+def test_earlier_steps_keep_precedence():
+    assert dependency_order(["a", "b", "c", "d"], {"a": ["d"]}) == ["b", "c", "d", "a"]
+
+
+def test_unknown_and_self_dependencies_are_ignored():
+    assert dependency_order(["a", "b"], {"a": ["missing", "a"], "b": ["a"]}) == ["a", "b"]
+
+
+def test_cycle():
+    with pytest.raises(ValueError, match="b, c"):
+        dependency_order(["a", "b", "c"], {"b": ["c"], "c": ["b"]})
+
+
+def run_dag(steps, dependencies, failing=(), workers=4):
+    running = []
+    lock = threading.Lock()
+
+    def execute(step):
+        with lock:
+            running.append(step)
+        if step == "boom":
+            raise RuntimeError("boom")
+        return RequestResult(step, "GET", "", step not in failing)
+
+    results = [(step, result) for step, result, _ in Runner().iter_dag(steps, dependencies, execute, workers)]
+    return results, running
+
+
+def test_dag_runs_each_step_after_its_dependencies():
+    dependencies = {"cart": ["login"], "order": ["cart", "profile"], "profile": ["login"]}
+    results, _ = run_dag(["order", "profile", "cart", "login"], dependencies)
+    finished = [step for step, _ in results]
+    assert sorted(finished) == ["cart", "login", "order", "profile"]
+    for step, required in dependencies.items():
+        assert all(finished.index(dependency) < finished.index(step) for dependency in required)
+
+
+def test_dag_skips_everything_downstream_of_a_failure():
+    dependencies = {"cart": ["login"], "order": ["cart"], "search": []}
+    results, executed = run_dag(["login", "cart", "order", "search"], dependencies, failing={"login"})
+    outcomes = {step: result for step, result in results}
+    assert sorted(executed) == ["login", "search"]
+    assert outcomes["cart"].error == outcomes["order"].error == "DependencyFailed"
+    assert outcomes["search"].success
+
+
+def test_dag_reports_exceptions_as_failures():
+    results, _ = run_dag(["boom", "after"], {"after": ["boom"]})
+    outcomes = {step: result for step, result in results}
+    assert not outcomes["boom"].success
+    assert outcomes["after"].error == "DependencyFailed"
+
+
+def test_dag_stops_starting_steps():
+    runner = Runner()
+    calls = []
+    results = list(runner.iter_dag(["a", "b"], {"b": ["a"]},
+                                   lambda step: calls.append(step) or RequestResult(step, "GET", "", True),
+                                   should_stop=lambda: bool(calls)))
+    assert calls == ["a"]
+    assert [step for step, _, _ in results] == ["a"]
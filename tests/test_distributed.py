@@ -0,0 +1,38 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from api_distributed import LoadAgent, LoadCoordinator
+from api_engine import Collection, Endpoint
+from api_load import LoadGenerator, OpenLoopPlan
+
+
+def start_agent() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    threading.Thread(target=LoadAgent(port=port, log=lambda message: None).run, daemon=True).start()
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return f"127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.02)
+    raise RuntimeError("The agent did not start")
+
+
+def test_intervals_add_up_to_the_report(server):
+    collection = Collection()
+    collection.collection_variables = {"baseUrl": server}
+    collection.imported_apis = {"Local": {"Ping": Endpoint("GET", "{{baseUrl}}", "/")}}
+    windows = []
+    coordinator = LoadCoordinator([start_agent(), start_agent()], on_interval=windows.append)
+    report = coordinator.run(LoadGenerator(collection).to_state(),
+                             OpenLoopPlan(rate=40, duration=1.5, endpoints=["Local - Ping"]))
+    assert report.total().requests > 40
+    assert report.total().errors == 0
+    assert len(windows) >= 2
+    assert sum(window.total().requests for window in windows) == report.total().requests
+    assert sum(window.duration for window in windows) == pytest.approx(report.duration, abs=0.1)
@@ -0,0 +1,75 @@
+import math
+import random
+
+import pytest
+
+from api_load import LatencyHistogram
+
+
+def histogram(values) -> LatencyHistogram:
+    result = LatencyHistogram()
+    for value in values:
+        result.record(value)
+    return result
+
+
+def exact_percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(len(ordered) * percent / 100)) - 1]
+
+
+def test_empty():
+    empty = LatencyHistogram()
+    assert empty.percentile(99) == 0
+    assert empty.mean == 0
+
+
+@pytest.mark.parametrize("percent", [1, 50, 90, 99, 99.9, 100])
+def test_percentiles_within_one_percent(percent):
+    rng = random.Random(1)
+    values = [rng.lognormvariate(-3, 1) for _ in range(10_000)]
+    assert histogram(values).percentile(percent) == pytest.approx(exact_percentile(values, percent), rel=0.0101)
+
+
+def test_percentile_never_exceeds_max():
+    h = histogram([0.1] * 10)
+    assert h.percentile(100) == 0.1
+    assert h.min == h.max == 0.1
+    assert h.mean == pytest.approx(0.1)
+
+
+def test_values_below_the_floor():
+    h = histogram([0.0, 0.0, 1e-9])
+    assert h.percentile(50) <= 1e-6
+    assert h.min == 0.0
+
+
+def test_merge_equals_recording_everything():
+    rng = random.Random(2)
+    first = [rng.uniform(0.001, 0.5) for _ in range(1000)]
+    second = [rng.uniform(0.2, 2.0) for _ in range(500)]
+    merged = histogram(first)
+    merged.merge(histogram(second))
+    combined = histogram(first + second)
+    assert merged.counts == combined.counts
+    assert (merged.count, merged.min, merged.max) == (combined.count, combined.min, combined.max)
+    assert merged.total == pytest.approx(combined.total)
+    for percent in (50, 99):
+        assert merged.percentile(percent) == combined.percentile(percent)
+
+
+def test_merge_empty():
+    h = histogram([0.2, 0.4])
+    h.merge(LatencyHistogram())
+    assert (h.count, h.min, h.max) == (2, 0.2, 0.4)
+    empty = LatencyHistogram()
+    empty.merge(h)
+    assert (empty.count, empty.min, empty.max) == (2, 0.2, 0.4)
+
+
+def test_dict_round_trip():
+    h = histogram([0.01, 0.02, 0.5])
+    restored = LatencyHistogram.from_dict(h.to_dict())
+    assert restored.counts == h.counts
+    assert (restored.count, restored.total, restored.min, restored.max) == (h.count, h.total, h.min, h.max)
+    assert LatencyHistogram.from_dict(LatencyHistogram().to_dict()).min == math.inf
@@ -0,0 +1,54 @@
+import pickle
+
+import pytest
+
+from api_engine import Phases, RequestResult
+from api_load import ClosedLoopPlan, LoadReport, OpenLoopPlan, Stage
+
+
+def test_open_loop_split_keeps_the_rate():
+    parts = OpenLoopPlan(rate=10, duration=5, endpoints=["Users - List"]).split(3)
+    assert len(parts) == 3
+    assert sum(part.rate for part in parts) == pytest.approx(10)
+    assert all(part.duration == 5 and part.endpoints == ["Users - List"] for part in parts)
+
+
+@pytest.mark.parametrize("processes", [1, 2, 3, 7])
+def test_closed_loop_split_adds_up_to_the_users(processes):
+    plan = ClosedLoopPlan([Stage(10, 5), Stage(20, 11), Stage(5, 0)], ["Users - List"])
+    parts = plan.split(processes)
+    for index, stage in enumerate(plan.stages):
+        shares = [part.stages[index].users for part in parts]
+        assert sum(shares) == stage.users
+        assert max(shares) - min(shares) <= 1
+    assert all(part.duration == plan.duration for part in parts)
+
+
+def report(results) -> LoadReport:
+    load = LoadReport(duration=2.0)
+    for name, latency, status in results:
+        phases = Phases(ttfb=latency / 2, download=latency / 4, connect=0.001, reused=False)
+        load.record(RequestResult(name, "GET", "", status < 500, status, phases=phases), latency, latency)
+    return load
+
+
+def test_worker_reports_merge_into_the_whole_run():
+    first = [("a", 0.01 * i, 200) for i in range(1, 50)] + [("b", 0.2, 503)]
+    second = [("a", 0.02 * i, 200) for i in range(1, 30)] + [("c", 0.05, 200)]
+    merged = LoadReport()
+    for part in (first, second):
+        # Worker processes send their reports back as dicts
+        merged.merge(LoadReport.from_dict(pickle.loads(pickle.dumps(report(part).to_dict()))))
+    whole = report(first + second)
+    assert merged.duration == whole.duration
+    assert merged.endpoints.keys() == whole.endpoints.keys()
+    for name, stats in whole.endpoints.items():
+        other = merged.endpoints[name]
+        assert other.latency.counts == stats.latency.counts
+        assert other.latency.total == pytest.approx(stats.latency.total)
+        assert (other.latency.min, other.latency.max) == (stats.latency.min, stats.latency.max)
+        assert {phase: histogram.counts for phase, histogram in other.phases.items()} == {
+            phase: histogram.counts for phase, histogram in stats.phases.items()}
+        assert (other.errors, other.status_codes) == (stats.errors, stats.status_codes)
+    assert merged.total().latency.percentile(99) == whole.total().latency.percentile(99)
+    assert merged.lines()[0] == whole.lines()[0]
@@ -0,0 +1,38 @@
+import pytest
+
+from api_engine import PacingPolicy
+
+
+@pytest.mark.parametrize("spec, mode, low, high, rate", [
+    ("none", "none", 0, 0, 0),
+    ("fixed:2", "fixed", 2, 2, 0),
+    (" Fixed : 0.5 ", "fixed", 0.5, 0.5, 0),
+    ("random:0.5-2", "random", 0.5, 2, 0),
+    ("random:1", "random", 1, 1, 0),
+    ("rate:10", "rate", 0, 0, 10),
+])
+def test_parse(spec, mode, low, high, rate):
+    policy = PacingPolicy.parse(spec)
+    assert (policy.mode, policy.think_time, policy.max_think_time, policy.rate) == (mode, low, high, rate)
+    assert PacingPolicy.parse(policy.spec).spec == policy.spec
+
+
+@pytest.mark.parametrize("spec", ["bogus", "fixed:abc", "fixed:-1", "random:2-1", "rate:0", "rate:", "rate:x"])
+def test_parse_errors(spec):
+    with pytest.raises(ValueError):
+        PacingPolicy.parse(spec)
+
+
+def test_delays(clock):
+    assert PacingPolicy.parse("none").delay(clock()) == 0
+    assert PacingPolicy.parse("fixed:1.5").delay(clock()) == 1.5
+    assert 0.5 <= PacingPolicy.parse("random:0.5-2").delay(clock()) <= 2
+
+
+def test_rate_spaces_step_starts(clock):
+    policy = PacingPolicy.parse("rate:4")
+    started = clock()
+    clock.advance(0.1)
+    assert policy.delay(started) == pytest.approx(0.15)
+    clock.advance(1)
+    assert policy.delay(started) == 0
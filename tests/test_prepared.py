@@ -0,0 +1,73 @@
+import pytest
+
+from api_engine import Collection, Endpoint, RequestResult, Runner
+
+
+@pytest.fixture
+def runner(monkeypatch):
+    collection = Collection()
+    collection.collection_variables = {"baseUrl": "https://shop.example.com", "id": "7"}
+    collection.imported_apis = {"Users": {
+        "Get": Endpoint("GET", "{{baseUrl}}", "/users", {"X-Id": "{{id}}"}),
+        "Create": Endpoint("POST", "{{baseUrl}}", "/users", {}, '{"name": "a"}'),
+    }}
+    runner = Runner(collection)
+    runner.sent = []
+    runner.builds = 0
+    prepare_request = runner.prepare_request
+
+    def counting_prepare_request(*args, **kwargs):
+        runner.builds += 1
+        return prepare_request(*args, **kwargs)
+
+    def send(spec, **kwargs):
+        runner.sent.append(spec)
+        return RequestResult(spec.name, spec.method, spec.url, True, 200)
+
+    monkeypatch.setattr(runner, "prepare_request", counting_prepare_request)
+    monkeypatch.setattr(runner, "send", send)
+    return runner
+
+
+def test_second_run_reuses_the_prepared_requests(runner):
+    runner.run_collection()
+    prepared = dict(runner._prepared)
+    runner.run_collection()
+    assert runner.builds == 2
+    assert runner._prepared == prepared
+    first, second = runner.sent[0], runner.sent[2]
+    assert first is not second  # Copies, so auth headers added to one do not leak into the next
+    assert (second.url, second.headers["X-Id"]) == ("https://shop.example.com/users", "7")
+    assert runner.sent[3].body == b'{"name": "a"}'
+
+
+def test_parallel_and_template_runs_reuse_them_too(runner):
+    methods = [("Users", "Get"), ("Users", "Create")]
+    list(runner.iter_parallel(methods, workers=2))
+    list(runner.iter_parallel(methods, workers=2))
+    runner.execute_template("Users", "Get", runner.collection.template_for("Users", "Get"))
+    assert runner.builds == 2
+    assert len(runner.sent) == 5
+
+
+def test_variable_changes_rebuild(runner):
+    runner.run_collection()
+    runner.collection.collection_variables["id"] = "8"
+    runner.run_collection()
+    assert runner.builds == 4
+    assert runner.sent[-2].headers["X-Id"] == "8"
+
+
+def test_forget_prepared_rebuilds_one_method(runner):
+    runner.run_collection()
+    runner.forget_prepared("Users - Get")
+    runner.run_collection()
+    assert runner.builds == 3
+
+
+def test_reimported_endpoint_rebuilds(runner):
+    runner.run_collection()
+    runner.collection.imported_apis["Users"]["Get"] = Endpoint("GET", "{{baseUrl}}", "/people")
+    runner.run_collection()
+    assert runner.builds == 3
+    assert runner.sent[-2].url == "https://shop.example.com/people"
@@ -0,0 +1,99 @@
+import pytest
+
+from api_engine import RateLimitConfig, RateLimiter, RequestSpec, TokenBucket
+
+
+def spec(endpoint: str, url: str = "https://api.example.com/users") -> RequestSpec:
+    return RequestSpec(endpoint, "GET", url, {}, endpoint=endpoint)
+
+
+def test_burst_then_rate(clock):
+    bucket = TokenBucket(RateLimitConfig(rate=2, burst=2))
+    assert bucket.take() == 0
+    assert bucket.take() == 0
+    assert bucket.take() == pytest.approx(0.5)
+    clock.advance(0.25)
+    assert bucket.take() == pytest.approx(0.25)
+    clock.advance(0.25)
+    assert bucket.take() == 0
+
+
+def test_idle_refill_is_capped_at_burst(clock):
+    bucket = TokenBucket(RateLimitConfig(rate=10, burst=3))
+    clock.advance(60)
+    assert [bucket.take() for _ in range(3)] == [0, 0, 0]
+    assert bucket.take() > 0
+
+
+def test_refund(clock):
+    bucket = TokenBucket(RateLimitConfig(rate=1))
+    assert bucket.take() == 0
+    bucket.refund()
+    assert bucket.take() == 0
+
+
+def test_throttle_pauses_cuts_and_recovers(clock):
+    bucket = TokenBucket(RateLimitConfig(rate=10, recovery=10))
+    assert bucket.throttle(retry_after=2, sent=clock()) == pytest.approx(5)
+    assert bucket.throttled == 1
+    # Paused for the Retry-After, then one token at the cut rate
+    assert bucket.take() == pytest.approx(2 + 1 / 5)
+    assert bucket.rate() == pytest.approx(5)
+    clock.advance(2 + 5)
+    assert bucket.rate() == pytest.approx(7.5)
+    clock.advance(5)
+    assert bucket.rate() == pytest.approx(10)
+    clock.advance(100)
+    assert bucket.rate() == pytest.approx(10)
+
+
+def test_throttle_ignores_requests_sent_before_the_last_cut(clock):
+    bucket = TokenBucket(RateLimitConfig(rate=10, recovery=10))
+    sent = clock()
+    assert bucket.throttle(retry_after=1, sent=sent) == pytest.approx(5)
+    assert bucket.throttle(retry_after=1, sent=sent) is None
+    assert bucket.throttled == 1
+    clock.advance(2)
+    # 1s into the 10s recovery from 5 to 10 the rate is 5.5, which is cut in half
+    assert bucket.throttle(retry_after=0, sent=clock()) == pytest.approx(2.75)
+    assert bucket.throttled == 2
+
+
+def test_throttle_floor(clock):
+    bucket = TokenBucket(RateLimitConfig(rate=1, min_rate=0.8))
+    assert bucket.throttle(retry_after=0, sent=clock()) == pytest.approx(0.8)
+
+
+@pytest.mark.parametrize("data", [{"rate": 0}, {"rate": 1, "burst": 0.5}, {"rate": 1, "min_rate": 2},
+                                  {"rate": 1, "unknown": 1}, {}])
+def test_invalid_config(data):
+    with pytest.raises(ValueError):
+        RateLimitConfig.from_dict(data)
+
+
+def test_limiter_takes_from_every_matching_bucket(clock):
+    limiter = RateLimiter({"*": {"rate": 1}, "Users - List": {"rate": 100, "burst": 5}})
+    assert limiter.take(spec("Users - List")) == 0
+    assert limiter.take(spec("Orders - List")) == pytest.approx(1)
+    # The global bucket held the request back, so the endpoint bucket still has its tokens
+    clock.advance(1)
+    assert limiter.take(spec("Users - List")) == 0
+    assert limiter.buckets["Users - List"].take() == 0
+
+
+def test_limiter_refunds_when_a_later_bucket_is_empty(clock):
+    limiter = RateLimiter({"*": {"rate": 100, "burst": 3}, "Users - List": {"rate": 1}})
+    assert limiter.take(spec("Users - List")) == 0
+    assert limiter.take(spec("Users - List")) == pytest.approx(1)
+    # One token taken and one refunded from "*": two are left
+    assert limiter.take(spec("Orders - List")) == 0
+    assert limiter.take(spec("Orders - List")) == 0
+    assert limiter.take(spec("Orders - List")) > 0
+
+
+def test_limiter_matches_base_url_and_category(clock):
+    limiter = RateLimiter({"https://api.example.com": {"rate": 1}, "Users": {"rate": 1},
+                           "https://other.example.com": {"rate": 1}})
+    throttled = limiter.throttle(spec("Users - List"), retry_after=0, sent=clock())
+    assert [key for key, _ in throttled] == ["https://api.example.com", "Users"]
+    assert limiter.buckets["https://other.example.com"].throttled == 0
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+import api_regress
+from api_regress import MIN_SAMPLES, compare, percentiles
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(api_regress, "np", None)
+    return request.param
+
+
+def samples(mean: float, count: int = 200, seed: int = 0):
+    rng = random.Random(seed)
+    return [rng.gauss(mean, mean * 0.05) for _ in range(count)]
+
+
+def test_percentiles_interpolate_like_numpy():
+    values = [4.0, 1.0, 3.0, 2.0]
+    assert percentiles(values, (0, 50, 95, 100)) == pytest.approx([1.0, 2.5, 3.85, 4.0])
+    numpy = pytest.importorskip("numpy")
+    values = samples(0.1)
+    assert percentiles(values, (50, 95, 99)) == pytest.approx(list(numpy.percentile(values, (50, 95, 99))))
+
+
+def test_flags_a_slower_endpoint(backend):
+    changes = compare({"Users - List": samples(0.2, seed=1)}, {"Users - List": samples(0.1, seed=2)},
+                      resamples=200, seed=0)
+    assert [change.percentile for change in changes] == [50, 95, 99]
+    assert all(change.regressed for change in changes)
+    assert all(0 < change.low <= change.high for change in changes)
+    assert changes[0].change == pytest.approx(1.0, abs=0.05)
+
+
+def test_same_distribution_is_not_flagged(backend):
+    changes = compare({"Users - List": samples(0.1, seed=1)}, {"Users - List": samples(0.1, seed=2)},
+                      resamples=200, seed=0)
+    assert len(changes) == 3
+    assert not any(change.regressed for change in changes)
+
+
+def test_growth_under_the_threshold_is_not_flagged(backend):
+    changes = compare({"e": samples(0.105, seed=1)}, {"e": samples(0.1, seed=2)}, resamples=200, seed=0)
+    assert not any(change.regressed for change in changes)
+
+
+def test_growth_under_min_delta_is_not_flagged(backend):
+    changes = compare({"e": samples(0.0002, seed=1)}, {"e": samples(0.0001, seed=2)}, resamples=200, seed=0)
+    assert not any(change.regressed for change in changes)
+    assert changes
+
+
+def test_faster_endpoint_is_not_flagged(backend):
+    changes = compare({"e": samples(0.05, seed=1)}, {"e": samples(0.1, seed=2)}, resamples=200, seed=0)
+    assert not any(change.regressed for change in changes)
+    assert all(change.high < 0 for change in changes)
+
+
+def test_endpoints_with_too_few_samples_are_skipped(backend):
+    current = {"few": samples(0.2, count=MIN_SAMPLES - 1), "new": samples(0.2), "ok": samples(0.2)}
+    baseline = {"few": samples(0.1), "ok": samples(0.1)}
+    assert {change.endpoint for change in compare(current, baseline, resamples=50, seed=0)} == {"ok"}
+
+
+def test_seed_makes_the_bootstrap_repeatable(backend):
+    current, baseline = {"e": samples(0.12, seed=1)}, {"e": samples(0.1, seed=2)}
+    first = compare(current, baseline, resamples=100, seed=7)
+    assert compare(current, baseline, resamples=100, seed=7) == first
@@ -0,0 +1,74 @@
+import itertools
+import os
+
+import pytest
+
+from api_engine import RequestResult
+from api_store import ResultStore
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    ticks = itertools.count(1000)
+    monkeypatch.setattr("api_store.time.time", lambda: float(next(ticks)))
+    store = ResultStore(str(tmp_path / "results.db"))
+    yield store
+    store.close()
+
+
+def record(store, names, run_id=None):
+    for name in names:
+        store.record(RequestResult(name, "GET", f"https://api.example.com/{name}", True, 200, elapsed=0.1),
+                     run_id)
+
+
+def test_requests_limit_keeps_the_latest(store):
+    run_id = store.begin_run("nightly")
+    record(store, [f"step {index}" for index in range(10)], run_id)
+    store.end_run(run_id)
+    assert [row["endpoint"] for row in store.requests(limit=3)] == ["step 7", "step 8", "step 9"]
+    assert [row["endpoint"] for row in store.requests()] == [f"step {index}" for index in range(10)]
+    assert [row["endpoint"] for row in store.requests(run_id=run_id, limit=20)][:2] == ["step 0", "step 1"]
+
+
+def test_runs_latest_first(store):
+    for label in ("a", "b", "a"):
+        run_id = store.begin_run(label)
+        record(store, ["x", "y"], run_id)
+        store.end_run(run_id)
+    runs = store.runs()
+    assert [run["label"] for run in runs] == ["a", "b", "a"]
+    assert runs[0]["id"] > runs[1]["id"]
+    assert [run["requests"] for run in runs] == [2, 2, 2]
+    assert [run["id"] for run in store.runs(label="a", limit=1)] == [runs[0]["id"]]
+
+
+def test_queries_after_close(store):
+    record(store, ["x"])
+    store.close()
+    assert store.requests() == []
+    assert store.runs() == []
+    record(store, ["late"])  # A worker finishing after the store was closed
+    store.close()
+
+
+def test_lazy_store_creates_the_file_on_first_write(tmp_path):
+    path = tmp_path / "lazy.db"
+    store = ResultStore(str(path), lazy=True)
+    store.close()
+    assert not path.exists()
+    store = ResultStore(str(path), lazy=True)
+    record(store, ["x"])
+    assert path.exists()
+    assert [row["endpoint"] for row in store.requests()] == ["x"]
+    store.close()
+
+
+def test_lazy_store_reports_an_unusable_path(tmp_path):
+    errors = []
+    store = ResultStore(os.path.join(str(tmp_path), "missing", "results.db"), lazy=True, on_error=errors.append)
+    record(store, ["x"])
+    assert store.begin_run() is None
+    assert store.requests() == []
+    assert len(errors) == 1
+    store.close()
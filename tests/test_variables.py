@@ -0,0 +1,39 @@
+import pytest
+
+from api_engine import Collection, Variables
+
+
+def test_variables_version_changes_on_every_write():
+    variables = Variables(a="1")
+    seen = {variables.version}
+    for change in (lambda v: v.__setitem__("b", "2"), lambda v: v.update(c="3"), lambda v: v.pop("c"),
+                   lambda v: v.setdefault("d", "4"), lambda v: v.__delitem__("d"), lambda v: v.__ior__({"e": "5"}),
+                   lambda v: v.popitem(), lambda v: v.clear()):
+        change(variables)
+        assert variables.version not in seen
+        seen.add(variables.version)
+
+
+def test_clean_variables_follows_variable_changes():
+    collection = Collection()
+    collection.collection_variables = {"baseUrl": "https://a.example.com", "id": "7"}
+    assert collection.clean_variables("{{baseUrl}}/users/{{id}}") == "https://a.example.com/users/7"
+    collection.collection_variables["id"] = "8"
+    assert collection.clean_variables("{{baseUrl}}/users/{{id}}") == "https://a.example.com/users/8"
+    collection.collection_variables = {"baseUrl": "https://b.example.com"}
+    assert collection.clean_variables("{{baseUrl}}/users/{{id}}") == "https://b.example.com/users/"
+
+
+@pytest.mark.parametrize("template, expected", [
+    ("", ""),
+    ("/plain/path", "/plain/path"),
+    ("{{missing}}/users", "/users"),
+    ("{{host}}//users//{{missing}}/x", "https://h.example.com/users/x"),
+    ("http:/{{name}}.example.com", "https://h.example.com"),
+    ("{{{{id}}", "{{7"),
+    ("/users/{{brace}}", "/users/{x}"),
+])
+def test_clean_variables(template, expected):
+    collection = Collection()
+    collection.collection_variables = {"host": "https://h.example.com", "name": "h", "id": "7", "brace": "{x}"}
+    assert collection.clean_variables(template) == expected